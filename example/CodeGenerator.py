@@ -1,25 +1,78 @@
 import ast
 import inspect
 import os
-import re
+import pprint
 from typing import Dict, List, Optional, Any
 import logging
 import yaml
 
+from actuatorTable import ExchangeTable
+from exchangeSnapshot import OUTPUT_TYPES, load_exchange_dict
+from pluginRegistry import PluginRegistry, default_plugin_registry
+from templateCache import (MARKER_PATTERN, CompiledTemplate, TemplateCache, default_template_cache,
+                           iter_marker_nodes)
+
 
 def load_yaml(file_path: str) -> Dict[str, Any]:
     with open(file_path, 'r') as file:
         data = yaml.safe_load(file)
     return data
-INOUT_CONFIG = load_yaml(os.path.join(os.path.dirname(__file__), 'INPUT_CONFIG.yaml'))
-SETTINGS_CONFIG = load_yaml(os.path.join(os.path.dirname(__file__), 'SET_CONFIG.yaml'))
+INPUT_CONFIG = load_yaml(os.path.join(os.path.dirname(__file__), 'INPUT_CONFIG.yaml'))
+SET_CONFIG = load_yaml(os.path.join(os.path.dirname(__file__), 'SET_CONFIG.yaml'))
 OUTPUT_CONFIG = load_yaml(os.path.join(os.path.dirname(__file__), 'OUTPUT_CONFIG.yaml'))
 
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+# input type -> plugin module and class that the generated InputCommunicate instantiates
+INPUT_PLUGINS = {
+    'http': {'module': 'httpCommunicate', 'class_name': 'httpCommunication'},
+    'modbus': {'module': 'modbusCommunicate', 'class_name': 'ModbusCommunicate'},
+    'websocket': {'module': 'websocketCommunicate', 'class_name': 'WebSocketCommunicate'},
+}
+
+# exchange dictionary flag -> EnergyPlus runtime callback, simulator handler, the queue feeding it
+# and the dictFlag calling points whose actuators the handler writes
+EXCHANGE_FLAGS = {
+    'set_weather_flag': {'type': 'begin_zone_timestep_before_set_current_weather',
+                         'handler_method': 'before_predictor_flag', 'queue': 'weatherData',
+                         'calling_points': ['set_weather_flag', 'before_predictor_flag']},
+    'set_hvac_manager_flag': {'type': 'after_predictor_before_hvac_managers',
+                              'handler_method': 'before_hvac_managers_flag', 'queue': 'sensorData',
+                              'calling_points': ['before_hvac_managers_flag']},
+    'set_loop_flag': {'type': 'inside_system_iteration_loop',
+                      'handler_method': 'itrator_loop_flag', 'queue': 'controlData',
+                      'calling_points': ['itrator_loop_flag']},
+    'set_heat_flag': {'type': 'begin_zone_timestep_before_init_heat_balance',
+                      'handler_method': 'init_heat_flag', 'queue': 'controlData',
+                      'calling_points': ['init_heat_balance_flag']},
+}
+
+# OUTPUT_CONFIG types handled by bulkStorage.make_backend
+STORAGE_TYPES = ('sqlite', 'mysql')
+
+# marker -> config section that feeds it and the CodeGenerator method building its fragment
+FRAGMENT_BUILDERS = (
+    ('exchangeData', 'exchange_data', '_generate_exchange_data'),
+    ('initQueue', 'queues', '_generate_queue_init'),
+    ('importInitInput', 'input_imports', '_generate_input_imports'),
+    ('inputLoad', 'input_loaders', '_generate_input_loaders'),
+    ('ExchangeLoad', 'exchange_handlers', '_generate_exchange_handlers'),
+    ('import', 'imports', '_generate_imports'),
+    ('call_back', 'callbacks', '_generate_callbacks'),
+    ('initStorgae', 'storage_init', '_generate_storage_init'),
+    ('importInput', 'input_imports', '_generate_input_communicate'),
+    ('importOutput', 'outputs', '_generate_output_storage'),
+)
+
+
 class CodeGenerator:
     """AST-based code generator"""
 
-    def __init__(self):
+    def __init__(self, template_cache: Optional[TemplateCache] = None,
+                 plugin_registry: Optional[PluginRegistry] = None):
         self.logger = logging.getLogger(__name__)
+        self.template_cache = template_cache if template_cache is not None else default_template_cache
+        self.plugin_registry = plugin_registry if plugin_registry is not None else default_plugin_registry
 
     def parse_template(self, template_code: str) -> ast.Module:
         """Template code syntax error AST"""
@@ -30,46 +83,28 @@ class CodeGenerator:
             raise
 
     def find_replacement_markers(self, node: ast.AST) -> Dict[str, List[ast.AST]]:
-        """Find all tokens that need to be replaced in the AST"""
+        """Find all tokens that need to be replaced in the AST, recording each node once per marker"""
         markers = {}
+        for marker_node, name in iter_marker_nodes(node):
+            names = [name] if name is not None else MARKER_PATTERN.findall(marker_node.value)
+            for marker in dict.fromkeys(names):
+                markers.setdefault(marker, []).append(marker_node)
+        return markers
+
+    def compile_template(self, template_code: str) -> CompiledTemplate:
+        """Parse and index the template once, reusing the cached result for identical templates"""
+        def _compile(source: str, digest: str) -> CompiledTemplate:
+            return CompiledTemplate.compile(source, self.parse_template(source), digest)
 
-        class ReplacementFinder(ast.NodeVisitor):
-            def __init__(self):
-                self.markers = {}
-
-            def visit_Expr(self, node):
-                if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
-                 '''find {{...}} mode'''
-                    matches = re.findall(r'\{\{(\w+)\}\}', node.value.value)
-                    for marker in matches:
-                        if marker not in self.markers:
-                            self.markers[marker] = []
-                        self.markers[marker].append(node)
-                self.generic_visit(node)
-
-            def visit_FunctionDef(self, node):
-                # check if the function body contains a string literal
-                for stmt in node.body:
-                    if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
-                        if isinstance(stmt.value.value, str):
-                            matches = re.findall(r'\{\{(\w+)\}\}', stmt.value.value)
-                            for marker in matches:
-                                if marker not in self.markers:
-                                    self.markers[marker] = []
-                                self.markers[marker].append(stmt)
-                self.generic_visit(node)
-
-            def visit_ClassDef(self, node):
-                self.generic_visit(node)
-
-        finder = ReplacementFinder()
-        finder.visit(node)
-        return finder.markers
+        return self.template_cache.get_or_compile(template_code, _compile)
 
     def generate_code_from_template(self, template_code: str, replacements: Dict[str, str]) -> str:
         """
         Generate code based on the template and replacement content
 
+        Statement markers (`{{name}}` on its own line) are replaced by the whole
+        fragment; markers inside strings and docstrings are replaced in place.
+
         Args:
             template_code
             replacements
@@ -78,31 +113,7 @@ class CodeGenerator:
             generated_code
         """
         try:
-            tree = self.parse_template(template_code)
-
-
-            markers = self.find_replacement_markers(tree)
-
-            code_lines = template_code.split('\n')
-
-            for marker_name, replacement_code in replacements.items():
-                if marker_name in markers:
-                    for node in markers[marker_name]:
-                        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
-                            lineno = node.lineno - 1
-
-                            original_line = code_lines[lineno]
-                            if f"{{{{{marker_name}}}}}" in original_line:
-                                new_line = original_line.replace(
-                                    f"{{{{{marker_name}}}}}",
-                                    replacement_code
-                                )
-                                code_lines[lineno] = new_line
-                            else:
-                                code_lines[lineno] = replacement_code
-
-            return '\n'.join(code_lines)
-
+            return self.compile_template(template_code).render(replacements)
         except Exception as e:
             self.logger.error(f"fail: {e}")
             raise
@@ -123,42 +134,40 @@ class CodeGenerator:
 
 
         replacements = {}
-
-        # initQueue
-        if 'queues' in config:
-            replacements['initQueue'] = self._generate_queue_init(config['queues'])
-
-        # importInitInput
-        if 'input_imports' in config:
-            replacements['importInitInput'] = self._generate_input_imports(config['input_imports'])
-
-        # inputLoad
-        if 'input_loaders' in config:
-            replacements['inputLoad'] = self._generate_input_loaders(config['input_loaders'])
-
-        #  ExchangeLoad
-        if 'exchange_handlers' in config:
-            replacements['ExchangeLoad'] = self._generate_exchange_handlers(config['exchange_handlers'])
-
-        #  import
-        if 'imports' in config:
-            replacements['import'] = self._generate_imports(config['imports'])
-
-        #  call_back
-        if 'callbacks' in config:
-            replacements['call_back'] = self._generate_callbacks(config['callbacks'])
-
-        # initStorgae
-        if 'storage_init' in config:
-            replacements['initStorgae'] = self._generate_storage_init(config['storage_init'])
+        for marker, section, _ in FRAGMENT_BUILDERS:
+            if section in config:
+                replacements[marker] = self.generate_fragment(marker, config[section])
 
         return self.generate_code_from_template(template_code, replacements)
 
+    def generate_fragment(self, marker: str, section: Any) -> str:
+        """Build the code fragment for one marker from its config section"""
+        for name, _, builder in FRAGMENT_BUILDERS:
+            if name == marker:
+                return getattr(self, builder)(section)
+        raise KeyError(f"no fragment builder for marker {marker}")
+
+    def fragment_dependencies(self, marker: str, section: Any) -> List[str]:
+        """Paths and mtimes of the plugin sources a fragment is built from, for change detection"""
+        if marker == 'inputLoad':
+            plugins = [(item['module'], item['class_name']) for item in section]
+        elif marker == 'initStorgae' and 'mysql_config' in section:
+            plugins = [(section.get('module', section.get('class_name')), section.get('class_name'))]
+        else:
+            return []
+        dependencies = []
+        for module, class_name in plugins:
+            metadata = self.plugin_registry.get(module, class_name)
+            dependencies.append(f"{metadata.path}:{metadata.stamp}")
+        return dependencies
+
     def _generate_queue_init(self, queues_config: List[Dict]) -> str:
         lines = []
         for queue_config in queues_config:
             name = queue_config['name']
-            lines.append(f"        self.{name} = queue.Queue()")
+            lines.append(f"        self.{name} = BoundedChannel(maxsize={queue_config.get('maxsize', 2)}, "
+                         f"policy='{queue_config.get('policy', 'latest')}', "
+                         f"timeout={queue_config.get('timeout', 0.1)})")
         return '\n'.join(lines)
 
     def _generate_input_imports(self, imports_config: List[Dict]) -> str:
@@ -176,12 +185,64 @@ class CodeGenerator:
         for loader_config in loaders_config:
             module = loader_config['module']
             class_name = loader_config['class_name']
-            package = __import__(module)
-            object = getattr(package, class_name)
-            description = object.description
-            lines.append(description)
+            lines.append(self.plugin_registry.description(module, class_name))
+        return '\n'.join(lines)
+
+    def _generate_exchange_data(self, exchange_config: Dict) -> str:
+        if not exchange_config.get('fold'):
+            return '\n'.join([
+                "data_dict = {}",
+                "output_dict = {}",
+                "preprocess(os.path.join(os.path.dirname(__file__), SETTINGS_CONFIG.get('exchangeDataDict')))",
+            ])
+        rows = exchange_config['rows']
+        data_dict = {row[0]: list(row[1:]) for row in rows}
+        output_dict = {row[0]: list(row[1:]) for row in rows if len(row) > 1 and row[1] in OUTPUT_TYPES}
+        return '\n'.join([
+            f"# folded from {exchange_config['source']} at generation time; regenerate after editing it",
+            f"data_dict = {pprint.pformat(data_dict, width=120, sort_dicts=False)}",
+            f"output_dict = {pprint.pformat(output_dict, width=120, sort_dicts=False)}",
+        ])
+
+    def _generate_exchange_handlers(self, handlers_config: List[Dict]) -> str:
+        lines = []
+        for handler_config in handlers_config:
+            calling_points = handler_config.get('calling_points', [handler_config['name']])
+            points = handler_config.get('points')
+            if points is not None:
+                lines.extend(self._folded_exchange_handler(handler_config['name'], handler_config['queue'],
+                                                           calling_points, points))
+                continue
+            lines.append(f"    def {handler_config['name']}(self, state):")
+            lines.append(f"        item = self.config.{handler_config['queue']}.get()")
+            lines.append(f"        for calling_point in {tuple(calling_points)!r}:")
+            lines.append("            self.set_actuator_frame(state, item, calling_point)")
+            lines.append("")
         return '\n'.join(lines)
 
+    @staticmethod
+    def _folded_exchange_handler(name: str, queue: str, calling_points: List[str], points: List[int]) -> List[str]:
+        """Handler writing a literal list of point indices, resolved by the generator"""
+        indices = pprint.pformat(tuple(points), width=100, compact=True).replace('\n', '\n' + ' ' * 21)
+        return [
+            f"    def {name}(self, state):",
+            f"        # points of {', '.join(calling_points)}, folded from the exchange dictionary",
+            f"        frame = self.config.{queue}.get()",
+            "        if frame is None or not self.handle_cache.resolve(api, state):",
+            "            return",
+            "        values, stamp, generation = frame.values, frame.stamp, frame.generation",
+            "        handles = self.handle_cache.handles",
+            "        set_actuator_value = api.exchange.set_actuator_value",
+            "        observe = self.observe_frame",
+            "        started = perf_counter() if observe is not None else 0.0",
+            f"        for index in {indices}:",
+            "            if stamp[index] == generation and handles[index] != -1:",
+            "                set_actuator_value(state, handles[index], values[index])",
+            "        if observe is not None:",
+            "            observe(perf_counter() - started)",
+            "",
+        ]
+
     def _generate_imports(self, imports_config: List[str]) -> str:
         lines = []
         for import_line in imports_config:
@@ -193,21 +254,34 @@ class CodeGenerator:
         lines = []
         for callback_config in callbacks_config:
             callback_type = callback_config['type']
-            handler_method = callback_config['handler_method']
-            lines.append(
-                f"        api.runtime.callback_{callback_type}(state, self.energyplus_simulator.{handler_method})")
+            handlers = callback_config.get('handlers') or [callback_config['handler_method']]
+            wrapped = [f"metrics.wrap('{handler}', self.energyplus_simulator.{handler})" for handler in handlers]
+            if len(wrapped) == 1:
+                lines.append(f"        api.runtime.callback_{callback_type}(state, {wrapped[0]})")
+                continue
+            lines.append(f"        api.runtime.callback_{callback_type}(state, fan_out(")
+            lines.extend(f"            {handler}," for handler in wrapped)
+            lines.append("        ))")
         return '\n'.join(lines)
 
     def _generate_storage_init(self, storage_config: Dict) -> str:
 
         if 'mysql_config' in storage_config:
             className = storage_config.get('class_name')
-            package = __import__(className)
-            object = getattr(package, className)
-            return object.description
+            return self.plugin_registry.description(storage_config.get('module', className), className)
         else:
             return ''
 
+    def _generate_input_communicate(self, imports_config: List[Dict]) -> str:
+        if not imports_config:
+            return "        self.input_communicate = None"
+        return "        self.input_communicate = InputCommunicate()"
+
+    def _generate_output_storage(self, outputs_config: List[Dict]) -> str:
+        if not outputs_config:
+            return "        self.data_storage = None"
+        return "        self.data_storage = DataStorage(OUTPUT_CONFIG)"
+
 
 def read_code_files(file_path):
     """ read main process code """
@@ -219,112 +293,152 @@ def read_code_files(file_path):
         print(f"read code error: {e}")
         return None, None
 
-def _get_config_from_request():
+def load_exchange_rows(file_path: str) -> List[List[Any]]:
+    """ read the exchange dictionary rows (without the header) from its compiled snapshot """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"exchange dictionary not found: {file_path}")
+    snapshot = load_exchange_dict(file_path)
+    return [[point_id, *row] for point_id, row in zip(snapshot.ids, snapshot.rows)]
+
+
+# template digest -> its dictFlag
+_FLAG_MAPS: Dict[str, Dict[str, str]] = {}
+
+
+def template_flag_map(template_path: str, generator: Optional['CodeGenerator'] = None) -> Dict[str, str]:
+    """ the template's dictFlag (component type -> calling point), read from its cached compiled AST """
+    with open(template_path, 'r', encoding='utf-8') as f:
+        compiled = (generator or CodeGenerator()).compile_template(f.read())
+    flag_map = _FLAG_MAPS.get(compiled.digest)
+    if flag_map is None:
+        flag_map = {}
+        for node in compiled.tree.body:
+            if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == 'dictFlag'
+                                                    for target in node.targets):
+                flag_map = ast.literal_eval(node.value)
+                break
+        _FLAG_MAPS[compiled.digest] = flag_map
+    return dict(flag_map)
+
+
+def _as_list(section) -> List[Dict]:
+    if section is None:
+        return []
+    if isinstance(section, dict):
+        return [section]
+    return list(section)
+
+
+def build_generation_config(input_config, set_config: Dict[str, Any], output_config,
+                            template_path: str = TEMPLATE_PATH, base_dir: str = '.',
+                            generator: Optional['CodeGenerator'] = None) -> Dict[str, Any]:
+    """
+    Build the generator config from the INPUT/SET/OUTPUT yaml contents of one site
+
+    Args:
+        input_config: INPUT_CONFIG, one mapping or a list of them
+        set_config: SET_CONFIG mapping
+        output_config: OUTPUT_CONFIG, one mapping or a list of them
+        template_path: main process template
+        base_dir: directory that relative paths in set_config are resolved against
+        generator: generator whose template cache compiles the template; the default cache when None
+
+    Returns:
+        config for CodeGenerator.generate_energyplus_code
+    """
+    config = {
+        'template_path': template_path,
+        'input_imports': [],
+        'input_loaders': [],
+        'queues': [],
+        'callbacks': [],
+        'exchange_handlers': [],
+        'outputs': [],
+        'storage_init': {},
+        'exchange_data': {'fold': False},
+    }
+    #INPUT_CONFIG
+    for input_item in _as_list(input_config):
+        plugin = INPUT_PLUGINS.get(str(input_item.get('type', '')).lower())
+        if plugin is None:
+            continue
+        import_config = dict(plugin)
+        if input_item.get('name'):
+            import_config['instance_name'] = input_item['name']
+        config['input_imports'].append(import_config)
+        if plugin not in config['input_loaders']:
+            config['input_loaders'].append(dict(plugin))
+
+    #SET_CONFIG
+    exchange_file = set_config.get('exchange_file') or set_config.get('exchangeDataDict')
+    dataDict = load_exchange_rows(os.path.join(base_dir, exchange_file)) if exchange_file else []
+    # fold the dictionary into the generated code: literal tables and handlers over resolved point indices
+    table = None
+    if dataDict and set_config.get('fold_exchange', True):
+        config['exchange_data'] = {'fold': True, 'source': os.path.basename(exchange_file), 'rows': dataDict}
+        table = ExchangeTable({row[0]: list(row[1:]) for row in dataDict}, template_flag_map(template_path, generator))
+    for data in dataDict:
+        flag = EXCHANGE_FLAGS.get(data[-1])
+        if flag is None:
+            continue
+        # one registration per calling point, fanning out to its handlers, and one channel per queue
+        callback = next((callback for callback in config['callbacks'] if callback['type'] == flag['type']), None)
+        if callback is None:
+            config['callbacks'].append({'type': flag['type'], 'handlers': [flag['handler_method']]})
+        elif flag['handler_method'] not in callback['handlers']:
+            callback['handlers'].append(flag['handler_method'])
+        if all(queue['name'] != flag['queue'] for queue in config['queues']):
+            config['queues'].append({'name': flag['queue'], 'policy': set_config.get('queue_policy', 'latest'),
+                                     'maxsize': set_config.get('queue_size', 2),
+                                     'timeout': set_config.get('queue_timeout', 0.1)})
+        # a class keeps only the last definition of a method, so each handler is emitted once
+        if any(handler['name'] == flag['handler_method'] for handler in config['exchange_handlers']):
+            continue
+        handler = {'name': flag['handler_method'], 'queue': flag['queue'], 'calling_points': flag['calling_points']}
+        if table is not None:
+            handler['points'] = [index for calling_point in flag['calling_points']
+                                 for index in table.partition_indices.get(calling_point, ())]
+        config['exchange_handlers'].append(handler)
+
+    #OUTPUT_CONFIG
+    for output_item in _as_list(output_config):
+        if str(output_item.get('type', '')).lower() in STORAGE_TYPES:
+            config['outputs'].append({'name': output_item.get('name'), 'type': output_item['type']})
+    return config
+
+
+def _get_config_from_request(generator: Optional['CodeGenerator'] = None):
     """ get config from request """
     try:
-        config = {}
-        config.update('template_path', 'main.py')
-        #INPUT_CONFIG
-        config.update('INPUT_CONFIG')
-        for input_config in INPUT_CONFIG:
-            if input_config.get('type') == 'http':
-                config['input_imports'].append({
-                    'module': 'httpCommunicate',
-                    'class_name': 'HTTPCommunicate'
-                })
-
-            elif input_config.get('type') == 'modbus':
-                config['input_imports'].append({
-                    'module': 'modbusCommunicate',
-                    'class_name': 'ModbusCommunicate'
-                })
-
-            elif input_config.get('type') == 'websocket':
-                config['input_imports'].append({
-                    'module': 'websocketCommunicate',
-                    'class_name': 'WebSocketCommunicate'
-                })
-        #SET_CONFIG
-        config.update('queues')
-        config.update('callbacks')
-        config.update('exchange_handle')
-        dataDict = preprocess(SET_CONFIG.get('exchange_file'))
-
-        for data in dataDict:
-            if data[-1] == 'set_weather_flag':
-                config['callbacks'].append({
-                'type': 'before_predictor',
-                'handler_method': 'before_predictor_flag'
-            })
-                config['queues'].append({'name': 'weatherData'})
-                config['exchange_handle'].append({
-                    'name': 'weather_data'
-                })
-            elif data[-1] == 'set_hvac_manager_flag':
-                config['callbacks'].append({
-                'type': 'before_hvac_managers',
-                'handler_method': 'before_hvac_managers_flag'
-            })
-                config['queues'].append({'name': 'sensorData'})
-                config['exchange_handle'].append({
-                    'name': 'hvac_manager_flag'
-                })
-            elif data[-1] == 'set_loop_flag':
-                config['callbacks'].append({
-                'type': 'itrator_loop_flag',
-                'handler_method': 'itrator_loop_flag'
-            })
-                config['queues'].append({'name': 'controlData'})
-                config['exchange_handle'].append({
-                    'name': 'time_step_loop_flag'
-                })
-
-            elif data[-1] == 'set_heat_flag':
-                config['callbacks'].append({
-                'type': 'init_heat_flag',
-                'handler_method': 'init_heat_flag'
-                    })
-                config['exchange_handle'].append({
-                    'name': 'init_heat_flag'
-                })
-                config['queues'].append({'name': 'controlData'})
-            else:
-                pass
-        #OUTPUT_CONFIG
-        config.update('output_imports')
-        for output_config in OUTPUT_CONFIG:
-            if output_config.get('type') == 'mysql':
-                config['output_imports'].append({
-                    'module': 'mysqlCommunicate',
-                    'class_name': 'HTTPCommunicate'
-                })
-        return config
+        return build_generation_config(INPUT_CONFIG, SET_CONFIG, OUTPUT_CONFIG,
+                                       base_dir=os.path.dirname(os.path.abspath(__file__)), generator=generator)
     except Exception as e:
         print(f"get config error: {e}")
         return None
 
 def main():
-    generator = CodeGenerator()
-
-    config = _get_config_from_request()
-    template = read_code_files('main.py')
+    from incrementalBuild import IncrementalGenerator
+    from startupOptimize import emit_fast_variant
 
+    generator = IncrementalGenerator(CodeGenerator())
 
+    config = _get_config_from_request(generator.generator)
 
     try:
-        generated_code = generator.generate_energyplus_code(config)
-
         output_path = 'generated_energyplus.py'
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(generated_code)
-
-        print(f"code Generated: {output_path}")
+        report = generator.generate(config, output_path)
+        print(f"code Generated: {report}")
 
         try:
-            ast.parse(generated_code)
+            with open(output_path, 'r', encoding='utf-8') as f:
+                ast.parse(f.read())
         except SyntaxError as e:
             print(f"error: {e}")
 
+        fast = emit_fast_variant(output_path, profile=SET_CONFIG.get('profile_import_time', False))
+        print(f"startup-optimized variant: {fast['path']}"
+              + (f", import-time profile: {fast['profile_path']}" if fast['profile_path'] else ''))
+
     except Exception as e:
         print(f"fail: {e}")
 
@@ -0,0 +1,256 @@
+"""
+Exchange points of the simulator, pre-partitioned by EnergyPlus calling point
+
+dictFlag in the simulation template maps each component type to the callback that
+may write it. Partitioning once, when the exchange dictionary is loaded, lets every
+callback walk only its own actuators instead of the whole incoming list.
+
+Per-point metadata (component type, control type, actuator key) is interned once in
+the table; per-timestep values travel as ValueFrame vectors indexed by point index,
+so the callback path allocates no per-point objects.
+"""
+import logging
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from exchangeSnapshot import OUTPUT_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangeTable:
+    """
+    Exchange dictionary partitioned by calling point
+
+    Args:
+        data_dict: point id -> [component_type, control_type, actuator_key, ...]
+        flag_map: component type -> calling point (dictFlag)
+
+    Attributes:
+        point_ids: actuator point ids; the position is the point index
+        point_index: actuator point id -> point index
+        metadata: per point index, the interned (component_type, control_type, actuator_key)
+        calling_point_of: actuator point id -> calling point
+        by_calling_point: calling point -> actuator point ids, in dictionary order
+        partition_indices: calling point -> array of point indices
+        unassigned: actuator point ids whose component type has no calling point
+        invalid_values: point id -> number of non-numeric values fill() skipped
+    """
+
+    def __init__(self, data_dict: Dict[Any, List[Any]], flag_map: Dict[str, str]):
+        self.data_dict = data_dict
+        self.point_ids = []
+        self.point_index = {}
+        self.metadata = []
+        self.calling_point_of = {}
+        self.by_calling_point = {}
+        self.partition_indices = {}
+        self.unassigned = []
+        self.invalid_values = {}
+        for point_id, row in data_dict.items():
+            if not row or row[0] in OUTPUT_TYPES:
+                continue
+            calling_point = flag_map.get(row[0])
+            if calling_point is None:
+                self.unassigned.append(point_id)
+                continue
+            index = len(self.point_ids)
+            self.point_ids.append(point_id)
+            self.point_index[point_id] = index
+            self.metadata.append(tuple(sys.intern(str(part)) for part in row[:3]))
+            self.calling_point_of[point_id] = calling_point
+            self.by_calling_point.setdefault(calling_point, []).append(point_id)
+            self.partition_indices.setdefault(calling_point, array('l')).append(index)
+        if self.unassigned:
+            logger.warning(f"{len(self.unassigned)} exchange points have no calling point in dictFlag "
+                           f"and will never be written, e.g. {self.unassigned[:5]}")
+
+    def __len__(self):
+        return len(self.point_ids)
+
+    def points(self, calling_point: str) -> List[Any]:
+        return self.by_calling_point.get(calling_point, [])
+
+    def partition(self, values: Dict[Any, Any]) -> Dict[str, Dict[Any, Any]]:
+        """Split one input reading (point id -> value) by calling point, dropping unknown ids"""
+        partitions = {calling_point: {} for calling_point in self.by_calling_point}
+        calling_point_of = self.calling_point_of
+        for point_id, value in values.items():
+            calling_point = calling_point_of.get(point_id)
+            if calling_point is not None:
+                partitions[calling_point][point_id] = value
+        return partitions
+
+    def fill(self, frame: 'ValueFrame', values: Dict[Any, Any]) -> int:
+        """
+        Copy one input reading into frame; returns the number of points filled
+
+        A value that is not a number (None, unparsable text) is skipped and counted in
+        invalid_values: its point stays absent from this timestep and the rest of the
+        reading is still used.
+        """
+        point_index = self.point_index
+        frame_values, stamp, generation = frame.values, frame.stamp, frame.generation
+        filled = 0
+        for point_id, value in values.items():
+            index = point_index.get(point_id)
+            if index is None:
+                continue
+            try:
+                frame_values[index] = float(value)
+            except (TypeError, ValueError):
+                self._invalid(point_id, value)
+                continue
+            stamp[index] = generation
+            filled += 1
+        return filled
+
+    def _invalid(self, point_id, value):
+        count = self.invalid_values.get(point_id, 0)
+        if not count:
+            logger.warning(f"exchange point {point_id} received a non-numeric value {value!r}; skipped")
+        self.invalid_values[point_id] = count + 1
+
+
+class ValueFrame:
+    """
+    One timestep of actuator values, indexed by point index
+
+    A value is present when its stamp equals the frame generation, so clear() is O(1)
+    instead of rewriting the whole vector every timestep.
+    """
+
+    __slots__ = ('values', 'stamp', 'generation')
+
+    def __init__(self, size: int):
+        self.values = array('d', bytes(8 * size))
+        self.stamp = array('l', bytes(array('l').itemsize * size))
+        self.generation = 0
+
+    def clear(self):
+        self.generation += 1
+
+    def set(self, index: int, value: float):
+        self.values[index] = value
+        self.stamp[index] = self.generation
+
+    def present(self, indices: Iterable[int]) -> Iterator[Tuple[int, float]]:
+        """(index, value) of the indices that received a value this timestep"""
+        values, stamp, generation = self.values, self.stamp, self.generation
+        for index in indices:
+            if stamp[index] == generation:
+                yield index, values[index]
+
+
+class FrameRing:
+    """
+    Preallocated ValueFrames handed out round-robin
+
+    A frame is reused `capacity` acquisitions later, so consumers must be fewer than
+    `capacity` frames behind the producer (keep queue depth below capacity).
+    """
+
+    def __init__(self, size: int, capacity: int = 4):
+        self.frames = [ValueFrame(size) for _ in range(capacity)]
+        self.position = 0
+
+    def acquire(self) -> ValueFrame:
+        frame = self.frames[self.position]
+        self.position = (self.position + 1) % len(self.frames)
+        frame.clear()
+        return frame
+
+
+class ActuatorHandleCache:
+    """
+    EnergyPlus actuator handles resolved once per state
+
+    get_actuator_handle is a string lookup inside EnergyPlus; doing it on every write
+    of every timestep dominates the callbacks. resolve() looks up every actuator of the
+    table once, after api_data_fully_ready, and keeps the handles in a flat array
+    indexed by point index.
+    """
+
+    def __init__(self, table: ExchangeTable):
+        self.table = table
+        self.point_ids = table.point_ids
+        self.handles = array('l', [-1] * len(self.point_ids))
+        self.handle_of = {}
+        self.by_key = {}
+        self.unresolved = set()
+        self.invalid = []
+        self.resolved = False
+
+    def resolve(self, api, state) -> bool:
+        """Resolve every actuator handle; returns False while the API data is not ready yet"""
+        if self.resolved:
+            return True
+        if not api.exchange.api_data_fully_ready(state):
+            return False
+        get_actuator_handle = api.exchange.get_actuator_handle
+        self.invalid = []
+        for index, (component_type, control_type, actuator_key) in enumerate(self.table.metadata):
+            handle = get_actuator_handle(state, component_type, control_type, actuator_key)
+            self.handles[index] = handle
+            self.handle_of[self.point_ids[index]] = handle
+            self.by_key[component_type, control_type, actuator_key] = handle
+            if handle == -1:
+                self.invalid.append(self.point_ids[index])
+        if self.invalid:
+            logger.warning(f"{len(self.invalid)} of {len(self.point_ids)} actuators could not be resolved "
+                           f"(handle -1) and will be skipped: {self.invalid[:10]}")
+        self.resolved = True
+        return True
+
+    def reset(self):
+        """Forget the handles, e.g. after api.state_manager.reset_state"""
+        self.handles = array('l', [-1] * len(self.point_ids))
+        self.handle_of = {}
+        self.by_key = {}
+        self.unresolved = set()
+        self.invalid = []
+        self.resolved = False
+
+    def handle_for(self, api, state, component_type, control_type, actuator_key) -> int:
+        """
+        Handle of an actuator given by name, looked up in EnergyPlus until it resolves
+
+        Before api_data_fully_ready every lookup fails, so a -1 from then is not cached and
+        the lookup is retried on the next call. Once the data is ready, -1 means the
+        actuator does not exist: it is cached like resolve() does and logged once.
+        """
+        key = (component_type, control_type, actuator_key)
+        handle = self.by_key.get(key)
+        if handle is None:
+            handle = api.exchange.get_actuator_handle(state, component_type, control_type, actuator_key)
+            if handle != -1 or api.exchange.api_data_fully_ready(state):
+                self.by_key[key] = handle
+            if handle == -1 and key not in self.unresolved:
+                self.unresolved.add(key)
+                logger.warning(f"actuator {key} could not be resolved (handle -1), its values are skipped")
+        return handle
+
+    def set_values(self, api, state, values: Iterable[Tuple[Any, float]]) -> int:
+        """Write (point id, value) pairs in one pass; returns the number of values written"""
+        set_actuator_value = api.exchange.set_actuator_value
+        handle_of = self.handle_of
+        written = 0
+        for point_id, value in values:
+            handle = handle_of.get(point_id, -1)
+            if handle != -1:
+                set_actuator_value(state, handle, value)
+                written += 1
+        return written
+
+    def set_frame(self, api, state, frame: ValueFrame, calling_point: str) -> int:
+        """Write the values of one calling point present in frame; returns the number written"""
+        set_actuator_value = api.exchange.set_actuator_value
+        handles = self.handles
+        written = 0
+        for index, value in frame.present(self.table.partition_indices.get(calling_point, ())):
+            handle = handles[index]
+            if handle != -1:
+                set_actuator_value(state, handle, value)
+                written += 1
+        return written
@@ -0,0 +1,115 @@
+"""
+Concurrent input polling with a per-timestep deadline
+
+InputCommunicate used to call get_data() on every input one after the other, so a
+timestep waited for the sum of all gateway latencies. AsyncInputPoller polls every
+input concurrently on a background event loop and waits at most `deadline` seconds;
+inputs that miss it contribute their last known values instead.
+
+Inputs are the plugin instances in InputCommunicate.inputs. A plugin may provide a
+coroutine `get_data_async()`; otherwise its blocking get_data() runs on a worker thread.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InputStatus:
+    """Per-input bookkeeping: last good reading and how often the deadline was missed"""
+
+    __slots__ = ('name', 'last_data', 'last_latency', 'misses', 'errors', 'pending')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.last_data = {}
+        self.last_latency = None
+        self.misses = 0
+        self.errors = 0
+        self.pending = None
+
+
+class AsyncInputPoller:
+    """
+    Poll all inputs concurrently, once per timestep
+
+    Args:
+        inputs: connected input plugin instances
+        deadline: seconds a timestep waits for inputs before using last known values
+    """
+
+    def __init__(self, inputs: List[Any], deadline: float = 1.0):
+        self.inputs = list(inputs)
+        self.deadline = deadline
+        self.status = [InputStatus(getattr(item, 'name', None) or f"input{i}") for i, item in enumerate(self.inputs)]
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.inputs)), thread_name_prefix='input-poll')
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='input-poll-loop', daemon=True)
+        self._thread.start()
+
+    def poll(self) -> List[Dict[Any, Any]]:
+        """Blocking entry point for the simulation thread: one reading per input, in input order"""
+        future = asyncio.run_coroutine_threadsafe(self.poll_async(), self._loop)
+        return future.result()
+
+    async def poll_async(self) -> List[Dict[Any, Any]]:
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        started_now = []
+        for item, status in zip(self.inputs, self.status):
+            if status.pending is not None and status.pending.done():
+                status.pending = None
+            # an input still busy with an earlier timestep is not asked again, and not waited for:
+            # it keeps contributing its last values until that request completes
+            if status.pending is None:
+                status.pending = asyncio.ensure_future(self._fetch(loop, item, status, started))
+                started_now.append(status.pending)
+
+        if started_now:
+            await asyncio.wait(started_now, timeout=self.deadline)
+
+        readings = []
+        for status in self.status:
+            task = status.pending
+            if task is not None and task.done():
+                status.pending = None
+            elif task is not None:
+                status.misses += 1
+            readings.append(status.last_data)
+        return readings
+
+    async def _fetch(self, loop, item, status: InputStatus, started: float):
+        try:
+            get_data_async = getattr(item, 'get_data_async', None)
+            if get_data_async is not None:
+                data = await get_data_async()
+            else:
+                data = await loop.run_in_executor(self._executor, item.get_data)
+            if data is not None:
+                status.last_data = data
+            status.last_latency = time.monotonic() - started
+        except Exception as e:
+            status.errors += 1
+            logger.error(f"input {status.name} failed: {e}")
+
+    def metrics(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {status.name: {'last_latency': status.last_latency, 'misses': status.misses,
+                              'errors': status.errors} for status in self.status}
+
+    def close(self):
+        """Stop the event loop and the fetch threads; waits for a fetch still in flight"""
+        async def _cancel_pending():
+            for status in self.status:
+                if status.pending is not None:
+                    status.pending.cancel()
+
+        asyncio.run_coroutine_threadsafe(_cancel_pending(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        if not self._thread.is_alive():
+            self._loop.close()
+        self._executor.shutdown(wait=True, cancel_futures=True)
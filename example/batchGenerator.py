@@ -0,0 +1,197 @@
+"""
+Batch generation of co-simulation scripts for many sites
+
+A source is either a directory whose sub-directories each hold INPUT_CONFIG.yaml,
+SET_CONFIG.yaml and OUTPUT_CONFIG.yaml, or a manifest yaml:
+
+    sites:
+      - name: building_a
+        input: building_a/INPUT_CONFIG.yaml
+        set: building_a/SET_CONFIG.yaml
+        output: building_a/OUTPUT_CONFIG.yaml
+
+Usage:
+    python batchGenerator.py SOURCE -o OUT_DIR [-j WORKERS]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from CodeGenerator import TEMPLATE_PATH, CodeGenerator, build_generation_config, load_yaml
+from incrementalBuild import IncrementalGenerator
+from templateCache import CompiledTemplate, TemplateCache
+
+CONFIG_FILES = {'input': 'INPUT_CONFIG.yaml', 'set': 'SET_CONFIG.yaml', 'output': 'OUTPUT_CONFIG.yaml'}
+OUTPUT_NAME = 'generated_energyplus.py'
+REPORT_NAME = 'batch_report.json'
+
+
+class GenerationJob:
+    """One site to generate: its name and the paths of its three config files"""
+
+    def __init__(self, name: str, input_path: str, set_path: str, output_path: str):
+        self.name = name
+        self.input_path = input_path
+        self.set_path = set_path
+        self.output_path = output_path
+
+    @property
+    def base_dir(self) -> str:
+        return os.path.dirname(os.path.abspath(self.set_path))
+
+
+class JobResult:
+    """Outcome of one job, as written to the batch report"""
+
+    def __init__(self, name: str, ok: bool, output_path: Optional[str] = None,
+                 sha256: Optional[str] = None, error: Optional[str] = None, seconds: float = 0.0,
+                 rebuilt: Optional[List[str]] = None, written: bool = False):
+        self.name = name
+        self.ok = ok
+        self.output_path = output_path
+        self.sha256 = sha256
+        self.error = error
+        self.seconds = seconds
+        self.rebuilt = rebuilt or []
+        self.written = written
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'ok': self.ok, 'output_path': self.output_path,
+                'sha256': self.sha256, 'error': self.error, 'seconds': round(self.seconds, 6),
+                'rebuilt': self.rebuilt, 'written': self.written}
+
+
+def discover_jobs(source: str) -> List[GenerationJob]:
+    """Collect the jobs of a site directory or manifest, sorted by name"""
+    jobs = []
+    if os.path.isdir(source):
+        for entry in sorted(os.listdir(source)):
+            site_dir = os.path.join(source, entry)
+            paths = {key: os.path.join(site_dir, file) for key, file in CONFIG_FILES.items()}
+            if os.path.isdir(site_dir) and all(os.path.exists(path) for path in paths.values()):
+                jobs.append(GenerationJob(entry, paths['input'], paths['set'], paths['output']))
+    else:
+        manifest = load_yaml(source) or {}
+        manifest_dir = os.path.dirname(os.path.abspath(source))
+        for site in manifest.get('sites', []):
+            paths = {key: os.path.join(manifest_dir, site[key]) for key in CONFIG_FILES}
+            jobs.append(GenerationJob(site['name'], paths['input'], paths['set'], paths['output']))
+
+    names = [job.name for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate site names: {', '.join(duplicates)}")
+    return sorted(jobs, key=lambda job: job.name)
+
+
+_worker_generator = None
+_worker_out_dir = None
+
+
+def _init_worker(compiled: Optional[CompiledTemplate], out_dir: str):
+    """Seed the worker's template cache with the template compiled by the parent process"""
+    global _worker_generator, _worker_out_dir
+    cache = TemplateCache()
+    if compiled is not None:
+        cache.put(compiled)
+    _worker_generator = CodeGenerator(cache)
+    _worker_out_dir = out_dir
+
+
+def _run_job(job: GenerationJob, template_path: str) -> JobResult:
+    start = time.perf_counter()
+    try:
+        config = build_generation_config(load_yaml(job.input_path), load_yaml(job.set_path) or {},
+                                         load_yaml(job.output_path), template_path=template_path,
+                                         base_dir=job.base_dir, generator=_worker_generator)
+        site_dir = os.path.join(_worker_out_dir, job.name)
+        os.makedirs(site_dir, exist_ok=True)
+        output_path = os.path.join(site_dir, OUTPUT_NAME)
+        report = IncrementalGenerator(_worker_generator).generate(config, output_path)
+
+        with open(output_path, 'rb') as f:
+            generated_code = f.read()
+        compile(generated_code, job.name, 'exec')
+        digest = hashlib.sha256(generated_code).hexdigest()
+        return JobResult(job.name, True, output_path, digest, seconds=time.perf_counter() - start,
+                         rebuilt=report.rebuilt, written=report.written)
+    except Exception as e:
+        return JobResult(job.name, False, error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - start)
+
+
+def batch_generate(jobs: List[GenerationJob], out_dir: str, workers: Optional[int] = None,
+                   template_path: str = TEMPLATE_PATH) -> List[JobResult]:
+    """
+    Generate every job on a process pool
+
+    The template is parsed once here and shipped to each worker through the pool
+    initializer. Results come back in job order, and a job failure never stops the batch.
+
+    Args:
+        jobs: jobs from discover_jobs
+        out_dir: each job writes OUT_DIR/<name>/generated_energyplus.py
+        workers: pool size, defaults to the number of cores; 1 runs in-process
+
+    Returns:
+        one JobResult per job, in job order
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with open(template_path, 'r', encoding='utf-8') as f:
+        compiled = CodeGenerator(TemplateCache()).compile_template(f.read())
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker(compiled, out_dir)
+        return [_run_job(job, template_path) for job in jobs]
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(compiled, out_dir)) as executor:
+        return list(executor.map(_run_job, jobs, [template_path] * len(jobs), chunksize=chunksize))
+
+
+def write_report(results: List[JobResult], report_path: str):
+    report = {
+        'total': len(results),
+        'succeeded': sum(1 for result in results if result.ok),
+        'failed': sum(1 for result in results if not result.ok),
+        'jobs': [result.to_dict() for result in results],
+    }
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Generate co-simulation scripts for many sites')
+    parser.add_argument('source', help='directory of site config folders, or a manifest yaml')
+    parser.add_argument('-o', '--out-dir', default='generated')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='process pool size (default: cores)')
+    parser.add_argument('--template', default=TEMPLATE_PATH)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    jobs = discover_jobs(args.source)
+    start = time.perf_counter()
+    results = batch_generate(jobs, args.out_dir, args.workers, args.template)
+    elapsed = time.perf_counter() - start
+
+    report_path = os.path.join(args.out_dir, REPORT_NAME)
+    write_report(results, report_path)
+    for result in results:
+        if result.ok:
+            status = f"ok, rebuilt: {', '.join(result.rebuilt) or 'none'}" if result.written else 'unchanged'
+        else:
+            status = f"FAILED {result.error}"
+        print(f"{result.name}: {status}")
+    failed = sum(1 for result in results if not result.ok)
+    print(f"{len(results) - failed}/{len(results)} generated in {elapsed:.2f}s, report: {report_path}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""
+Per-callback actuator write cost: handle lookup per write vs. resolved handle cache
+
+Runs against benchmarks/stubEnergyPlus.py, so no EnergyPlus install is needed.
+
+    python benchmarks/bench_actuator_handles.py [--points 100,1000,5000] [--callbacks N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from actuatorTable import ActuatorHandleCache, ExchangeTable
+from stubEnergyPlus import StubEnergyPlusAPI
+
+
+class Actuator_obj:
+    def __init__(self, component_type, control_type, actuator_key, value, point_id=None):
+        self.point_id = point_id
+        self.control_type = control_type
+        self.actuator_key = actuator_key
+        self.value = value
+        self.component_type = component_type
+
+
+def build(points: int, linear_lookup: bool):
+    data_dict = {f'P{i}': ['Unitary HVAC', 'Sensible Load Request', f'UNIT {i}'] for i in range(points)}
+    # a few rows that EnergyPlus does not know, to exercise the -1 path
+    data_dict['BAD'] = ['Unitary HVAC', 'Sensible Load Request', 'MISSING UNIT']
+    api = StubEnergyPlusAPI([tuple(row) for key, row in data_dict.items() if key != 'BAD'], linear_lookup)
+    table = ExchangeTable(data_dict, {'Unitary HVAC': 'itrator_loop_flag'})
+    actuators = [Actuator_obj(*row[:3], value=1.0, point_id=point_id) for point_id, row in data_dict.items()]
+    return api, table, actuators
+
+
+def legacy_callback(api, state, actuators):
+    for d in actuators:
+        handle = api.exchange.get_actuator_handle(state, d.component_type, d.control_type, d.actuator_key)
+        if handle == -1:
+            continue
+        api.exchange.set_actuator_value(state, handle, d.value)
+
+
+def per_callback(fn, callbacks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(callbacks):
+        fn()
+    return (time.perf_counter() - start) / callbacks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', default='100,1000,5000')
+    parser.add_argument('--callbacks', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'points':>7} {'lookup':>7} {'legacy us':>11} {'cached us':>11} {'resolve ms':>11} {'speedup':>8}")
+    for points in (int(p) for p in args.points.split(',')):
+        for linear_lookup in (True, False):
+            api, table, actuators = build(points, linear_lookup)
+            state = api.state_manager.new_state()
+            legacy = per_callback(lambda: legacy_callback(api, state, actuators), args.callbacks)
+
+            cache = ActuatorHandleCache(table)
+            start = time.perf_counter()
+            cache.resolve(api, state)
+            resolve_s = time.perf_counter() - start
+            cached = per_callback(
+                lambda: cache.set_values(api, state, ((d.point_id, d.value) for d in actuators)), args.callbacks)
+
+            print(f"{points:>7} {'linear' if linear_lookup else 'hash':>7} {legacy * 1e6:>11.1f} "
+                  f"{cached * 1e6:>11.1f} {resolve_s * 1e3:>11.2f} {legacy / cached:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Timestep input latency: sequential get_data() vs. concurrent AsyncInputPoller
+
+Fake gateways answer after a fixed delay; one of them is slower than the deadline.
+
+    python benchmarks/bench_async_input.py [--inputs 8] [--latency 0.05] [--deadline 0.2]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asyncInput import AsyncInputPoller
+
+
+class FakeGateway:
+    def __init__(self, name: str, latency: float):
+        self.name = name
+        self.latency = latency
+        self.calls = 0
+
+    def get_data(self):
+        time.sleep(self.latency)
+        self.calls += 1
+        return {f'{self.name}.point': float(self.calls)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--inputs', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--deadline', type=float, default=0.2)
+    parser.add_argument('--timesteps', type=int, default=5)
+    args = parser.parse_args()
+
+    gateways = [FakeGateway(f'gw{i}', args.latency) for i in range(args.inputs)]
+    gateways.append(FakeGateway('slow', args.deadline * 3))
+
+    start = time.perf_counter()
+    for _ in range(args.timesteps):
+        for gateway in gateways:
+            gateway.get_data()
+    sequential = (time.perf_counter() - start) / args.timesteps
+
+    poller = AsyncInputPoller(gateways, deadline=args.deadline)
+    start = time.perf_counter()
+    for _ in range(args.timesteps):
+        readings = poller.poll()
+    concurrent = (time.perf_counter() - start) / args.timesteps
+    misses = poller.metrics()['slow']['misses']
+    poller.close()
+
+    print(f"{len(gateways)} inputs, {args.latency * 1e3:.0f} ms each, one at {args.deadline * 3e3:.0f} ms")
+    print(f"  sequential   {sequential * 1e3:8.1f} ms/timestep")
+    print(f"  concurrent   {concurrent * 1e3:8.1f} ms/timestep (deadline {args.deadline * 1e3:.0f} ms, "
+          f"slow input missed {misses}/{args.timesteps}, readings {len(readings)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Generation latency: a fresh generator process per request vs. the generation daemon
+
+    cold process      python batchGenerator.py for one site (what a deploy step pays today)
+    daemon, cached    generate request for a site whose inputs did not change
+    daemon, changed   generate request right after one of the site's yaml files changed
+    watch             time from editing the exchange dictionary until the daemon has
+                      regenerated the site on its own
+
+    python benchmarks/bench_daemon.py [--sites 4] [--points 200] [--requests 200]
+"""
+import argparse
+import csv
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+EXAMPLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, EXAMPLE_DIR)
+
+import yaml
+
+from warmWorker import WarmWorkerClient, wait_for_socket
+
+
+def write_site(site_dir: str, points: int):
+    os.makedirs(site_dir, exist_ok=True)
+    with open(os.path.join(site_dir, 'exchange.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'component_type', 'control_type', 'actuator_key', 'flag'])
+        for i in range(points):
+            writer.writerow([f'P{i}', 'Unitary HVAC', 'Sensible Load Request', f'UNIT {i}', 'set_loop_flag'])
+    configs = {'INPUT_CONFIG': {'type': 'HTTP', 'name': 'link1', 'url': '127.0.0.1:666', 'timeout': 120},
+               'SET_CONFIG': {'weather_file': 'weather.epw', 'idf_file': 'model.idf', 'time': 72,
+                              'exchangeDataDict': 'exchange.csv'},
+               'OUTPUT_CONFIG': {'type': 'sqlite', 'path': 'results.db'}}
+    for name, content in configs.items():
+        with open(os.path.join(site_dir, f'{name}.yaml'), 'w') as f:
+            yaml.safe_dump(content, f)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def report(name: str, values):
+    values = sorted(values)
+    print(f"  {name:24s} median {statistics.median(values) * 1e3:8.2f} ms   "
+          f"p90 {values[int(len(values) * 0.9) - 1] * 1e3:8.2f} ms   max {values[-1] * 1e3:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sites', type=int, default=4)
+    parser.add_argument('--points', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--cold-runs', type=int, default=5)
+    parser.add_argument('--edits', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'sites')
+        out_dir = os.path.join(tmp, 'generated')
+        for i in range(args.sites):
+            write_site(os.path.join(source, f'site{i}'), args.points)
+        with open(os.path.join(tmp, 'one.yaml'), 'w') as f:
+            yaml.safe_dump({'sites': [{'name': 'site0', 'input': 'sites/site0/INPUT_CONFIG.yaml',
+                                       'set': 'sites/site0/SET_CONFIG.yaml',
+                                       'output': 'sites/site0/OUTPUT_CONFIG.yaml'}]}, f)
+
+        cold = []
+        for _ in range(args.cold_runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(EXAMPLE_DIR, 'batchGenerator.py'),
+                            os.path.join(tmp, 'one.yaml'), '-o', os.path.join(tmp, 'cold'), '-j', '1'],
+                           check=True, capture_output=True)
+            cold.append(time.perf_counter() - start)
+
+        socket_path = os.path.join(tmp, 'codegen.sock')
+        port = free_port()
+        daemon = subprocess.Popen([sys.executable, os.path.join(EXAMPLE_DIR, 'generationDaemon.py'), source,
+                                   '-o', out_dir, '--socket', socket_path, '--http', f'127.0.0.1:{port}'],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            assert wait_for_socket(socket_path), 'generation daemon did not start'
+            client = WarmWorkerClient(socket_path)
+            cached, cached_http, changed, watch = [], [], [], []
+            for i in range(args.requests):
+                start = time.perf_counter()
+                reply = client.request({'cmd': 'generate', 'site': f'site{i % args.sites}'})
+                cached.append(time.perf_counter() - start)
+                assert reply['ok'] and reply['cached'], reply
+
+                start = time.perf_counter()
+                connection = http.client.HTTPConnection('127.0.0.1', port)
+                connection.request('GET', f'/generate?site=site{i % args.sites}')
+                reply = json.loads(connection.getresponse().read())
+                connection.close()
+                cached_http.append(time.perf_counter() - start)
+                assert reply['ok'], reply
+
+            set_path = os.path.join(source, 'site1', 'SET_CONFIG.yaml')
+            exchange_path = os.path.join(source, 'site2' if args.sites > 2 else 'site0', 'exchange.csv')
+            for i in range(args.edits):
+                with open(set_path, 'a') as f:
+                    f.write(f'# edit {i}\n')
+                start = time.perf_counter()
+                reply = client.request({'cmd': 'generate', 'site': 'site1'})
+                changed.append(time.perf_counter() - start)
+                assert reply['ok'], reply
+
+                site = os.path.basename(os.path.dirname(exchange_path))
+                before = client.request({'cmd': 'status'})['sites'][site]['generations']
+                with open(exchange_path, 'a', newline='') as f:
+                    csv.writer(f).writerow([f'E{i}', 'Unitary HVAC', 'Sensible Load Request', f'EXTRA {i}',
+                                            'set_loop_flag'])
+                start = time.perf_counter()
+                while client.request({'cmd': 'status'})['sites'][site]['generations'] == before:
+                    time.sleep(0.001)
+                watch.append(time.perf_counter() - start)
+            status = client.request({'cmd': 'status'})
+            client.request({'cmd': 'shutdown'})
+            client.close()
+        finally:
+            daemon.wait(10)
+
+    print(f"{args.sites} sites, {args.points}-point exchange dictionaries")
+    report('cold process', cold)
+    report('daemon, cached (unix)', cached)
+    report('daemon, cached (http)', cached_http)
+    report('daemon, changed (unix)', changed)
+    report('watch, edit to output', watch)
+    print(f"  daemon served {status['requests']} generate requests with {status['regenerations']} regenerations")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Exchange dictionary load time: workbook walk vs. compiled snapshot
+
+xlrd is optional here, so the workbook side is measured on a CSV export of the same
+table; a real .xlsx walk through xlrd is considerably slower than the CSV read.
+
+    python benchmarks/bench_exchange_snapshot.py [--sizes 1000,10000,50000]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exchangeSnapshot import compile_snapshot, load_exchange_dict, read_workbook_rows, ExchangeSnapshot
+
+COMPONENTS = [('Lights', 'Electricity Rate', 'set_weather_flag'),
+              ('Zone Temperature Control', 'Cooling Setpoint', 'set_hvac_manager_flag'),
+              ('Unitary HVAC', 'Sensible Load Request', 'set_loop_flag'),
+              ('Variable', 'Zone Mean Air Temperature', ''),
+              ('Meter', 'Electricity:Facility', '')]
+
+
+def write_table(path: str, size: int):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'component_type', 'control_type', 'actuator_key', 'flag'])
+        for i in range(size):
+            component, control, flag = COMPONENTS[i % len(COMPONENTS)]
+            writer.writerow([f'P{i:06d}', component, control, f'ZONE {i // 10}', flag])
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,10000,50000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'workbook ms':>12} {'compile ms':>11} {'snapshot ms':>12} {'snapshot KiB':>13}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(s) for s in args.sizes.split(',')):
+            table_path = os.path.join(workdir, f'dict_{size}.csv')
+            write_table(table_path, size)
+
+            walk_s = best_of(lambda: ExchangeSnapshot.from_rows(read_workbook_rows(table_path)), args.repeat)
+            compile_s = best_of(lambda: compile_snapshot(table_path), 1)
+            load_s = best_of(lambda: load_exchange_dict(table_path), args.repeat)
+            assert len(load_exchange_dict(table_path)) == size
+            snapshot_kib = os.path.getsize(table_path + '.snapshot') / 1024
+
+            print(f"{size:>8} {walk_s * 1e3:>12.2f} {compile_s * 1e3:>11.2f} {load_s * 1e3:>12.2f} {snapshot_kib:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+HTTP input throughput and per-timestep latency against the local stand-in gateway
+
+    python benchmarks/bench_http_input.py [--timesteps 300] [--endpoints 4] [--points 200]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from httpCommunicate import httpCommunication
+from httpStandIn import start_server
+
+
+def bare_timestep(urls, timeout):
+    """The previous plugin: a fresh requests.get (and TCP connection) per endpoint"""
+    data = {}
+    for url in urls:
+        data.update(requests.get(f"http://{url}", timeout=timeout).json()['data'])
+    return data
+
+
+def run(name, step, timesteps, gateway):
+    requests_before = gateway.requests
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(timesteps):
+        step_start = time.perf_counter()
+        data = step()
+        latencies.append(time.perf_counter() - step_start)
+        assert data, name
+    elapsed = time.perf_counter() - start
+    sent = gateway.requests - requests_before
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:34s} {sent / elapsed:>9.0f} {timesteps / elapsed:>10.0f} "
+          f"{statistics.median(latencies) * 1e3:>8.2f} {p99 * 1e3:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--timesteps', type=int, default=300)
+    parser.add_argument('--endpoints', type=int, default=4)
+    parser.add_argument('--points', type=int, default=200)
+    args = parser.parse_args()
+
+    server, base, gateway = start_server(points=args.points, change_every=0.05)
+    urls = [f"{base}/points/zone{i}" for i in range(args.endpoints)]
+    timeout = 5
+
+    pooled = httpCommunication()
+    pooled.connect({'name': 'pooled', 'url': urls[0], 'timeout': timeout, 'endpoints': urls})
+    batched = httpCommunication()
+    batched.connect({'name': 'batched', 'url': urls[0], 'timeout': timeout, 'endpoints': urls,
+                     'batch_url': f"{base}/batch"})
+
+    print(f"{args.endpoints} endpoints x {args.points} points per timestep")
+    print(f"{'variant':34s} {'req/s':>9} {'steps/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    run('bare requests.get (before)', lambda: bare_timestep(urls, timeout), args.timesteps, gateway)
+    run('pooled keep-alive + conditional', pooled.get_data, args.timesteps, gateway)
+    run('pooled keep-alive, batched', batched.get_data, args.timesteps, gateway)
+
+    pooled.close()
+    batched.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
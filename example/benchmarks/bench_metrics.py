@@ -0,0 +1,73 @@
+"""
+Cost of callback instrumentation: plain call vs. metrics disabled vs. metrics enabled
+
+Then a whole stand-in run (benchmarks/bench_suite.py's generated site) with metrics
+enabled, printing the per-stage breakdown and the exported Prometheus text size.
+
+    python benchmarks/bench_metrics.py [--calls 200000] [--points 100] [--timesteps 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import FakeInput, Site
+from callbackMetrics import CallbackMetrics, MetricsExporter
+
+
+class Simulator:
+    def itrator_loop_flag(self, state):
+        return state
+
+
+def per_call(function, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function(None)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--points', type=int, default=100)
+    parser.add_argument('--timesteps', type=int, default=500)
+    args = parser.parse_args()
+
+    simulator = Simulator()
+    plain = per_call(simulator.itrator_loop_flag, args.calls)
+    disabled = per_call(CallbackMetrics(False).wrap('itrator_loop_flag', simulator.itrator_loop_flag), args.calls)
+    enabled = per_call(CallbackMetrics(True).wrap('itrator_loop_flag', simulator.itrator_loop_flag), args.calls)
+    print(f"per callback, {args.calls} calls")
+    print(f"  {'plain':20s} {plain * 1e9:8.0f} ns")
+    print(f"  {'metrics disabled':20s} {disabled * 1e9:8.0f} ns  (+{(disabled - plain) * 1e9:.0f} ns)")
+    print(f"  {'metrics enabled':20s} {enabled * 1e9:8.0f} ns  (+{(enabled - plain) * 1e9:.0f} ns)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        site = Site(tmp, args.points)
+        module = site.module
+        module.metrics = CallbackMetrics(True)
+        site.use_stub_api(args.timesteps, 0.0005)
+        calculation = module.EnergyPlusCaculation()
+        calculation.input_communicate.instances = {'link1': FakeInput(module.exchange_table.point_ids)}
+        calculation.metrics_exporter = MetricsExporter(module.metrics, os.path.join(tmp, 'metrics.json'),
+                                                       os.path.join(tmp, 'metrics.prom'), interval=0.05)
+        calculation.start()
+        prometheus_size = os.path.getsize(os.path.join(tmp, 'metrics.prom'))
+        writes = calculation.metrics_exporter.writes
+
+    print(f"\nstand-in run: {args.points} points, {args.timesteps} timesteps, 0.5 ms EnergyPlus work per timestep")
+    print(f"  {'stage':28s} {'count':>7} {'mean us':>9} {'p99 us':>9} {'max us':>9}")
+    for stage, histogram in sorted(module.metrics.histograms.items()):
+        if histogram.count:
+            print(f"  {stage:28s} {histogram.count:>7} {histogram.sum / histogram.count * 1e6:>9.1f} "
+                  f"{histogram.quantile(0.99) * 1e6:>9.1f} {histogram.max * 1e6:>9.1f}")
+    print(f"  exported {writes} times, metrics.prom {prometheus_size} bytes")
+
+
+if __name__ == '__main__':
+    main()
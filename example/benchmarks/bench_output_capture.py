@@ -0,0 +1,77 @@
+"""
+Output results: in-simulation capture to .npz parts vs. CSV written and parsed afterwards
+
+A stubbed api.exchange serves --outputs variables for --timesteps timesteps (35040 is a
+year at 15-minute steps). The CSV path writes one row per timestep, as EnergyPlus does
+via ReadVarsESO, then streams it back with OutputStreamProcessor.
+
+    python benchmarks/bench_output_capture.py [--timesteps 35040] [--outputs 200]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from outputCapture import OutputCapture, numpy, read_npz
+from outputStream import OutputStreamProcessor
+from stubEnergyPlus import StubEnergyPlusAPI
+
+
+def directory_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--timesteps', type=int, default=35040)
+    parser.add_argument('--outputs', type=int, default=200)
+    parser.add_argument('--capacity', type=int, default=4096)
+    args = parser.parse_args()
+
+    outputs = [(f'Zone Air Temperature', f'ZONE {i}') for i in range(args.outputs)]
+    output_dict = {f'T{i}': ['Variable', name, key] for i, (name, key) in enumerate(outputs)}
+    api = StubEnergyPlusAPI([], outputs=outputs)
+    state = api.state_manager.new_state()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        header = ['Date/Time'] + [f"{key}:{name} [C](TimeStep)" for name, key in outputs]
+        csv_path = os.path.join(tmp, 'eplusout.csv')
+        start = time.perf_counter()
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for step in range(args.timesteps):
+                api.exchange.sim_time = step / 4
+                writer.writerow([f" {step}"] + [api.exchange.sim_time + i for i in range(args.outputs)])
+        written = time.perf_counter() - start
+        start = time.perf_counter()
+        OutputStreamProcessor(period=None).process_file(csv_path)
+        parsed = time.perf_counter() - start
+
+        capture = OutputCapture(output_dict, os.path.join(tmp, 'capture'), args.capacity)
+        capture.request(api, state)
+        start = time.perf_counter()
+        for step in range(args.timesteps):
+            api.exchange.sim_time = step / 4
+            capture.capture(api, state)
+        captured = time.perf_counter() - start
+        parts = capture.close()
+        closed = time.perf_counter() - start
+        columns = read_npz(parts[-1])
+        assert columns['T1'][-1] == api.exchange.sim_time + 1
+
+        print(f"{args.timesteps} timesteps x {args.outputs} outputs (numpy {'on' if numpy else 'off'})")
+        print(f"  CSV: write {written:6.2f} s + parse {parsed:6.2f} s   "
+              f"{os.path.getsize(csv_path) / 2 ** 20:7.1f} MB, results only after the run")
+        print(f"  capture: {captured / args.timesteps * 1e6:6.1f} us/timestep in the callback, "
+              f"{closed:6.2f} s total   {directory_size(os.path.join(tmp, 'capture')) / 2 ** 20:7.1f} MB "
+              f"in {len(parts)} parts, readable during the run")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Peak memory of EnergyPlus CSV output processing: whole-file load vs. streamed chunks
+
+Synthetic eplusout.csv files with 15-minute timesteps are processed at two run lengths;
+the streamed peak should stay flat while the whole-file load grows with the run.
+
+    python benchmarks/bench_output_stream.py [--days 30 120] [--columns 40] [--chunk 2000]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from outputStream import OutputStreamProcessor
+
+DAYS_PER_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def write_output_csv(path: str, days: int, columns: int):
+    header = ['Date/Time'] + [f"ZONE {i}:Zone Air Temperature [C](TimeStep)" for i in range(columns)]
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        day = 0
+        for month, month_days in enumerate(DAYS_PER_MONTH * (days // 365 + 1), 1):
+            for day_of_month in range(1, month_days + 1):
+                if day == days:
+                    return
+                day += 1
+                for step in range(1, 97):
+                    minutes = step * 15
+                    stamp = f" {(month - 1) % 12 + 1:02d}/{day_of_month:02d}  {minutes // 60:02d}:{minutes % 60:02d}:00"
+                    writer.writerow([stamp] + [f"{20 + (step + i) % 7 * 0.5:.2f}" for i in range(columns)])
+
+
+class CountingSink:
+    def __init__(self):
+        self.rows = {}
+
+    def declare(self, table, columns, types=None):
+        self.rows[table] = 0
+
+    def save_many(self, table, rows, block=False):
+        self.rows[table] += len(rows)
+
+
+def whole_file(path: str):
+    """What the pandas version did: the whole table in memory at once"""
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    return len(rows) - 1
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 120])
+    parser.add_argument('--columns', type=int, default=40)
+    parser.add_argument('--chunk', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'days':>5} {'rows':>8} {'file MB':>8} {'whole-file peak MB':>19} {'streamed peak MB':>17} {'streamed s':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for days in args.days:
+            path = os.path.join(tmp, f'eplusout_{days}.csv')
+            write_output_csv(path, days, args.columns)
+            size = os.path.getsize(path) / 2 ** 20
+            rows, _, whole_peak = measure(lambda: whole_file(path))
+            sink = CountingSink()
+            processor = OutputStreamProcessor(period='day', chunk_rows=args.chunk, sink=sink)
+            summary, elapsed, stream_peak = measure(lambda: processor.process_file(path))
+            assert summary['rows'] == rows == sink.rows[f'eplusout_{days}']
+            assert summary['periods'] == days == sink.rows[f'eplusout_{days}_day']
+            print(f"{days:>5} {rows:>8} {size:>8.1f} {whole_peak / 2 ** 20:>19.1f} {stream_peak / 2 ** 20:>17.1f} "
+                  f"{elapsed:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Wall-clock drift of paced timesteps: plain time.sleep(interval) vs. the pacing modes
+
+Each timestep does --work seconds of busy work before the reporting callback.
+
+    python benchmarks/bench_pacing.py [--timesteps 100] [--interval 0.02] [--work 0.004]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pacing import make_pacer
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--timesteps', type=int, default=100)
+    parser.add_argument('--interval', type=float, default=0.02)
+    parser.add_argument('--work', type=float, default=0.004)
+    parser.add_argument('--scale', type=float, default=4.0)
+    args = parser.parse_args()
+
+    print(f"{args.timesteps} timesteps, {args.interval * 1e3:.0f} ms interval, {args.work * 1e3:.0f} ms work")
+    print(f"  {'mode':22s} {'elapsed s':>10} {'target s':>10} {'drift ms':>10} {'overruns':>9} {'max lag ms':>11}")
+
+    start = time.monotonic()
+    for _ in range(args.timesteps):
+        busy(args.work)
+        time.sleep(args.interval)
+    elapsed = time.monotonic() - start
+    target = args.timesteps * args.interval
+    print(f"  {'sleep(interval) before':22s} {elapsed:>10.3f} {target:>10.3f} {(elapsed - target) * 1e3:>10.1f} "
+          f"{'-':>9} {'-':>11}")
+
+    for mode in ('realtime', 'scaled', 'unpaced'):
+        pacer = make_pacer(mode, args.interval, args.scale)
+        pacer.start()
+        for _ in range(args.timesteps):
+            busy(args.work)
+            pacer.tick()
+        stats = pacer.stats()
+        label = f"{mode} x{args.scale:g}" if mode == 'scaled' else mode
+        if mode == 'unpaced':
+            target = drift = '-'
+        else:
+            target = f"{args.timesteps * stats['period']:.3f}"
+            drift = f"{stats['drift'] * 1e3:.1f}"
+        print(f"  {label:22s} {stats['elapsed']:>10.3f} {target:>10} {drift:>10} {stats['overruns']:>9} "
+              f"{stats['max_lag'] * 1e3:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Generator startup with import-based vs. static plugin metadata
+
+Each variant runs in a fresh interpreter and builds the `inputLoad` fragment for a
+plugin that, like httpCommunicate/MySQL plugins, pulls heavy dependencies at import.
+
+    python benchmarks/bench_plugin_registry.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+EXAMPLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# stand-in for requests / DB drivers: a plugin whose import is dominated by its dependencies
+HEAVY_PLUGIN = textwrap.dedent('''
+    import asyncio, decimal, email.mime.multipart, http.client, json, sqlite3, ssl, xml.dom.minidom
+    import urllib.request, logging.handlers, concurrent.futures, multiprocessing.pool
+
+
+    class HeavyCommunicate:
+        description = """
+        def _get_HeavyCommunicate_instance(self, name):
+            import heavyCommunicate
+            self.instances[name] = heavyCommunicate.HeavyCommunicate()
+        """
+''')
+
+IMPORT_VARIANT = '''
+import sys, time
+start = time.perf_counter()
+package = __import__('heavyCommunicate')
+description = getattr(package, 'HeavyCommunicate').description
+print(time.perf_counter() - start)
+'''
+
+REGISTRY_VARIANT = '''
+import sys, time
+start = time.perf_counter()
+from CodeGenerator import CodeGenerator
+from pluginRegistry import PluginRegistry
+generator = CodeGenerator(plugin_registry=PluginRegistry([sys.argv[1]]))
+generator._generate_input_loaders([{'module': 'heavyCommunicate', 'class_name': 'HeavyCommunicate'}])
+assert 'heavyCommunicate' not in sys.modules
+print(time.perf_counter() - start)
+'''
+
+IMPORT_GENERATOR_VARIANT = '''
+import sys, time
+start = time.perf_counter()
+from CodeGenerator import CodeGenerator
+generator = CodeGenerator()
+package = __import__('heavyCommunicate')
+description = getattr(package, 'HeavyCommunicate').description
+print(time.perf_counter() - start)
+'''
+
+
+def run_variant(code: str, plugin_dir: str, runs: int):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([plugin_dir, EXAMPLE_DIR]), PYTHONDONTWRITEBYTECODE='1')
+    inner, wall = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code, plugin_dir], cwd=EXAMPLE_DIR, env=env,
+                                check=True, capture_output=True, text=True).stdout
+        wall.append(time.perf_counter() - start)
+        inner.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(inner), statistics.median(wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as plugin_dir:
+        with open(os.path.join(plugin_dir, 'heavyCommunicate.py'), 'w', encoding='utf-8') as f:
+            f.write(HEAVY_PLUGIN)
+
+        print(f"{'variant':40s} {'lookup ms':>10} {'process ms':>11}")
+        for name, code in (('plugin import only (before)', IMPORT_VARIANT),
+                           ('generator + plugin import (before)', IMPORT_GENERATOR_VARIANT),
+                           ('generator + static registry (after)', REGISTRY_VARIANT)):
+            inner, wall = run_variant(code, plugin_dir, args.runs)
+            print(f"{name:40s} {inner * 1e3:>10.1f} {wall * 1e3:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
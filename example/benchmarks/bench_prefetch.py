@@ -0,0 +1,79 @@
+"""
+Callback wait time: fetching inside the callback vs. reading a prefetched BoundedChannel
+
+The fake input takes --latency seconds per fetch, with an occasional --stall.
+
+    python benchmarks/bench_prefetch.py [--timesteps 200] [--latency 0.005] [--policy latest]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prefetchPipeline import POLICIES, BoundedChannel, PrefetchPipeline
+
+
+class SlowInput:
+    def __init__(self, latency: float, stall: float, stall_every: int):
+        self.latency = latency
+        self.stall = stall
+        self.stall_every = stall_every
+        self.calls = 0
+
+    def fetch_data(self):
+        self.calls += 1
+        time.sleep(self.stall if self.calls % self.stall_every == 0 else self.latency)
+        return {'point': float(self.calls)}
+
+
+def report(name, waits):
+    waits.sort()
+    p99 = waits[min(len(waits) - 1, int(len(waits) * 0.99))]
+    print(f"  {name:28s} mean {sum(waits) / len(waits) * 1e3:8.3f} ms   p99 {p99 * 1e3:8.3f} ms   "
+          f"max {waits[-1] * 1e3:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--timesteps', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--stall', type=float, default=0.1)
+    parser.add_argument('--stall-every', type=int, default=50)
+    parser.add_argument('--step', type=float, default=0.002, help='simulated work per timestep')
+    parser.add_argument('--policy', choices=POLICIES, default='latest')
+    args = parser.parse_args()
+
+    source = SlowInput(args.latency, args.stall, args.stall_every)
+    waits = []
+    for _ in range(args.timesteps):
+        start = time.perf_counter()
+        source.fetch_data()
+        waits.append(time.perf_counter() - start)
+        time.sleep(args.step)
+    print(f"input {args.latency * 1e3:.0f} ms per fetch, {args.stall * 1e3:.0f} ms stall every "
+          f"{args.stall_every}")
+    report('fetch in callback (before)', waits)
+
+    source = SlowInput(args.latency, args.stall, args.stall_every)
+    channel = BoundedChannel(maxsize=2, policy=args.policy)
+    pipeline = PrefetchPipeline(source.fetch_data, [channel], interval=args.step)
+    pipeline.start()
+    while channel.qsize() == 0:
+        time.sleep(0.001)
+    waits = []
+    for _ in range(args.timesteps):
+        start = time.perf_counter()
+        channel.get()
+        waits.append(time.perf_counter() - start)
+        time.sleep(args.step)
+    pipeline.stop()
+    report(f'prefetched ({args.policy})', waits)
+    metrics = channel.metrics()
+    print(f"  stale reads {metrics['stale_gets']}/{metrics['gets']}, drops {metrics['drops']}, "
+          f"max depth {metrics['max_depth']}")
+
+
+if __name__ == '__main__':
+    main()
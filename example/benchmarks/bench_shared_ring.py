@@ -0,0 +1,119 @@
+"""
+Callback latency while inputs are parsed: in-process prefetch thread vs. input process + shared-memory ring
+
+The input side parses a JSON reading of every point (--fetch-interval apart) and fills
+a ValueFrame. The simulator side runs a callback every --step seconds that takes the
+latest frame and walks all its points, like a folded exchange handler.
+
+    in-process     PrefetchPipeline thread -> BoundedChannel (parsing holds this process's GIL)
+    input process  SharedInputProcess -> SharedFrameRing, read in place
+
+    python benchmarks/bench_shared_ring.py [--sizes 1000 10000] [--seconds 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from actuatorTable import ExchangeTable, FrameRing
+from prefetchPipeline import BoundedChannel, PrefetchPipeline
+from sharedRing import SharedInputProcess
+
+
+class JsonInput:
+    """Input answering with a freshly parsed JSON document of every point"""
+
+    def __init__(self, table: ExchangeTable):
+        self.table = table
+        self.frames = FrameRing(len(table), capacity=4)
+        self.payload = json.dumps({point_id: float(index) for index, point_id in enumerate(table.point_ids)})
+
+    def fetch_data(self):
+        frame = self.frames.acquire()
+        self.table.fill(frame, json.loads(self.payload))
+        return frame
+
+
+def run_callbacks(channel, indices, seconds: float, step: float):
+    """Latency of each callback and the number of distinct frames seen"""
+    latencies = []
+    frames = 0
+    last = None
+    sink = []
+    deadline = time.perf_counter() + seconds
+    next_step = time.perf_counter()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        frame = channel.get()
+        if frame is not None:
+            values, stamp, generation = frame.values, frame.stamp, frame.generation
+            total = 0.0
+            for index in indices:
+                if stamp[index] == generation:
+                    total += values[index]
+            sink.append(total)
+            if (id(frame), generation) != last:
+                frames += 1
+                last = (id(frame), generation)
+        latencies.append(time.perf_counter() - start)
+        next_step += step
+        # the rest of the timestep is EnergyPlus work, which does not hold the GIL
+        while time.perf_counter() < next_step:
+            time.sleep(max(0.0, next_step - time.perf_counter()))
+    return latencies, frames
+
+
+def report(name: str, latencies, frames: int):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {name:16s} callbacks {len(latencies):6d}   median {statistics.median(latencies) * 1e6:9.1f} us   "
+          f"p99 {p99 * 1e6:9.1f} us   max {latencies[-1] * 1e6:9.1f} us   frames {frames}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--step', type=float, default=0.002, help='seconds per simulated timestep')
+    parser.add_argument('--fetch-interval', type=float, default=0.01)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        table = ExchangeTable({f'P{i}': ['Unitary HVAC', 'Sensible Load Request', f'UNIT {i}']
+                               for i in range(size)}, {'Unitary HVAC': 'itrator_loop_flag'})
+        indices = table.partition_indices['itrator_loop_flag']
+        source = JsonInput(table)
+        start = time.perf_counter()
+        for _ in range(20):
+            source.fetch_data()
+        parse = (time.perf_counter() - start) / 20
+        print(f"{size} points, {parse * 1e3:.2f} ms per fetch and parse, fetch every "
+              f"{args.fetch_interval * 1e3:.0f} ms, callback every {args.step * 1e3:.0f} ms")
+
+        channel = BoundedChannel(policy='latest')
+        pipeline = PrefetchPipeline(source.fetch_data, [channel], interval=args.fetch_interval)
+        pipeline.start()
+        while channel.qsize() == 0:
+            time.sleep(0.001)
+        latencies, frames = run_callbacks(channel, indices, args.seconds, args.step)
+        pipeline.stop()
+        report('in-process', latencies, frames)
+
+        process = SharedInputProcess(None, source.fetch_data, size, capacity=8, interval=args.fetch_interval)
+        channel = process.channel()
+        process.start()
+        while process.ring.sequence < 0:
+            time.sleep(0.001)
+        latencies, frames = run_callbacks(channel, indices, args.seconds, args.step)
+        channel = None
+        process.stop()
+        report('input process', latencies, frames)
+    print(f"({os.cpu_count()} CPU{'s' if os.cpu_count() != 1 else ''})")
+
+
+if __name__ == '__main__':
+    main()
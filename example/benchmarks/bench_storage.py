@@ -0,0 +1,92 @@
+"""
+Result storage throughput on SQLite: one INSERT + commit per row vs. BufferedWriter
+
+Also reports what a write costs the simulation thread, and shows retries against a
+backend that fails transiently.
+
+    python benchmarks/bench_storage.py [--rows 20000] [--batch 500]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulkStorage import BufferedWriter, SQLiteBackend
+
+COLUMNS = ['timestep', 'point', 'value']
+
+
+class FlakyBackend(SQLiteBackend):
+    """Fails the first of every `fail_every` write attempts with a transient error"""
+
+    def __init__(self, path: str, fail_every: int):
+        super().__init__(path)
+        self.fail_every = fail_every
+        self.calls = 0
+
+    def write_rows(self, table, columns, rows):
+        self.calls += 1
+        # starting with the first attempt, so even a run of one batch goes through a retry
+        if self.calls % self.fail_every == 1:
+            raise sqlite3.OperationalError('database is locked')
+        super().write_rows(table, columns, rows)
+
+
+def rows_for(count: int):
+    return [(i // 100, f'p{i % 100}', float(i)) for i in range(count)]
+
+
+def row_at_a_time(path: str, rows):
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('CREATE TABLE results (timestep, point, value)')
+    start = time.perf_counter()
+    for row in rows:
+        connection.execute('INSERT INTO results VALUES (?, ?, ?)', row)
+        connection.commit()
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return elapsed
+
+
+def buffered(backend, rows, batch: int):
+    writer = BufferedWriter(backend, batch_size=batch, flush_interval=0.5, backoff=0.01)
+    writer.declare('results', COLUMNS)
+    start = time.perf_counter()
+    for row in rows:
+        writer.write('results', row)
+    produce = time.perf_counter() - start
+    writer.close()
+    return time.perf_counter() - start, produce, writer.metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+    rows = rows_for(args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # row-at-a-time is slow enough that a tenth of the rows shows its rate
+        sample = rows[:max(1, args.rows // 10)]
+        elapsed = row_at_a_time(os.path.join(tmp, 'single.db'), sample)
+        print(f"{args.rows} rows of {len(COLUMNS)} columns")
+        print(f"  one insert + commit per row    {len(sample) / elapsed:>10.0f} rows/s")
+
+        elapsed, produce, metrics = buffered(SQLiteBackend(os.path.join(tmp, 'bulk.db')), rows, args.batch)
+        print(f"  buffered, batch {args.batch:<5d}         {args.rows / elapsed:>10.0f} rows/s   "
+              f"{produce / args.rows * 1e6:.2f} us per write on the caller, {metrics['batches']} batches")
+
+        elapsed, _, metrics = buffered(FlakyBackend(os.path.join(tmp, 'flaky.db'), 2), rows, args.batch)
+        print(f"  buffered, every 2nd write fails {args.rows / elapsed:>10.0f} rows/s   "
+              f"written {metrics['rows_written']}, retried {metrics['retried']}, failed {metrics['failed']}")
+        assert metrics['retried'] and metrics['rows_written'] == args.rows, 'retry path not exercised'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Marker substitution cost on synthetic templates with thousands of markers
+
+Compares the single-pass splice (CompiledTemplate.render) against the previous
+per-marker, per-line str.replace loop. Both columns exclude parsing.
+
+    python benchmarks/bench_substitution.py [--sizes 500,1000,5000] [--repeat N]
+"""
+import argparse
+import ast
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CodeGenerator import CodeGenerator
+from templateCache import TemplateCache
+
+
+def synthetic_template(n_markers: int) -> str:
+    """Half statement markers in function bodies, half inline markers in docstrings"""
+    parts = ['class Generated:\n']
+    for i in range(n_markers // 2):
+        parts.append(
+            f"    def handler_{i}(self, state):\n"
+            f"        '''handler {{{{doc_{i}}}}}'''\n"
+            f"        {{{{body_{i}}}}}\n"
+            f"        return state\n\n"
+        )
+    return ''.join(parts)
+
+
+def synthetic_replacements(n_markers: int) -> dict:
+    replacements = {}
+    for i in range(n_markers // 2):
+        replacements[f'doc_{i}'] = f'point {i}'
+        replacements[f'body_{i}'] = f"        state = state + {i}"
+    return replacements
+
+
+def legacy_render(template_code: str, tree: ast.Module, replacements: dict) -> str:
+    """The previous algorithm: double-recorded nodes, str.replace per marker per line"""
+    markers = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            for marker in re.findall(r'\{\{(\w+)\}\}', node.value.value):
+                markers.setdefault(marker, []).append(node)
+        if isinstance(node, ast.FunctionDef):
+            for stmt in node.body:
+                if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant) and isinstance(stmt.value.value, str):
+                    for marker in re.findall(r'\{\{(\w+)\}\}', stmt.value.value):
+                        markers.setdefault(marker, []).append(stmt)
+    code_lines = template_code.split('\n')
+    for marker_name, replacement_code in replacements.items():
+        for node in markers.get(marker_name, []):
+            token = f"{{{{{marker_name}}}}}"
+            if token in code_lines[node.lineno - 1]:
+                code_lines[node.lineno - 1] = code_lines[node.lineno - 1].replace(token, replacement_code)
+    return '\n'.join(code_lines)
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='500,1000,2000,5000,10000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'markers':>8} {'lines':>7} {'compile ms':>11} {'render ms':>10} {'ns/marker':>10} {'legacy ms':>10}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        template = synthetic_template(size)
+        replacements = synthetic_replacements(size)
+        generator = CodeGenerator(TemplateCache())
+
+        compile_s = timed(lambda: CodeGenerator(TemplateCache()).compile_template(template), 1)
+        compiled = generator.compile_template(template)
+        render_s = timed(lambda: compiled.render(replacements), args.repeat)
+        legacy_s = timed(lambda: legacy_render(template, compiled.tree, replacements), 1)
+
+        print(f"{size:>8} {template.count(chr(10)):>7} {compile_s * 1e3:>11.2f} {render_s * 1e3:>10.3f} "
+              f"{render_s / size * 1e9:>10.0f} {legacy_s * 1e3:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
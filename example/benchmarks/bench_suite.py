@@ -0,0 +1,325 @@
+"""
+Benchmark suite for the generator and the generated co-simulation hot paths
+
+Cases, each at growing sizes:
+    generator    CodeGenerator.parse_template / find_replacement_markers /
+                 generate_code_from_template (cold and warm cache) on padded templates
+    preprocess   the generated preprocess() on exchange dictionaries, without and with snapshot
+    callback     per-callback fetch_data, set_actuator_value for every point, and the
+                 set_actuator_frame write the generated handlers use, against the
+                 stubbed api.exchange of benchmarks/stubEnergyPlus.py
+    end_to_end   timesteps per second of EnergyPlusCaculation().start() driving the
+                 stand-in EnergyPlus loop
+
+The code under test is generated from main.py into a temporary site (the
+startup-optimized variant, so the configs load without EnergyPlus); `api` and `state`
+are then the stand-in's. Results are written as JSON; --compare prints the ratio to an
+earlier result file and exits non-zero when a case got slower than --threshold.
+
+    python benchmarks/bench_suite.py [-o results.json] [--compare baseline.json] [--quick]
+"""
+import argparse
+import csv
+import importlib
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+EXAMPLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, EXAMPLE_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import yaml
+
+from CodeGenerator import FRAGMENT_BUILDERS, TEMPLATE_PATH, CodeGenerator, build_generation_config
+from bench_template_cache import load_template
+from startupOptimize import optimize_startup
+from stubEnergyPlus import StubEnergyPlusAPI
+from templateCache import TemplateCache
+
+SUITE_VERSION = 1
+SIZES = {
+    'generator': [1, 100, 1000],
+    'preprocess': [100, 1000, 10000],
+    'callback': [100, 1000, 5000],
+    'end_to_end': [10, 100],
+}
+QUICK_SIZES = {'generator': [1, 100], 'preprocess': [100, 1000], 'callback': [100, 1000], 'end_to_end': [10]}
+SITE_MODULE = 'bench_site'
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=EXAMPLE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(fn, repeat: int, number: int = 1, setup=None):
+    """Seconds per call of fn: median, min and mean over `repeat` samples of `number` calls"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {'median': statistics.median(samples), 'min': min(samples), 'mean': statistics.mean(samples),
+            'repeat': repeat, 'number': number}
+
+
+def write_exchange(path: str, points: int):
+    """Exchange dictionary: mostly loop actuators, one weather point and a few output variables"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'component_type', 'control_type', 'actuator_key', 'flag'])
+        writer.writerow(['W0', 'Weather Data', 'Outdoor Dry Bulb', 'Environment', 'set_weather_flag'])
+        for i in range(points - 1):
+            writer.writerow([f'P{i}', 'Unitary HVAC', 'Sensible Load Request', f'UNIT {i}', 'set_loop_flag'])
+        for i in range(3):
+            writer.writerow([f'V{i}', 'Variable', 'Zone Mean Air Temperature', f'ZONE {i}', ''])
+
+
+class FakeInput:
+    """Input plugin answering with a value for every exchange point"""
+
+    def __init__(self, point_ids):
+        self.values = {point_id: 1.0 for point_id in point_ids}
+        self.name = 'link1'
+
+    def connect(self, config):
+        pass
+
+    def get_data(self):
+        return self.values
+
+
+class Site:
+    """A generated site in a temporary directory, imported as a module"""
+
+    def __init__(self, directory: str, points: int, fold_exchange: bool = True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.exchange = os.path.join(directory, 'exchange.csv')
+        write_exchange(self.exchange, points)
+        input_config = {'type': 'HTTP', 'name': 'link1', 'url': '127.0.0.1:1', 'timeout': 1}
+        set_config = {'weather_file': 'weather.epw', 'idf_file': 'model.idf', 'time': 0,
+                      'exchangeDataDict': 'exchange.csv', 'pacing': 'unpaced', 'prefetch_interval': 0.001,
+                      'input_deadline': 0.5, 'fold_exchange': fold_exchange}
+        output_config = {'type': 'sqlite', 'path': os.path.join(directory, 'results.db')}
+        for name, content in (('INPUT_CONFIG', input_config), ('SET_CONFIG', set_config),
+                              ('OUTPUT_CONFIG', output_config)):
+            with open(os.path.join(directory, f'{name}.yaml'), 'w') as f:
+                yaml.safe_dump(content, f)
+
+        config = build_generation_config(input_config, set_config, output_config, TEMPLATE_PATH, directory)
+        code, _ = optimize_startup(CodeGenerator(TemplateCache()).generate_energyplus_code(config))
+        with open(os.path.join(directory, f'{SITE_MODULE}.py'), 'w', encoding='utf-8') as f:
+            f.write(code)
+
+        sys.path.insert(0, directory)
+        sys.modules.pop(SITE_MODULE, None)
+        self.module = importlib.import_module(SITE_MODULE)
+        sys.path.remove(directory)
+        self.module._load_config()
+        # the generated setup_logging adds INFO handlers to the root logger
+        logging.getLogger().setLevel(logging.WARNING)
+        self.use_stub_api()
+
+    def use_stub_api(self, timesteps: int = 96, step_cost: float = 0.0):
+        module = self.module
+        actuators = [tuple(row[:3]) for row in module.data_dict.values() if row[0] not in ('Meter', 'Variable')]
+        module.api = StubEnergyPlusAPI(actuators)
+        module.api.runtime.options.update({'--stub-timesteps': str(timesteps), '--stub-step-cost': str(step_cost)})
+        module.state = module.api.state_manager.new_state()
+
+    def input_communicate(self):
+        module = self.module
+        communicate = module.InputCommunicate()
+        communicate.instances = {'link1': FakeInput(module.exchange_table.point_ids)}
+        communicate.input_connect()
+        return communicate
+
+
+def bench_generator(sizes, repeat: int):
+    generator = CodeGenerator(TemplateCache())
+    with tempfile.TemporaryDirectory() as tmp:
+        exchange = os.path.join(tmp, 'exchange.csv')
+        write_exchange(exchange, 10)
+        config = build_generation_config({'type': 'HTTP', 'name': 'link1'}, {'exchangeDataDict': 'exchange.csv'},
+                                         {'type': 'sqlite'}, TEMPLATE_PATH, tmp)
+    replacements = {marker: generator.generate_fragment(marker, config[section])
+                    for marker, section, _ in FRAGMENT_BUILDERS if section in config}
+    results = []
+    for scale in sizes:
+        template = load_template(scale)
+        tree = generator.parse_template(template)
+        warm = CodeGenerator(TemplateCache())
+        warm.generate_code_from_template(template, replacements)
+        cases = {
+            'parse_template': lambda: generator.parse_template(template),
+            'find_replacement_markers': lambda: generator.find_replacement_markers(tree),
+            'generate_code_from_template.cold': lambda: CodeGenerator(TemplateCache()).generate_code_from_template(
+                template, replacements),
+            'generate_code_from_template.warm': lambda: warm.generate_code_from_template(template, replacements),
+        }
+        for name, fn in cases.items():
+            results.append({'case': f'generator.{name}', 'size': scale, 'lines': template.count('\n') + 1,
+                            **measure(fn, repeat)})
+    return results
+
+
+def bench_preprocess(site: Site, sizes, repeat: int, tmp: str):
+    module = site.module
+    results = []
+    for points in sizes:
+        path = os.path.join(tmp, f'exchange_{points}.csv')
+        write_exchange(path, points)
+
+        def reset():
+            module.data_dict.clear()
+            module.output_dict.clear()
+
+        def remove_snapshot():
+            reset()
+            if os.path.exists(f'{path}.snapshot'):
+                os.remove(f'{path}.snapshot')
+
+        logging.disable(logging.INFO)
+        try:
+            results.append({'case': 'preprocess.no_snapshot', 'size': points,
+                            **measure(lambda: module.preprocess(path), repeat, setup=remove_snapshot)})
+            results.append({'case': 'preprocess.snapshot', 'size': points,
+                            **measure(lambda: module.preprocess(path), repeat, setup=reset)})
+        finally:
+            logging.disable(logging.NOTSET)
+    return results
+
+
+def bench_callback(sizes, repeat: int, tmp: str, fold_exchange: bool = True):
+    results = []
+    for points in sizes:
+        site = Site(os.path.join(tmp, f'callback_{points}'), points, fold_exchange)
+        module = site.module
+        communicate = site.input_communicate()
+        simulator = module.EnergyPlusSimulator('model.idf', 'weather.epw', 0, module.Config(module.SETTINGS_CONFIG))
+        frame = communicate.fetch_data()
+        writes = [(*module.exchange_table.metadata[i], 1.0) for i in range(len(module.exchange_table))]
+
+        def set_each():
+            for component_type, control_type, actuator_key, value in writes:
+                simulator.set_actuator_value(module.state, component_type, control_type, actuator_key, value)
+
+        def handler():
+            simulator.config.controlData.put(frame)
+            simulator.itrator_loop_flag(module.state)
+
+        number = max(1, 2000 // points)
+        results.append({'case': 'callback.fetch_data', 'size': points,
+                        **measure(communicate.fetch_data, repeat, number)})
+        results.append({'case': 'callback.set_actuator_value', 'size': points, **measure(set_each, repeat, number)})
+        results.append({'case': 'callback.set_actuator_frame', 'size': points,
+                        **measure(lambda: simulator.set_actuator_frame(module.state, frame, 'itrator_loop_flag'),
+                                  repeat, number)})
+        # the generated handler: channel read plus the writes of its calling points
+        results.append({'case': 'callback.itrator_loop_flag', 'size': points, **measure(handler, repeat, number)})
+        communicate.close()
+        simulator.cleanup()
+    return results
+
+
+def bench_end_to_end(sizes, repeat: int, timesteps: int, step_cost: float, fold_exchange: bool = True):
+    """Whole runs; overhead_per_timestep is the time per timestep beyond the stand-in's own step cost"""
+    results = []
+    for points in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            site = Site(tmp, points, fold_exchange)
+            module = site.module
+            samples = []
+            for _ in range(repeat):
+                site.use_stub_api(timesteps, step_cost)
+                calculation = module.EnergyPlusCaculation()
+                calculation.input_communicate.instances = {'link1': FakeInput(module.exchange_table.point_ids)}
+                start = time.perf_counter()
+                calculation.start()
+                samples.append(time.perf_counter() - start)
+                assert module.api.runtime.runs == 1 and module.api.exchange.writes, 'simulation loop did not run'
+            seconds = statistics.median(samples)
+            results.append({'case': 'end_to_end.timesteps_per_second', 'size': points, 'timesteps': timesteps,
+                            'median': seconds, 'min': min(samples), 'mean': statistics.mean(samples),
+                            'repeat': repeat, 'number': 1, 'throughput': timesteps / seconds,
+                            'overhead_per_timestep': seconds / timesteps - step_cost})
+    return results
+
+
+def compare(results, baseline_path: str, threshold: float) -> int:
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(item['case'], item['size']): item for item in json.load(f)['results']}
+    regressions = 0
+    print(f"\ncompared with {baseline_path} (ratio = now / then, median seconds per call)")
+    for item in results:
+        before = baseline.get((item['case'], item['size']))
+        if before is None:
+            continue
+        ratio = item['median'] / before['median'] if before['median'] else float('inf')
+        slower = ratio > 1 + threshold
+        regressions += slower
+        print(f"  {item['case']:44s} {item['size']:>6} {ratio:7.2f}{'  REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', default=None, help='result file (default bench_results_<commit>.json)')
+    parser.add_argument('--compare', help='earlier result file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slow-down ratio counted as a regression')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--timesteps', type=int, default=200)
+    parser.add_argument('--step-cost', type=float, default=0.0005, help='stand-in EnergyPlus CPU seconds per timestep')
+    parser.add_argument('--no-fold', action='store_true', help='load the exchange dictionary at runtime instead')
+    parser.add_argument('--quick', action='store_true', help='smaller sizes, for a smoke run')
+    parser.add_argument('--only', nargs='+', choices=sorted(SIZES), default=sorted(SIZES))
+    args = parser.parse_args()
+    sizes = QUICK_SIZES if args.quick else SIZES
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if 'generator' in args.only:
+            results += bench_generator(sizes['generator'], args.repeat)
+        if 'preprocess' in args.only:
+            results += bench_preprocess(Site(os.path.join(tmp, 'site'), 10), sizes['preprocess'], args.repeat, tmp)
+        if 'callback' in args.only:
+            results += bench_callback(sizes['callback'], args.repeat, tmp, not args.no_fold)
+        if 'end_to_end' in args.only:
+            results += bench_end_to_end(sizes['end_to_end'], max(1, args.repeat // 2), args.timesteps,
+                                        args.step_cost, not args.no_fold)
+
+    commit = git_commit()
+    report = {'suite_version': SUITE_VERSION, 'commit': commit, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+              'fold_exchange': not args.no_fold, 'results': results}
+    output = args.output or f"bench_results_{commit or 'unknown'}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for item in results:
+        extra = (f"  {item['throughput']:8.0f} timesteps/s, {item['overhead_per_timestep'] * 1e6:8.1f} us overhead"
+                 if 'throughput' in item else '')
+        print(f"  {item['case']:44s} {item['size']:>6} {item['median'] * 1e6:12.1f} us{extra}")
+    print(f"results written to {output}")
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
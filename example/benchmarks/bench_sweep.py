@@ -0,0 +1,63 @@
+"""
+Sweep scheduling against the pyenergyplus stand-in: wall time, speed-up and pool efficiency
+
+Every job runs --timesteps timesteps of --step-cost seconds of CPU work; one extra job
+hangs and must be stopped by its timeout.
+
+    python benchmarks/bench_sweep.py [--jobs 16] [--workers 1 2 4] [--timesteps 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sweepRunner import SweepJob, SweepRunner
+
+STUB_API = 'stubEnergyPlus:StubEnergyPlusAPI'
+
+
+def make_jobs(count: int, timesteps: int, step_cost: float, out_dir: str, hang_timeout: float):
+    jobs = [SweepJob(f'variant_{i:03d}', 'model.idf', 'weather.epw',
+                     ['--stub-timesteps', str(timesteps), '--stub-step-cost', str(step_cost)],
+                     output_dir=os.path.join(out_dir, f'variant_{i:03d}'))
+            for i in range(count)]
+    jobs.append(SweepJob('hangs', 'model.idf', 'weather.epw', ['--stub-hang'], timeout=hang_timeout,
+                         output_dir=os.path.join(out_dir, 'hangs')))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--timesteps', type=int, default=200)
+    parser.add_argument('--step-cost', type=float, default=0.001)
+    parser.add_argument('--hang-timeout', type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{args.jobs} jobs x {args.timesteps * args.step_cost:.2f} s CPU + 1 hanging job "
+          f"(timeout {args.hang_timeout}s), {os.cpu_count()} cores")
+    print(f"  {'workers':>7} {'wall s':>8} {'speed-up':>9} {'efficiency':>11} {'ok':>4} {'timed out':>10} "
+          f"{'restarts':>9}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            jobs = make_jobs(args.jobs, args.timesteps, args.step_cost, os.path.join(tmp, str(workers)),
+                             args.hang_timeout)
+            runner = SweepRunner(workers, STUB_API)
+            start = time.perf_counter()
+            results = runner.run(jobs)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            busy = sum(result.seconds for result in results)
+            print(f"  {workers:>7} {elapsed:>8.2f} {baseline / elapsed:>8.2f}x {busy / (elapsed * workers):>10.0%} "
+                  f"{sum(result.ok for result in results):>4} {sum(result.timed_out for result in results):>10} "
+                  f"{runner.restarts:>9}")
+
+
+if __name__ == '__main__':
+    main()
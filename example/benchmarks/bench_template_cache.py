@@ -0,0 +1,81 @@
+"""
+Cold vs. warm template generation
+
+    python benchmarks/bench_template_cache.py [--repeat N] [--scale N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CodeGenerator import CodeGenerator
+from templateCache import TemplateCache
+
+EXAMPLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPLACEMENTS = {
+    'initQueue': "        self.weatherData = queue.Queue()",
+    'importInitInput': "        import httpCommunicate\n"
+                       "        self.instances['link1'] = httpCommunicate.httpCommunication()",
+    'call_back': "        api.runtime.callback_begin_zone_timestep_before_set_current_weather("
+                 "state, self.energyplus_simulator.time_step_weather)",
+}
+
+
+def load_template(scale: int) -> str:
+    with open(os.path.join(EXAMPLE_DIR, 'main.py'), 'r', encoding='utf-8') as f:
+        template = f.read()
+    if scale <= 1:
+        return template
+    # pad the template with extra marker-free functions to emulate larger templates
+    padding = []
+    for i in range(scale):
+        padding.append(f"def _padding_{i}(a, b):\n    '''filler'''\n    return [a + b for _ in range(3)]\n")
+    return template + '\n' + '\n'.join(padding)
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--scale', type=int, default=1)
+    args = parser.parse_args()
+
+    template = load_template(args.scale)
+
+    def cold():
+        CodeGenerator(TemplateCache()).generate_code_from_template(template, REPLACEMENTS)
+
+    warm_generator = CodeGenerator(TemplateCache())
+    warm_generator.generate_code_from_template(template, REPLACEMENTS)
+
+    def warm():
+        warm_generator.generate_code_from_template(template, REPLACEMENTS)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        CodeGenerator(TemplateCache(cache_dir=cache_dir)).generate_code_from_template(template, REPLACEMENTS)
+
+        def disk():
+            CodeGenerator(TemplateCache(cache_dir=cache_dir)).generate_code_from_template(template, REPLACEMENTS)
+
+        results = [('cold (parse + index)', timed(cold, args.repeat)),
+                   ('warm (memory LRU)', timed(warm, args.repeat)),
+                   ('warm (disk cache, new process)', timed(disk, args.repeat))]
+
+    print(f"template: {len(template)} chars, {template.count(chr(10)) + 1} lines, repeat={args.repeat}")
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"  {name:32s} {seconds * 1e3:9.3f} ms  x{baseline / seconds:6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Allocation and GC pressure of the per-timestep actuator path
+
+legacy: a new __dict__ Actuator_obj per incoming item per timestep, as fetch_data did
+frames: values copied into a preallocated ValueFrame and written from its point indices
+
+    python benchmarks/bench_value_frames.py [--points 1000,5000] [--timesteps N]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from actuatorTable import ActuatorHandleCache, ExchangeTable, FrameRing
+from stubEnergyPlus import StubEnergyPlusAPI
+
+CALLING_POINT = 'itrator_loop_flag'
+
+
+class LegacyActuator_obj:
+    def __init__(self, component_type, control_type, actuator_key, value):
+        self.control_type = control_type
+        self.actuator_key = actuator_key
+        self.value = value
+        self.component_type = component_type
+
+
+def setup(points: int):
+    data_dict = {f'P{i}': ['Unitary HVAC', 'Sensible Load Request', f'UNIT {i}'] for i in range(points)}
+    api = StubEnergyPlusAPI([tuple(row) for row in data_dict.values()], linear_lookup=False)
+    table = ExchangeTable(data_dict, {'Unitary HVAC': CALLING_POINT})
+    cache = ActuatorHandleCache(table)
+    state = api.state_manager.new_state()
+    cache.resolve(api, state)
+    reading = {point_id: float(i) for i, point_id in enumerate(data_dict)}
+    return api, state, data_dict, table, cache, reading
+
+
+def legacy_timestep(api, state, data_dict, cache, reading):
+    standeredDatas = []
+    for item in reading:
+        tmp = data_dict[item]
+        standeredDatas.append(LegacyActuator_obj(tmp[0], tmp[1], tmp[2], reading[item]))
+    for d in standeredDatas:
+        handle = cache.handle_for(api, state, d.component_type, d.control_type, d.actuator_key)
+        api.exchange.set_actuator_value(state, handle, d.value)
+
+
+def frame_timestep(api, state, table, cache, ring, reading):
+    frame = ring.acquire()
+    table.fill(frame, reading)
+    cache.set_frame(api, state, frame, CALLING_POINT)
+
+
+def measure(step, timesteps: int):
+    gc.collect()
+    collections_before = sum(stat['collections'] for stat in gc.get_stats())
+    start = time.perf_counter()
+    for _ in range(timesteps):
+        step()
+    elapsed = time.perf_counter() - start
+    collections = sum(stat['collections'] for stat in gc.get_stats()) - collections_before
+
+    tracemalloc.start()
+    step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / timesteps, peak, collections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', default='1000,5000')
+    parser.add_argument('--timesteps', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'points':>7} {'path':>7} {'us/step':>9} {'peak KiB/step':>14} {'gc runs':>8}")
+    for points in (int(p) for p in args.points.split(',')):
+        api, state, data_dict, table, cache, reading = setup(points)
+        ring = FrameRing(len(table))
+        variants = (('legacy', lambda: legacy_timestep(api, state, data_dict, cache, reading)),
+                    ('frames', lambda: frame_timestep(api, state, table, cache, ring, reading)))
+        for name, step in variants:
+            per_step, peak, collections = measure(step, args.timesteps)
+            print(f"{points:>7} {name:>7} {per_step * 1e6:>9.1f} {peak / 1024:>14.1f} {collections:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Time-to-first-timestep: a cold process per run vs. jobs sent to a warm worker
+
+Both paths run the generated co-simulation of the same site and exchange dictionary on
+the pyenergyplus stand-in: the cold path generates, imports and runs the script in a new
+process each time, the warm worker generates and imports it once. The generated script
+imports pyenergyplus.api, so the benchmark puts a pyenergyplus package re-exporting the
+stand-in on the workers' path.
+--api-init adds a fixed API construction time (STUB_API_INIT_SECONDS) standing in for
+loading the EnergyPlus library, which the stand-in itself does not have.
+
+    python benchmarks/bench_warm_worker.py [--runs 10] [--points 2000] [--api-init 0.0]
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+EXAMPLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, EXAMPLE_DIR)
+
+from warmWorker import WarmWorkerClient, wait_for_socket
+
+STUB_API = 'stubEnergyPlus:StubEnergyPlusAPI'
+
+
+def write_exchange(path: str, points: int):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'component_type', 'control_type', 'actuator_key', 'flag'])
+        for i in range(points):
+            writer.writerow([f'P{i}', 'Schedule:Compact', 'Schedule Value', f'SCHED_{i}', 'set_loop_flag'])
+
+
+def write_site(directory: str):
+    """Site configs generating a co-simulation that runs unpaced, with inputs that fail fast"""
+    os.makedirs(directory, exist_ok=True)
+    configs = {'INPUT_CONFIG': {'type': 'HTTP', 'name': 'link1', 'url': '127.0.0.1:1', 'timeout': 0.2},
+               'SET_CONFIG': {'weather_file': 'weather.epw', 'idf_file': 'model.idf', 'time': 0,
+                              'exchangeDataDict': 'exchange.csv', 'pacing': 'unpaced', 'prefetch_interval': 0.01,
+                              'input_deadline': 0.05},
+               'OUTPUT_CONFIG': {'type': 'sqlite', 'path': os.path.join(directory, 'results.db')}}
+    for name, content in configs.items():
+        with open(os.path.join(directory, f'{name}.yaml'), 'w') as f:
+            yaml.safe_dump(content, f)
+
+
+def write_api_package(directory: str):
+    """pyenergyplus.api resolving to the stand-in, for the generated script's import"""
+    package = os.path.join(directory, 'pyenergyplus')
+    os.makedirs(package, exist_ok=True)
+    open(os.path.join(package, '__init__.py'), 'w').close()
+    with open(os.path.join(package, 'api.py'), 'w') as f:
+        f.write('from stubEnergyPlus import StubEnergyPlusAPI as EnergyPlusAPI\n')
+
+
+def report(name: str, values):
+    print(f"  {name:28s} mean {statistics.mean(values) * 1e3:8.1f} ms   p50 {statistics.median(values) * 1e3:8.1f} ms"
+          f"   max {max(values) * 1e3:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--points', type=int, default=2000)
+    parser.add_argument('--api-init', type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([EXAMPLE_DIR, BENCH_DIR, os.path.join(tmp, 'api')]),
+                   STUB_API_INIT_SECONDS=str(args.api_init))
+        write_api_package(os.path.join(tmp, 'api'))
+        site = os.path.join(tmp, 'site')
+        write_site(site)
+        exchange = os.path.join(tmp, 'exchange.csv')
+        write_exchange(exchange, args.points)
+        job = ['--idf', 'model.idf', '--weather', 'weather.epw', '--site', site, '--exchange', exchange,
+               '--output-dir', os.path.join(tmp, 'out')]
+        stub_args = ['--stub-timesteps', '10']
+
+        cold = []
+        for _ in range(args.runs):
+            launched = time.time()
+            output = subprocess.run([sys.executable, os.path.join(EXAMPLE_DIR, 'warmWorker.py'), 'run',
+                                     '--api', STUB_API, *job, '--args', *stub_args],
+                                    env=env, capture_output=True, text=True, check=True).stdout
+            cold.append(json.loads(output.splitlines()[-1])['first_timestep'] - launched)
+
+        socket_path = os.path.join(tmp, 'worker.sock')
+        server = subprocess.Popen([sys.executable, os.path.join(EXAMPLE_DIR, 'warmWorker.py'), 'serve',
+                                   '--socket', socket_path, '--api', STUB_API],
+                                  env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            assert wait_for_socket(socket_path), 'warm worker did not start'
+            client = WarmWorkerClient(socket_path)
+            request = {'idf': 'model.idf', 'weather': 'weather.epw', 'site': site, 'exchange': exchange,
+                       'output_dir': os.path.join(tmp, 'out'), 'args': stub_args}
+            warm = []
+            for _ in range(args.runs):
+                sent = time.time()
+                reply = client.request(request)
+                assert reply['ok'], reply
+                warm.append(reply['first_timestep'] - sent)
+            stats = client.request({'cmd': 'stats'})
+            client.request({'cmd': 'shutdown'})
+            client.close()
+        finally:
+            server.wait(10)
+
+    print(f"{args.runs} runs, {args.points}-point exchange dictionary, API init {args.api_init * 1e3:.0f} ms")
+    report('cold process per run', cold)
+    report('warm worker', warm)
+    print(f"  warm worker served {stats['jobs']} jobs on one state, startup paid once: "
+          f"{stats['startup_seconds'] * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
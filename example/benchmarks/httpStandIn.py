@@ -0,0 +1,116 @@
+"""
+Local stand-in for a BAS HTTP gateway
+
+GET  /points/<name>   {"data": {"<name>.p0": v, ...}}, with ETag / 304 and gzip support
+POST /batch           body {"urls": [...]}, answers all endpoints in one {"data": {...}}
+
+Values change every `change_every` seconds, so conditional requests see both 200s and 304s.
+
+    python benchmarks/httpStandIn.py [--port 8666] [--points 200]
+"""
+import argparse
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class GatewayState:
+    def __init__(self, points: int, change_every: float):
+        self.points = points
+        self.change_every = change_every
+        self.started = time.monotonic()
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def version(self) -> int:
+        if self.change_every <= 0:
+            return 0
+        return int((time.monotonic() - self.started) / self.change_every)
+
+    def payload(self, name: str, version: int):
+        return {f"{name}.p{i}": float(version + i) for i in range(self.points)}
+
+
+def make_handler(gateway: GatewayState):
+    class GatewayHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # headers and body are separate writes; with Nagle on, keep-alive clients stall on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _count(self):
+            with gateway.lock:
+                gateway.requests += 1
+
+        def _send_json(self, body, etag=None):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            if etag:
+                self.send_header('ETag', etag)
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                data = gzip.compress(data, compresslevel=1)
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._count()
+            path = urlparse(self.path).path
+            name = path.rsplit('/', 1)[-1] or 'root'
+            version = gateway.version()
+            etag = f'"{name}-{version}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self._send_json({'data': gateway.payload(name, version)}, etag)
+
+        def do_POST(self):
+            self._count()
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            version = gateway.version()
+            data = {}
+            for url in request.get('urls', []):
+                data.update(gateway.payload(urlparse(url).path.rsplit('/', 1)[-1], version))
+            self._send_json({'data': data})
+
+    return GatewayHandler
+
+
+def start_server(port: int = 0, points: int = 200, change_every: float = 0.05):
+    """Start the stand-in on a background thread; returns (server, base url, state)"""
+    gateway = GatewayState(points, change_every)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(gateway))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"127.0.0.1:{server.server_address[1]}", gateway
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8666)
+    parser.add_argument('--points', type=int, default=200)
+    parser.add_argument('--change-every', type=float, default=1.0)
+    args = parser.parse_args()
+
+    server, url, _ = start_server(args.port, args.points, args.change_every)
+    print(f"stand-in gateway on http://{url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Stand-in for pyenergyplus.api.EnergyPlusAPI, for benchmarks without EnergyPlus
+
+Only the calls the simulation template uses are provided. get_actuator_handle
+mirrors EnergyPlus, which scans its available-actuator list with case-insensitive
+string compares on every lookup. Output variables and meters answer with values
+derived from the handle and the simulation time.
+
+run_energyplus simulates a run from extra command line options:
+    --stub-timesteps N      timesteps to run (default 96)
+    --stub-step-cost S      busy CPU seconds per timestep (default 0.0005)
+    --stub-exit CODE        exit code to return
+    --stub-hang             never return (for timeout handling)
+
+STUB_API_INIT_SECONDS in the environment makes StubEnergyPlusAPI() take that long,
+standing in for loading the EnergyPlus library.
+"""
+import os
+import time
+from typing import List, Optional, Tuple
+
+
+class StubExchange:
+    def __init__(self, actuators: List[Tuple[str, str, str]], linear_lookup: bool = True,
+                 outputs: Optional[List[Tuple[str, str]]] = None):
+        self.actuators = [tuple(part.upper() for part in actuator) for actuator in actuators]
+        # variables are (name, key), meters are (name, '')
+        self.outputs = [tuple(part.upper() for part in output) for output in outputs or []]
+        self.requested = set()
+        self.sim_time = 0.0
+        self.index = {actuator: handle for handle, actuator in enumerate(self.actuators)}
+        self.linear_lookup = linear_lookup
+        self.values = [0.0] * len(actuators)
+        self.handle_lookups = 0
+        self.writes = 0
+
+    def api_data_fully_ready(self, state) -> bool:
+        return True
+
+    def get_actuator_handle(self, state, component_type: str, control_type: str, actuator_key: str) -> int:
+        self.handle_lookups += 1
+        key = (component_type.upper(), control_type.upper(), actuator_key.upper())
+        if not self.linear_lookup:
+            return self.index.get(key, -1)
+        for handle, actuator in enumerate(self.actuators):
+            if actuator == key:
+                return handle
+        return -1
+
+    def set_actuator_value(self, state, handle: int, value: float):
+        self.writes += 1
+        self.values[handle] = value
+
+    def request_variable(self, state, variable_name: str, variable_key: str):
+        self.requested.add((variable_name.upper(), variable_key.upper()))
+
+    def get_variable_handle(self, state, variable_name: str, variable_key: str) -> int:
+        key = (variable_name.upper(), variable_key.upper())
+        if key not in self.requested or key not in self.outputs:
+            return -1
+        return self.outputs.index(key)
+
+    def get_meter_handle(self, state, meter_name: str) -> int:
+        key = (meter_name.upper(), '')
+        return self.outputs.index(key) if key in self.outputs else -1
+
+    def get_variable_value(self, state, handle: int) -> float:
+        return self.sim_time + handle
+
+    def get_meter_value(self, state, handle: int) -> float:
+        return self.sim_time * handle
+
+    def current_sim_time(self, state) -> float:
+        return self.sim_time
+
+
+class StubRuntime:
+    def __init__(self, exchange: StubExchange):
+        self.exchange = exchange
+        self.callbacks = []
+        self.runs = 0
+        # defaults for the --stub-* options, for callers that cannot change the command line
+        self.options = {'--stub-timesteps': '96', '--stub-step-cost': '0.0005', '--stub-exit': '0'}
+
+    def __getattr__(self, name: str):
+        if name.startswith('callback_'):
+            return lambda state, function: self.callbacks.append((name[len('callback_'):], function))
+        raise AttributeError(name)
+
+    def clear_callbacks(self):
+        self.callbacks = []
+
+    def run_energyplus(self, state, args: List[str]) -> int:
+        self.runs += 1
+        options = dict(self.options)
+        for i, arg in enumerate(args):
+            if arg in options and i + 1 < len(args):
+                options[arg] = args[i + 1]
+        if '--stub-hang' in args:
+            while True:
+                time.sleep(3600)
+        step_cost = float(options['--stub-step-cost'])
+        for step in range(int(options['--stub-timesteps'])):
+            self.exchange.sim_time = step / 4
+            end = time.perf_counter() + step_cost
+            while time.perf_counter() < end:
+                pass
+            for _, function in self.callbacks:
+                function(state)
+        return int(options['--stub-exit'])
+
+
+class StubStateManager:
+    def new_state(self):
+        return object()
+
+    def reset_state(self, state):
+        pass
+
+
+class StubEnergyPlusAPI:
+    def __init__(self, actuators: Optional[List[Tuple[str, str, str]]] = None, linear_lookup: bool = True,
+                 outputs: Optional[List[Tuple[str, str]]] = None):
+        time.sleep(float(os.environ.get('STUB_API_INIT_SECONDS', 0)))
+        self.exchange = StubExchange(actuators or [], linear_lookup, outputs)
+        self.runtime = StubRuntime(self.exchange)
+        self.state_manager = StubStateManager()
@@ -0,0 +1,301 @@
+"""
+Buffered bulk writes of simulation results
+
+BufferedWriter collects rows in memory and a dedicated writer thread flushes them in
+batches (executemany) once `batch_size` rows are pending or every `flush_interval`
+seconds, retrying transient failures with backoff. The simulation thread only appends
+to a list.
+
+Backends:
+    SQLiteBackend  local file, no server needed (also the benchmark stand-in)
+    MySQLBackend   pymysql, imported lazily; its executemany sends multi-row INSERTs
+"""
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+IDENTIFIER = re.compile(r'^\w+$')
+
+logger = logging.getLogger(__name__)
+
+
+def _identifier(name: str) -> str:
+    if not IDENTIFIER.match(name):
+        raise ValueError(f"invalid table or column name: {name!r}")
+    return name
+
+
+class SQLiteBackend:
+    """Results in a local SQLite file"""
+
+    transient_errors = (sqlite3.OperationalError,)
+
+    def __init__(self, path: str = 'energyplus_results.db', timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self.connection = None
+
+    def connect(self):
+        self.connection = sqlite3.connect(self.path, timeout=self.timeout)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+
+    def ensure_table(self, table: str, columns: Sequence[str], types: Dict[str, str]):
+        definition = ', '.join(f'"{column}" {types.get(column, "")}'.rstrip() for column in columns)
+        with self.connection:
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({definition})')
+
+    def write_rows(self, table: str, columns: Sequence[str], rows: List[Sequence[Any]]):
+        names = ', '.join('"%s"' % column for column in columns)
+        statement = f'INSERT INTO "{table}" ({names}) VALUES ({", ".join("?" for _ in columns)})'
+        with self.connection:
+            self.connection.executemany(statement, rows)
+
+    def reconnect(self):
+        self.close()
+        self.connect()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class MySQLBackend:
+    """Results in MySQL through pymysql"""
+
+    def __init__(self, host: str, port: int = 3306, user: str = None, password: str = None,
+                 database: str = None, connect_timeout: float = 10.0):
+        self.params = {'host': host, 'port': int(port), 'user': user, 'password': password,
+                       'database': database, 'connect_timeout': connect_timeout, 'autocommit': False}
+        self.connection = None
+
+    @property
+    def transient_errors(self):
+        # known before the first connect, so a server that is down at startup is retried too
+        try:
+            import pymysql
+        except ImportError:
+            return ()
+        return (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+    def connect(self):
+        import pymysql
+
+        self.connection = pymysql.connect(**self.params)
+
+    def ensure_table(self, table: str, columns: Sequence[str], types: Dict[str, str]):
+        definition = ', '.join(f"`{column}` {types.get(column, 'DOUBLE')}" for column in columns)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS `{table}` ({definition})")
+        self.connection.commit()
+
+    def write_rows(self, table: str, columns: Sequence[str], rows: List[Sequence[Any]]):
+        statement = (f"INSERT INTO `{table}` ({', '.join(f'`{c}`' for c in columns)}) "
+                     f"VALUES ({', '.join('%s' for _ in columns)})")
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.executemany(statement, rows)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def reconnect(self):
+        self.close()
+        self.connect()
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+
+def make_backend(config: Dict[str, Any]):
+    """Backend for one OUTPUT_CONFIG entry (type: sqlite or mysql)"""
+    storage_type = str(config.get('type', 'sqlite')).lower()
+    if storage_type == 'sqlite':
+        return SQLiteBackend(config.get('path', 'energyplus_results.db'))
+    if storage_type == 'mysql':
+        return MySQLBackend(config.get('host'), config.get('port', 3306), config.get('user'),
+                            config.get('password'), config.get('database'))
+    raise ValueError(f"unknown storage type {storage_type}")
+
+
+class BufferedWriter:
+    """
+    Append rows from any thread; a writer thread flushes them to the backend in bulk
+
+    Args:
+        backend: SQLiteBackend, MySQLBackend or anything with the same methods
+        batch_size: pending rows that trigger a flush
+        flush_interval: longest time (s) a row waits before being flushed
+        max_buffer: pending rows kept at most; further rows are counted as dropped
+        retries: attempts per batch after the first on transient errors
+        backoff: first retry delay (s), doubled on each attempt
+    """
+
+    def __init__(self, backend, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_buffer: int = 100000, retries: int = 3, backoff: float = 0.1):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.retries = retries
+        self.backoff = backoff
+        self._tables = {}
+        self._created = set()
+        self._buffers = {}
+        self._pending = 0
+        self._flush_requests = 0
+        self._flushed = 0
+        self._blocked = 0
+        self._closing = False
+        self._condition = threading.Condition()
+        self.rows_written = 0
+        self.batches = 0
+        self.retried = 0
+        self.dropped = 0
+        self.failed = 0
+        self.write_time = 0.0
+        self._thread = threading.Thread(target=self._run, name='storage-writer', daemon=True)
+        self._thread.start()
+
+    def declare(self, table: str, columns: Sequence[str], types: Optional[Dict[str, str]] = None):
+        """Register a table; it is created on the writer thread before its first batch"""
+        with self._condition:
+            self._tables[_identifier(table)] = ([_identifier(column) for column in columns], dict(types or {}))
+            self._buffers.setdefault(table, [])
+
+    def write(self, table: str, row: Sequence[Any]) -> bool:
+        """Queue one row (values in declared column order); returns False if it was dropped"""
+        with self._condition:
+            if self._pending >= self.max_buffer:
+                self.dropped += 1
+                return False
+            self._buffers[table].append(row)
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._condition.notify_all()
+            return True
+
+    def write_many(self, table: str, rows: Sequence[Sequence[Any]], block: bool = False) -> int:
+        """
+        Queue several rows; returns how many were accepted
+
+        With block=True the caller waits for the writer to make room instead of dropping
+        rows, which bounds memory for bulk producers that are not simulation callbacks;
+        rows are then queued in chunks of at most max_buffer.
+        """
+        if block:
+            accepted = 0
+            for start in range(0, len(rows), self.max_buffer):
+                chunk = rows[start:start + self.max_buffer]
+                with self._condition:
+                    # a waiting producer makes the writer flush without waiting for a full batch
+                    self._blocked += 1
+                    self._condition.notify_all()
+                    self._condition.wait_for(lambda: self._pending + len(chunk) <= self.max_buffer
+                                             or not self._thread.is_alive())
+                    self._blocked -= 1
+                    if self._pending + len(chunk) > self.max_buffer:
+                        self.dropped += len(rows) - accepted
+                        return accepted
+                    self._buffers[table].extend(chunk)
+                    self._pending += len(chunk)
+                    accepted += len(chunk)
+                    if self._pending >= self.batch_size:
+                        self._condition.notify_all()
+            return accepted
+        with self._condition:
+            accepted = max(0, min(len(rows), self.max_buffer - self._pending))
+            self._buffers[table].extend(rows[:accepted])
+            self._pending += accepted
+            self.dropped += len(rows) - accepted
+            if self._pending >= self.batch_size:
+                self._condition.notify_all()
+            return accepted
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every row queued so far has been written (or given up on)"""
+        with self._condition:
+            self._flush_requests += 1
+            request = self._flush_requests
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self._flushed >= request or not self._thread.is_alive(),
+                                            timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush, stop the writer thread and close the backend"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            self.backend.connect()
+        except Exception as e:
+            # _write connects again, with the retries and backoff of a failed batch
+            logger.error(f"storage connect failed: {e}")
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending >= self.batch_size or self._closing
+                                         or (self._blocked and self._pending)
+                                         or self._flush_requests > self._flushed, self.flush_interval)
+                batches = [(table, rows) for table, rows in self._buffers.items() if rows]
+                self._buffers = {table: [] for table in self._buffers}
+                self._pending = 0
+                self._condition.notify_all()
+                request = self._flush_requests
+                closing = self._closing
+                tables = dict(self._tables)
+            for table, rows in batches:
+                self._write(table, tables[table], rows)
+            with self._condition:
+                self._flushed = request
+                self._condition.notify_all()
+                if closing and not self._pending:
+                    break
+        self.backend.close()
+
+    def _write(self, table: str, definition, rows: List[Sequence[Any]]):
+        columns, types = definition
+        for attempt in range(self.retries + 1):
+            try:
+                start = time.perf_counter()
+                if self.backend.connection is None:
+                    self.backend.connect()
+                if table not in self._created:
+                    self.backend.ensure_table(table, columns, types)
+                    self._created.add(table)
+                self.backend.write_rows(table, columns, rows)
+                self.write_time += time.perf_counter() - start
+                self.rows_written += len(rows)
+                self.batches += 1
+                return
+            except self.backend.transient_errors as e:
+                if attempt == self.retries:
+                    logger.error(f"storage write to {table} failed after {attempt + 1} attempts: {e}")
+                    break
+                self.retried += 1
+                logger.warning(f"storage write to {table} failed, retrying: {e}")
+                time.sleep(self.backoff * 2 ** attempt)
+                # the next attempt connects again
+                self.backend.close()
+            except Exception as e:
+                logger.error(f"storage write to {table} failed: {e}")
+                break
+        self.failed += len(rows)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._condition:
+            return {'rows_written': self.rows_written, 'batches': self.batches, 'pending': self._pending,
+                    'retried': self.retried, 'dropped': self.dropped, 'failed': self.failed,
+                    'rows_per_second': self.rows_written / self.write_time if self.write_time else 0.0}
@@ -0,0 +1,212 @@
+"""
+Per-stage latency histograms for the co-simulation hot path
+
+Stages are the generated EnergyPlus callbacks (before_predictor_flag,
+before_hvac_managers_flag, itrator_loop_flag, init_heat_flag), fetch_data,
+set_actuator_value / set_actuator_frame, storage flushes and `timestep`, the wall time
+between two reporting callbacks. Time spent inside EnergyPlus itself is what a
+timestep takes beyond its callbacks.
+
+set_actuator_frame is the write of one frame's actuators: the simulator method, or
+the inline write loop of a folded handler, timed through recorder(). set_actuator_value
+counts by-name writes only; folded handlers write handles directly.
+
+Instrumentation is applied by wrapping callables once, at setup: when metrics are
+disabled wrap() hands back the original callable, so the hot path pays nothing.
+Each stage should be observed from one thread; snapshots may be taken from any.
+
+MetricsExporter writes a JSON snapshot and a Prometheus text file periodically.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# upper bounds in seconds, 10 us .. 10 s, roughly 1-2.5-5 per decade
+BUCKETS = (1e-05, 2.5e-05, 5e-05, 1e-04, 2.5e-04, 5e-04, 1e-03, 2.5e-03, 5e-03, 1e-02, 2.5e-02, 5e-02,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_NAME = 'energyplus_stage_seconds'
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram with count, sum and max"""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, bounds: Sequence[float] = BUCKETS):
+        self.bounds = tuple(bounds)
+        # the last slot counts observations above the largest bound
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (max for the overflow bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'sum': self.sum, 'mean': self.sum / self.count if self.count else None,
+                'max': self.max, 'p50': self.quantile(0.5), 'p90': self.quantile(0.9), 'p99': self.quantile(0.99),
+                'buckets': [[bound, count] for bound, count in zip(self.bounds, self.counts)],
+                'overflow': self.counts[-1]}
+
+
+class CallbackMetrics:
+    """
+    Stage name -> LatencyHistogram
+
+    Args:
+        enabled: when False, wrap() returns callables unchanged and tick() does nothing
+        bounds: histogram bucket upper bounds in seconds
+    """
+
+    def __init__(self, enabled: bool = True, bounds: Sequence[float] = BUCKETS):
+        self.enabled = bool(enabled)
+        self.bounds = tuple(bounds)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.started = time.time()
+        self._last_tick: Dict[str, float] = {}
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(stage, LatencyHistogram(self.bounds))
+        return histogram
+
+    def observe(self, stage: str, seconds: float):
+        if self.enabled:
+            self.histogram(stage).observe(seconds)
+
+    def wrap(self, stage: str, function: Callable) -> Callable:
+        """`function`, timed into `stage`; `function` itself when disabled"""
+        if not self.enabled:
+            return function
+        observe = self.histogram(stage).observe
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(clock() - start)
+
+        return timed
+
+    def recorder(self, stage: str) -> Optional[Callable[[float], None]]:
+        """observe() of `stage` for timing an inline block, None when disabled"""
+        return self.histogram(stage).observe if self.enabled else None
+
+    def tick(self, stage: str = 'timestep'):
+        """Record the time since the previous tick of `stage`"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        last = self._last_tick.get(stage)
+        self._last_tick[stage] = now
+        if last is not None:
+            self.histogram(stage).observe(now - last)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'created': time.time(), 'started': self.started, 'enabled': self.enabled,
+                'stages': {stage: histogram.to_dict() for stage, histogram in list(self.histograms.items())}}
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = [f"# HELP {METRIC_NAME} Latency of co-simulation stages",
+                 f"# TYPE {METRIC_NAME} histogram"]
+        maxima = []
+        for stage, histogram in sorted(list(self.histograms.items())):
+            label = stage.replace('\\', '\\\\').replace('"', '\\"')
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{label}",le="{bound!r}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{stage="{label}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{label}"}} {histogram.sum!r}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{label}"}} {histogram.count}')
+            maxima.append(f'energyplus_stage_max_seconds{{stage="{label}"}} {histogram.max!r}')
+        if maxima:
+            lines += ['# HELP energyplus_stage_max_seconds Slowest observation per stage',
+                      '# TYPE energyplus_stage_max_seconds gauge', *maxima]
+        return '\n'.join(lines) + '\n'
+
+
+def _write_atomic(path: str, text: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """
+    Periodically write a metrics snapshot as JSON and as Prometheus text
+
+    Args:
+        metrics: CallbackMetrics to export
+        json_path / prometheus_path: output files, None to skip
+        interval: seconds between writes; stop() writes a final one
+    """
+
+    def __init__(self, metrics: CallbackMetrics, json_path: Optional[str] = None,
+                 prometheus_path: Optional[str] = None, interval: float = 10.0):
+        self.metrics = metrics
+        self.json_path = json_path
+        self.prometheus_path = prometheus_path
+        self.interval = interval
+        self.writes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def export(self):
+        try:
+            if self.json_path:
+                _write_atomic(self.json_path, json.dumps(self.metrics.snapshot(), indent=2))
+            if self.prometheus_path:
+                _write_atomic(self.prometheus_path, self.metrics.prometheus_text())
+            self.writes += 1
+        except OSError as e:
+            logger.error(f"metrics export failed: {e}")
+
+    def start(self):
+        if not self.metrics.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='metrics-export', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.export()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
@@ -0,0 +1,180 @@
+"""
+Binary snapshot of the exchange dictionary
+
+The exchange workbook (id, component_type, control_type, actuator_key, ..., flag) is
+compiled once into `<workbook>.snapshot`, a pickle keyed by the workbook's sha256.
+Loading checks the workbook's mtime/size first and only re-hashes when they moved,
+so the generator and the generated simulator never walk the spreadsheet again.
+
+Usage:
+    python exchangeSnapshot.py exampleDict.xlsx [-o exampleDict.xlsx.snapshot]
+"""
+import argparse
+import csv
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+SNAPSHOT_MAGIC = 'exchange-snapshot'
+SNAPSHOT_VERSION = 1
+OUTPUT_TYPES = ('Meter', 'Variable')
+
+logger = logging.getLogger(__name__)
+
+
+def read_workbook_rows(file_path: str) -> List[List[Any]]:
+    """Read header and rows of the first sheet (.xls/.xlsx through xlrd) or of a .csv export"""
+    if file_path.lower().endswith('.csv'):
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            return [row for row in csv.reader(f)]
+    import xlrd
+
+    sheet = xlrd.open_workbook(file_path).sheet_by_index(0)
+    return [sheet.row_values(i) for i in range(sheet.nrows)]
+
+
+class ExchangeSnapshot:
+    """
+    Compiled exchange dictionary
+
+    Attributes:
+        ids: point ids in workbook order; the position is the point index
+        rows: per point, the workbook row without its id
+        index: point id -> point index
+        output_ids: ids of Meter/Variable rows
+    """
+
+    def __init__(self, header: List[Any], ids: List[Any], rows: List[Tuple], source_sha256: str = ''):
+        self.header = header
+        self.ids = ids
+        self.rows = rows
+        self.source_sha256 = source_sha256
+        self.index = {point_id: i for i, point_id in enumerate(ids)}
+        self.output_ids = [point_id for point_id, row in zip(ids, rows) if row and row[0] in OUTPUT_TYPES]
+
+    @classmethod
+    def from_rows(cls, table: List[List[Any]], source_sha256: str = '') -> 'ExchangeSnapshot':
+        if not table or len(table[0]) < 2 or table[0][0] != 'id' or table[0][1] != 'component_type':
+            raise ValueError("exchange dictionary must start with the columns 'id', 'component_type'")
+        ids, rows = [], []
+        for line in table[1:]:
+            if not line or line[0] in ('', None):
+                continue
+            ids.append(line[0])
+            # repeated component/control types share one string object in memory and in the pickle
+            rows.append(tuple(sys.intern(value) if isinstance(value, str) else value for value in line[1:]))
+        return cls(list(table[0]), ids, rows, source_sha256)
+
+    @property
+    def data_dict(self) -> Dict[Any, List[Any]]:
+        """id -> row, the layout preprocess() used to build"""
+        return {point_id: list(row) for point_id, row in zip(self.ids, self.rows)}
+
+    @property
+    def output_dict(self) -> Dict[Any, List[Any]]:
+        return {point_id: list(self.rows[self.index[point_id]]) for point_id in self.output_ids}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getstate__(self):
+        # the id index is rebuilt on load, it is cheaper than unpickling it
+        return {'header': self.header, 'ids': self.ids, 'rows': self.rows, 'source_sha256': self.source_sha256}
+
+    def __setstate__(self, state):
+        self.__init__(state['header'], state['ids'], state['rows'], state['source_sha256'])
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_path_for(file_path: str) -> str:
+    return f"{file_path}.snapshot"
+
+
+def compile_snapshot(file_path: str, snapshot_path: Optional[str] = None) -> ExchangeSnapshot:
+    """Read the workbook and write its snapshot next to it"""
+    source_sha256 = file_sha256(file_path)
+    snapshot = ExchangeSnapshot.from_rows(read_workbook_rows(file_path), source_sha256)
+    _write_snapshot(snapshot_path or snapshot_path_for(file_path), snapshot, os.stat(file_path))
+    return snapshot
+
+
+def load_exchange_dict(file_path: str, snapshot_path: Optional[str] = None) -> ExchangeSnapshot:
+    """
+    Load the exchange dictionary from its snapshot, compiling it when missing or stale
+
+    Args:
+        file_path: the exchange workbook
+        snapshot_path: defaults to `<file_path>.snapshot`
+
+    Returns:
+        ExchangeSnapshot
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(file_path)
+    source_stat = os.stat(file_path)
+    stamp = (source_stat.st_mtime_ns, source_stat.st_size)
+
+    header = _read_snapshot(snapshot_path)
+    if header is not None:
+        meta, snapshot = header
+        if meta['stamp'] == stamp:
+            return snapshot
+        # touched but maybe not modified: compare content before recompiling
+        if meta['sha256'] == file_sha256(file_path):
+            _write_snapshot(snapshot_path, snapshot, source_stat)
+            return snapshot
+
+    logger.info(f"compiling exchange dictionary snapshot for {file_path}")
+    return compile_snapshot(file_path, snapshot_path)
+
+
+def _read_snapshot(snapshot_path: str):
+    try:
+        with open(snapshot_path, 'rb') as f:
+            meta = pickle.load(f)
+            if meta.get('magic') != SNAPSHOT_MAGIC or meta.get('version') != SNAPSHOT_VERSION:
+                return None
+            return meta, pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"ignoring unreadable snapshot {snapshot_path}: {e}")
+        return None
+
+
+def _write_snapshot(snapshot_path: str, snapshot: ExchangeSnapshot, source_stat: os.stat_result):
+    meta = {'magic': SNAPSHOT_MAGIC, 'version': SNAPSHOT_VERSION, 'sha256': snapshot.source_sha256,
+            'stamp': (source_stat.st_mtime_ns, source_stat.st_size)}
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(snapshot_path)), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except OSError as e:
+        logger.warning(f"could not write snapshot {snapshot_path}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile an exchange dictionary into a binary snapshot')
+    parser.add_argument('workbook')
+    parser.add_argument('-o', '--output', default=None)
+    args = parser.parse_args(argv)
+
+    snapshot = compile_snapshot(args.workbook, args.output)
+    print(f"{len(snapshot)} points ({len(snapshot.output_ids)} outputs) -> "
+          f"{args.output or snapshot_path_for(args.workbook)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+"""
+Long-running generation daemon
+
+Keeps one generator (compiled templates, plugin metadata) and the parsed site configs
+in memory, watches every file a site's output depends on (its three yaml files, the
+exchange dictionary, the template and the input/storage plugin sources) and
+regenerates a site as soon as one of them changes. Requests are answered from memory
+when nothing changed.
+
+Requests, over HTTP on localhost:
+    GET  /status
+    GET  /generate?site=NAME[&force=1]      (POST with a JSON body works as well)
+or over a Unix socket, one JSON object per line in each direction:
+    {"cmd": "generate", "site": NAME, "force": false} | {"cmd": "status"} | {"cmd": "shutdown"}
+
+Usage:
+    python generationDaemon.py SOURCE -o OUT_DIR [--http 127.0.0.1:8765] [--socket PATH] [--interval 0.05]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from CodeGenerator import TEMPLATE_PATH, CodeGenerator, build_generation_config, load_yaml
+from batchGenerator import OUTPUT_NAME, GenerationJob, JobResult, discover_jobs
+from incrementalBuild import IncrementalGenerator
+from templateCache import TemplateCache
+from warmWorker import private_socket_dir, private_umask, runtime_path
+
+DEFAULT_SOCKET = runtime_path('energyplus-codegen.sock')
+
+logger = logging.getLogger(__name__)
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SiteState:
+    """What the daemon remembers about one site between generations"""
+
+    def __init__(self, job: GenerationJob, output_path: str):
+        self.job = job
+        self.output_path = output_path
+        # path -> stamp of every file the last generation read
+        self.stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.result: Optional[JobResult] = None
+        self.generations = 0
+
+    def changed(self) -> List[str]:
+        return [path for path, stamp in self.stamps.items() if file_stamp(path) != stamp]
+
+
+class GenerationDaemon:
+    """
+    Generates sites on request or on change, reusing everything that did not change
+
+    Args:
+        source: site directory or manifest, as for batchGenerator
+        out_dir: each site writes OUT_DIR/<name>/generated_energyplus.py
+        template_path: main process template
+        interval: seconds between two scans of the watched files
+    """
+
+    def __init__(self, source: str, out_dir: str, template_path: str = TEMPLATE_PATH, interval: float = 0.05):
+        self.source = source
+        self.out_dir = out_dir
+        self.template_path = os.path.abspath(template_path)
+        self.interval = interval
+        self.generator = IncrementalGenerator(CodeGenerator(TemplateCache()))
+        self.sites: Dict[str, SiteState] = {}
+        self.source_stamp = None
+        self.requests = 0
+        self.regenerations = 0
+        self.started = time.time()
+        self._yaml_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def load_yaml(self, path: str):
+        """Parsed yaml, re-read only when the file changed"""
+        stamp = file_stamp(path)
+        cached = self._yaml_cache.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, load_yaml(path))
+            self._yaml_cache[path] = cached
+        return cached[1]
+
+    def refresh_sites(self, force: bool = False) -> bool:
+        """Pick up added and removed sites when the source listing or manifest changed"""
+        stamp = file_stamp(self.source)
+        if stamp == self.source_stamp and self.sites and not force:
+            return False
+        self.source_stamp = stamp
+        jobs = {job.name: job for job in discover_jobs(self.source)}
+        for name in list(self.sites):
+            if name not in jobs:
+                del self.sites[name]
+        for name, job in jobs.items():
+            site = self.sites.get(name)
+            if site is None or vars(site.job) != vars(job):
+                self.sites[name] = SiteState(job, os.path.join(self.out_dir, name, OUTPUT_NAME))
+        return True
+
+    def _dependencies(self, job: GenerationJob, set_config: Dict[str, Any], config: Dict[str, Any]) -> List[str]:
+        paths = [job.input_path, job.set_path, job.output_path, self.template_path]
+        exchange_file = set_config.get('exchange_file') or set_config.get('exchangeDataDict')
+        if exchange_file:
+            paths.append(os.path.join(job.base_dir, exchange_file))
+        registry = self.generator.generator.plugin_registry
+        plugins = [(item['module'], item['class_name']) for item in config.get('input_loaders', [])]
+        storage = config.get('storage_init', {})
+        if 'mysql_config' in storage:
+            plugins.append((storage.get('module', storage.get('class_name')), storage.get('class_name')))
+        for module, class_name in plugins:
+            paths.append(registry.get(module, class_name).path)
+        return [os.path.abspath(path) for path in paths]
+
+    def generate(self, name: str, force: bool = False) -> Dict[str, Any]:
+        """Generate one site unless none of its inputs changed since the last generation"""
+        with self._lock:
+            self.requests += 1
+            site = self.sites.get(name)
+            if site is None:
+                # a site folder may have been filled in after the source listing last changed
+                self.refresh_sites(force=True)
+                site = self.sites.get(name)
+            if site is None:
+                return {'name': name, 'ok': False, 'error': f"unknown site {name}"}
+            if not force and site.result is not None and site.result.ok and not site.changed():
+                return dict(site.result.to_dict(), cached=True)
+            return dict(self._regenerate(site).to_dict(), cached=False)
+
+    def _regenerate(self, site: SiteState) -> JobResult:
+        job = site.job
+        start = time.perf_counter()
+        # stamps are taken before reading, so an edit made during generation triggers another one
+        before = {path: file_stamp(path) for path in site.stamps}
+        try:
+            set_config = self.load_yaml(job.set_path) or {}
+            config = build_generation_config(self.load_yaml(job.input_path), set_config,
+                                             self.load_yaml(job.output_path), template_path=self.template_path,
+                                             base_dir=job.base_dir, generator=self.generator.generator)
+            dependencies = self._dependencies(job, set_config, config)
+            stamps = {path: before[path] if path in before else file_stamp(path) for path in dependencies}
+            os.makedirs(os.path.dirname(site.output_path), exist_ok=True)
+            report = self.generator.generate(config, site.output_path)
+            with open(site.output_path, 'rb') as f:
+                generated_code = f.read()
+            compile(generated_code, job.name, 'exec')
+            result = JobResult(job.name, True, site.output_path, hashlib.sha256(generated_code).hexdigest(),
+                               seconds=time.perf_counter() - start, rebuilt=report.rebuilt, written=report.written)
+        except Exception as e:
+            # keep watching the config files, the site is retried once one of them changes
+            stamps = dict(before)
+            for path in (job.input_path, job.set_path, job.output_path, self.template_path):
+                stamps.setdefault(os.path.abspath(path), file_stamp(path))
+            result = JobResult(job.name, False, error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - start)
+        site.stamps = stamps
+        site.result = result
+        site.generations += 1
+        self.regenerations += 1
+        level = logging.INFO if result.ok else logging.ERROR
+        logger.log(level, f"{job.name}: {'generated' if result.ok else result.error} in {result.seconds * 1e3:.1f} ms")
+        return result
+
+    def poll(self) -> List[str]:
+        """One scan of the watched files; returns the sites that were regenerated"""
+        with self._lock:
+            try:
+                self.refresh_sites()
+            except Exception as e:
+                logger.error(f"cannot read {self.source}: {e}")
+            regenerated = []
+            for name, site in self.sites.items():
+                if site.result is None or site.changed():
+                    self._regenerate(site)
+                    regenerated.append(name)
+            return regenerated
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'ok': True, 'pid': os.getpid(), 'uptime': time.time() - self.started,
+                    'requests': self.requests, 'regenerations': self.regenerations,
+                    'template_cache': {'hits': self.generator.generator.template_cache.hits,
+                                       'misses': self.generator.generator.template_cache.misses},
+                    'sites': {name: {'generations': site.generations, 'watched': len(site.stamps),
+                                     **(site.result.to_dict() if site.result is not None else {})}
+                              for name, site in self.sites.items()}}
+
+    def start(self):
+        """Generate every site once, then watch for changes on a background thread"""
+        self.poll()
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='codegen-watch', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"watch: {e}")
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request: generate (the default), status or ping"""
+        command = request.get('cmd', 'generate')
+        if command == 'ping':
+            return {'ok': True}
+        if command == 'status':
+            return self.status()
+        if command == 'generate':
+            if not request.get('site'):
+                return {'ok': False, 'error': 'site is required'}
+            return self.generate(request['site'], bool(request.get('force')))
+        return {'ok': False, 'error': f"unknown command {command}"}
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        request = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        request['cmd'] = url.path.strip('/') or 'status'
+        request['force'] = request.get('force') in ('1', 'true', 'yes')
+        self._reply(request)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send(400, {'ok': False, 'error': 'invalid json'})
+        request.setdefault('cmd', urlparse(self.path).path.strip('/') or 'generate')
+        self._reply(request)
+
+    def _reply(self, request: Dict[str, Any]):
+        if request['cmd'] == 'shutdown':
+            return self._send(404, {'ok': False, 'error': 'shutdown is only accepted on the unix socket'})
+        reply = self.server.daemon.handle(request)
+        if reply.get('ok'):
+            code = 200
+        else:
+            code = 404 if str(reply.get('error', '')).startswith('unknown') else 500
+        self._send(code, reply)
+
+    def _send(self, code: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class DaemonHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], daemon: GenerationDaemon):
+        self.daemon = daemon
+        super().__init__(address, _HTTPHandler)
+
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if request.get('cmd') == 'shutdown':
+                    reply = {'ok': True}
+                    threading.Thread(target=self.server.shutdown_all, daemon=True).start()
+                else:
+                    reply = self.server.daemon.handle(request)
+            except Exception as e:
+                reply = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class DaemonSocketServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: GenerationDaemon, on_shutdown=None):
+        private_socket_dir(socket_path)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.daemon = daemon
+        self.on_shutdown = on_shutdown
+        super().__init__(socket_path, _SocketHandler)
+
+    def server_bind(self):
+        with private_umask():
+            super().server_bind()
+
+    def shutdown_all(self):
+        if self.on_shutdown is not None:
+            self.on_shutdown()
+        self.shutdown()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Generation daemon with file watching and warm caches')
+    parser.add_argument('source', help='directory of site config folders, or a manifest yaml')
+    parser.add_argument('-o', '--out-dir', default='generated')
+    parser.add_argument('--template', default=TEMPLATE_PATH)
+    parser.add_argument('--http', default=None, help='host:port to serve HTTP on, e.g. 127.0.0.1:8765')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='unix socket path ("" to disable)')
+    parser.add_argument('--interval', type=float, default=0.05, help='seconds between file scans')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    daemon = GenerationDaemon(args.source, args.out_dir, args.template, args.interval)
+    daemon.start()
+    servers = []
+    if args.http:
+        servers.append(DaemonHTTPServer(parse_address(args.http), daemon))
+    if args.socket:
+        servers.append(DaemonSocketServer(args.socket, daemon,
+                                          on_shutdown=lambda: [server.shutdown() for server in servers[:-1]]))
+    if not servers:
+        parser.error('nothing to serve: give --http and/or --socket')
+    for server in servers[:-1]:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"watching {len(daemon.sites)} sites; serving on "
+                f"{', '.join(str(server.server_address) for server in servers)}")
+    try:
+        servers[-1].serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        for server in servers:
+            server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
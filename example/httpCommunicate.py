@@ -1,35 +1,120 @@
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class httpCommunication:
 
-    #通过正则化实现替换httpCommunicate()方法
-    describe = f'''
-    import {httpCommunication.__class__.__name__}
-    def __get_{httpCommunication.__class__.__name__}_Instance(self):
-        instance = {httpCommunication.__class__.__name__}()
-        self.instances.append(instance)
+    #生成器通过AST静态读取该片段，不会导入本模块
+    description = '''
+    def _get_httpCommunication_instance(self, name):
+        import httpCommunicate
+        instance = httpCommunicate.httpCommunication()
+        self.instances[name] = instance
+        return instance
     '''
 
 
     def __init__(self):
-        pass
+        self.session = None
+        self.name = None
+        self.base_url = None
+        self.timeout = None
+        self.endpoints = []
+        self.batch_url = None
+        # url -> (ETag, Last-Modified) and url -> last payload, for conditional requests
+        self.validators = {}
+        self.cache = {}
+
+    @staticmethod
+    def _with_scheme(url):
+        if url and '://' not in url:
+            return f"http://{url}"
+        return url
+
     def connect(self, config):
+        """
+        Open a pooled keep-alive session to the gateway
+
+        config keys: url, timeout, and optionally endpoints (several urls polled per timestep),
+        batch_url (gateway endpoint answering several endpoints in one request),
+        pool_size and retries
+
+        Returns:
+            False when the gateway could not be reached
+        """
         try:
             self.name = config.get("name")
-            self.base_url = config.get("url")
+            self.base_url = self._with_scheme(config.get("url"))
             self.timeout = config.get("timeout")
-            response = requests.get(self.base_url, timeout=self.timeout)
+            self.endpoints = [self._with_scheme(url) for url in config.get("endpoints", [])]
+            self.batch_url = self._with_scheme(config.get("batch_url"))
+
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.get("pool_size", 4),
+                                  max_retries=config.get("retries", 0))
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+            self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+            # opens the connection the timesteps will reuse
+            self.session.get(self.base_url, timeout=self.timeout)
         except Exception as e:
             print('Error:', e)
+            return False
         return True
-    def get_data(self, url):
+
+    def get_data(self, url=None):
+        """
+        Fetch the current readings
+
+        Args:
+            url: an endpoint, a list of endpoints, or None for the configured endpoints
+                 (or the base url when none are configured)
+
+        Returns:
+            point id -> value, merged over the endpoints in order
+        """
         try:
-            response = requests.get(self.base_url, timeout=self.timeout)
+            if url is None:
+                url = self.endpoints or self.base_url
+            if isinstance(url, (list, tuple)):
+                return self.get_many(url)
+            return self._get(self._with_scheme(url))
         except Exception as e:
             print('Error:', e)
+            return None
+
+    def get_many(self, urls):
+        """Fetch several endpoints: one batched request when the gateway has batch_url, else one each"""
+        urls = [self._with_scheme(url) for url in urls]
+        if self.batch_url:
+            response = self.session.post(self.batch_url, json={'urls': urls}, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()['data']
+        data = {}
+        for url in urls:
+            data.update(self._get(url))
+        return data
+
+    def _get(self, url):
+        headers = {}
+        etag, last_modified = self.validators.get(url, (None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and url in self.cache:
+            return self.cache[url]
+        response.raise_for_status()
+
+        data = response.json()['data']
+        if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+            self.validators[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            self.cache[url] = data
+        return data
 
-        data = response.json()
-        return data['data']
-     def close(self):
-         pass
\ No newline at end of file
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
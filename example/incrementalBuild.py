@@ -0,0 +1,153 @@
+"""
+Incremental regeneration: rebuild only the fragments whose config section changed
+
+The fingerprints of every config section, the fragments built from them and the
+digest of the last written output are kept in a json state file next to the output.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+from CodeGenerator import FRAGMENT_BUILDERS, CodeGenerator
+
+# Bump when fragment builders change their output so every section is rebuilt once
+STATE_VERSION = 5
+
+
+def fingerprint(value: Any) -> str:
+    """Stable hash of a config section or fragment"""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+class BuildReport:
+    """
+    What an incremental run did
+
+    Attributes:
+        rebuilt: markers whose config section changed and whose fragment was regenerated
+        changed: rebuilt markers whose fragment text actually differs from the previous run
+        reused: markers served from the state file
+        written: False when the output on disk was already byte-identical
+    """
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.rebuilt = []
+        self.changed = []
+        self.reused = []
+        self.template_changed = False
+        self.written = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'output_path': self.output_path, 'rebuilt': self.rebuilt, 'changed': self.changed,
+                'reused': self.reused, 'template_changed': self.template_changed, 'written': self.written}
+
+    def __str__(self):
+        action = 'written' if self.written else 'unchanged, write skipped'
+        rebuilt = ', '.join(self.rebuilt) or 'none'
+        return f"{self.output_path}: {action}; rebuilt sections: {rebuilt}"
+
+
+class IncrementalGenerator:
+    """
+    Wraps CodeGenerator.generate_energyplus_code with per-section fingerprints
+
+    Args:
+        generator: generator used to build fragments and render the template
+    """
+
+    def __init__(self, generator: Optional[CodeGenerator] = None):
+        self.logger = logging.getLogger(__name__)
+        self.generator = generator or CodeGenerator()
+
+    @staticmethod
+    def state_path(output_path: str) -> str:
+        return f"{output_path}.codegen-state.json"
+
+    def generate(self, config: Dict[str, Any], output_path: str) -> BuildReport:
+        """Regenerate output_path from config, touching the file only if its content changes"""
+        report = BuildReport(output_path)
+        state = self._load_state(output_path)
+        previous = state.get('fragments', {})
+
+        with open(config.get('template_path'), 'r', encoding='utf-8') as f:
+            template_code = f.read()
+        compiled = self.generator.compile_template(template_code)
+        report.template_changed = state.get('template') != compiled.digest
+
+        replacements = {}
+        fragments = {}
+        for marker, section, _ in FRAGMENT_BUILDERS:
+            if section not in config:
+                continue
+            section_print = fingerprint([config[section],
+                                         self.generator.fragment_dependencies(marker, config[section])])
+            entry = previous.get(marker)
+            if entry is not None and entry.get('section') == section_print:
+                fragment = entry['fragment']
+                report.reused.append(marker)
+            else:
+                fragment = self.generator.generate_fragment(marker, config[section])
+                report.rebuilt.append(marker)
+                if entry is None or entry.get('digest') != fingerprint(fragment):
+                    report.changed.append(marker)
+            replacements[marker] = fragment
+            fragments[marker] = {'section': section_print, 'digest': fingerprint(fragment), 'fragment': fragment}
+        for marker in previous:
+            if marker not in fragments:
+                report.changed.append(marker)
+
+        generated_code = compiled.render(replacements)
+        encoded = generated_code.encode('utf-8')
+        if self._read_bytes(output_path) != encoded:
+            self._atomic_write(output_path, encoded)
+            report.written = True
+
+        self._save_state(output_path, {'version': STATE_VERSION, 'template': compiled.digest,
+                                       'output': hashlib.sha256(encoded).hexdigest(), 'fragments': fragments})
+        self.logger.info(str(report))
+        return report
+
+    def _load_state(self, output_path: str) -> Dict[str, Any]:
+        try:
+            with open(self.state_path(output_path), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if state.get('version') != STATE_VERSION:
+            return {}
+        return state
+
+    def _save_state(self, output_path: str, state: Dict[str, Any]):
+        try:
+            data = json.dumps(state, sort_keys=True, indent=1).encode('utf-8')
+            if self._read_bytes(self.state_path(output_path)) != data:
+                self._atomic_write(self.state_path(output_path), data)
+        except OSError as e:
+            self.logger.warning(f"could not save generation state: {e}")
+
+    @staticmethod
+    def _read_bytes(path: str) -> Optional[bytes]:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -1,18 +1,23 @@
 import logging
 import os
 import queue
-import subprocess
+import shutil
 import sys
 import tempfile
-from datetime import time
 from logging.handlers import RotatingFileHandler
-from plistlib import Dict
-
-import OUTPUT_CONFIG
-import INPUT_CONFIG
-import SET_CONFIG
-import xlrd
-from numba import Any
+from time import perf_counter
+from typing import Any, Dict
+
+from actuatorTable import ActuatorHandleCache, ExchangeTable, FrameRing
+from asyncInput import AsyncInputPoller
+from bulkStorage import BufferedWriter, make_backend
+from callbackMetrics import CallbackMetrics, MetricsExporter
+from exchangeSnapshot import load_exchange_dict
+from outputCapture import OutputCapture
+from outputStream import AGGREGATIONS, OutputStreamProcessor
+from pacing import make_pacer
+from prefetchPipeline import BoundedChannel, PrefetchPipeline
+from sharedRing import SharedInputProcess
 
 from pyenergyplus.api import EnergyPlusAPI
 
@@ -30,6 +35,10 @@ OUTPUT_CONFIG = load_yaml(os.path.join(os.path.dirname(__file__), 'OUTPUT_CONFIG
 
 def setup_logging():
     """设置日志配置"""
+    logger = logging.getLogger()
+    # once per process: every imported script shares the root logger
+    if any(handler.get_name() == 'energyplus_file' for handler in logger.handlers):
+        return logger
     log_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
@@ -40,6 +49,7 @@ def setup_logging():
         maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=5
     )
+    file_handler.set_name('energyplus_file')
     file_handler.setFormatter(log_formatter)
     file_handler.setLevel(logging.INFO)
 
@@ -49,7 +59,6 @@ def setup_logging():
     console_handler.setLevel(logging.INFO)
 
     # 主日志器
-    logger = logging.getLogger()
     logger.setLevel(logging.INFO)
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
@@ -59,33 +68,36 @@ def setup_logging():
 
 def preprocess(file_path):
     try:
-        xls_table = xlrd.open_workbook(file_path)
-        sheet = xls_table.sheet_by_index(0)
-        rows = sheet.nrows
-        l = sheet.row_values(0)
-        if l[0] != 'id' or l[1] != 'component_type':
-            return False
-        for i in range(1, rows):
-            line = sheet.row_values(i)
-            if line[1] == 'Meter' or line[1] == 'Variable':
-                output_dict.update({line[0]: line[1:]})
-                data_dict.update({line[0]: line[1:]})
-            else:
-                data_dict.update({line[0]: line[1:]})
-        print(data_dict)
+        snapshot = load_exchange_dict(file_path)
+        for point_id, line in zip(snapshot.ids, snapshot.rows):
+            if line[0] == 'Meter' or line[0] == 'Variable':
+                output_dict.update({point_id: list(line)})
+            data_dict.update({point_id: list(line)})
         return True
-    except:
+    except Exception as e:
+        print('Error loading exchange dictionary: ', e)
         return False
 
 
-logger = setup_logging()
+def fan_out(*handlers):
+    """One EnergyPlus callback running several handlers in order"""
+    if len(handlers) == 1:
+        return handlers[0]
 
-api = EnergyPlusAPI()
-state = api.state_manager.new_state()
+    def dispatch(state):
+        for handler in handlers:
+            handler(state)
+
+    return dispatch
+
+
+# importing this script does no setup: logging, the EnergyPlus API and state are created by run()
+logger = logging.getLogger()
+
+api = None
+state = None
 
 
-data_dict = {}
-output_dict = {}
 dictFlag = {'window sading control': 'init_heat_balance_flag', 'thermal envelope': 'init_heat_balance_flag',
             'surface': 'init_heat_balance_flag', 'other side boundary condition': 'init_heat_balance_flag',
             'condfd surface material layer': 'init_heat_balance_flag',
@@ -109,10 +121,10 @@ dictFlag = {'window sading control': 'init_heat_balance_flag', 'thermal envelope
             'Supply Side Half Loop': 'before_hvac_managers_flag',
             'Supply Side Branch': 'before_hvac_managers_flag', 'Demand Side Branch': 'before_hvac_managers_flag',
             'Plant Component': 'before_hvac_managers_flag',
-            'Outdoor Air System Node': 'before_havc_managers_flag', '“AirLoopHVAC': 'before_hvac_managers_flag',
+            'Outdoor Air System Node': 'before_hvac_managers_flag', 'AirLoopHVAC': 'before_hvac_managers_flag',
             'Ideal Loads Air System': 'before_hvac_managers_flag',
             'Fan': 'before_hvac_managers_flag',
-            '“Coil:Cooling:DX:SingleSpeed:ThermalStorage': 'before_hvac_managers_flag',
+            'Coil:Cooling:DX:SingleSpeed:ThermalStorage': 'before_hvac_managers_flag',
             'Unitary HVAC': 'itrator_loop_flag',
             'AirLoopHVAC:Unitary:Furnace:HeatOnly': 'itrator_loop_flag',
             'AirLoopHVAC:UnitaryHeatOnly': 'itrator_loop_flag',
@@ -128,11 +140,25 @@ dictFlag = {'window sading control': 'init_heat_balance_flag', 'thermal envelope
             'Constant Flow Low Temp Radiant': 'itrator_loop_flag',
             'Variable Refrigerant Flow Heat Pump': 'itrator_loop_flag',
             'Variable Refrigerant Flow Terminal Unit': 'itrator_loop_flag', 'Weather Data': 'set_weather_flag'}
+{{exchangeData}}
+'''
+data_dict = {}
+output_dict = {}
+preprocess(os.path.join(os.path.dirname(__file__), SETTINGS_CONFIG.get('exchangeDataDict')))
+'''
+# exchange points split by calling point once, so each callback only walks its own actuators
+exchange_table = ExchangeTable(data_dict, dictFlag)
+# per-stage latency histograms; disabled, the instrumented callables are the plain ones.
+# run() replaces it with one configured by that run's settings
+metrics = CallbackMetrics(SETTINGS_CONFIG.get('metrics', False))
 produces = []
 monitings = []
 
 class Actuator_obj:
-    def __init__(self, component_type, control_type, actuator_key, value):
+    __slots__ = ('point_id', 'control_type', 'actuator_key', 'value', 'component_type')
+
+    def __init__(self, component_type, control_type, actuator_key, value, point_id=None):
+        self.point_id = point_id
         self.control_type = control_type
         self.actuator_key = actuator_key
         self.value = value
@@ -148,9 +174,19 @@ class Config:
 
     def set_queues(self):
         {{initQueue}}
-        '''self.weatherData = queue.Queue()'''
+        '''self.weatherData = BoundedChannel(maxsize=2, policy='latest', timeout=0.1)'''
         pass
 
+    def channels(self):
+        """Channels the prefetch pipeline feeds"""
+        return [value for value in vars(self).values() if isinstance(value, BoundedChannel)]
+
+    def attach(self, input_process):
+        """Read every channel from the input process's shared-memory ring instead"""
+        for name, value in list(vars(self).items()):
+            if isinstance(value, BoundedChannel):
+                setattr(self, name, input_process.channel())
+
 
 class InputCommunicate:
 
@@ -161,6 +197,10 @@ class InputCommunicate:
     def __init__(self):
         self.instances = {}
         self.inputs = []
+        self.poller = None
+        # a frame stays in use while queued or held as a channel's last value, so the ring
+        # must outlast the deepest channel plus the frame being filled
+        self.frames = FrameRing(len(exchange_table), capacity=SETTINGS_CONFIG.get('queue_size', 2) + 2)
 
 
         {{importInitInput}}
@@ -168,8 +208,15 @@ class InputCommunicate:
 
     def input_connect(self):
         try:
-            for config in INPUT_CONFIG:
-                self.inputs.append(self.instances[config.name].connect(config))
+            input_configs = INOUT_CONFIG if isinstance(INOUT_CONFIG, list) else [INOUT_CONFIG]
+            for config in input_configs:
+                instance = self.instances[config.get('name')]
+                if instance.connect(config) is False:
+                    # still polled: a timestep that cannot reach it falls back to its last values
+                    logger.warning(f"input {config.get('name')} is not reachable yet")
+                self.inputs.append(instance)
+            # all inputs are polled concurrently; slow ones fall back to their last values
+            self.poller = AsyncInputPoller(self.inputs, deadline=SETTINGS_CONFIG.get('input_deadline', 1.0))
         except Exception as e:
             print('Error connecting to inputs: ', e)
 
@@ -183,20 +230,30 @@ class InputCommunicate:
         '''
 
     def fetch_data(self):
+        """Return this timestep's actuator values as a ValueFrame indexed by exchange point"""
         try:
-            standeredDatas = []
-
-            for input in self.inputs:
-                data = input.get_data()
-                for item in date:
-                    if dataDict.__contains__(item):
-                        tmp = dataDict[item]
-                        obj = Actuator_obj(tmp[0], tmp[1], tmp[2], date[item])
-                        standeredDatas.append(obj)
-            return standeredDatas
+            frame = self.frames.acquire()
+
+            for data in self.poller.poll():
+                exchange_table.fill(frame, data)
+            return frame
         except Exception as e:
             print('Error fetching data: ', e)
 
+    def close(self):
+        """Stop the poller and close every input plugin"""
+        if self.poller is not None:
+            self.poller.close()
+            self.poller = None
+        for name, instance in self.instances.items():
+            close = getattr(instance, 'close', None)
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                logger.error(f"closing input {name} failed: {e}")
+
 
 class EnergyPlusSimulator:
     """
@@ -210,21 +267,46 @@ class EnergyPlusSimulator:
         """
         self.idf_file = idf_file
         self.weather_file = weather_file
-        self.output_dir = tempfile.mkdtemp(prefix='energyplus_output_')
+        # a configured output_dir (e.g. a sweep job's) is kept; the default temporary one is removed
+        self.keep_output = bool(SETTINGS_CONFIG.get('output_dir'))
+        self.output_dir = SETTINGS_CONFIG.get('output_dir') or tempfile.mkdtemp(prefix='energyplus_output_')
+        os.makedirs(self.output_dir, exist_ok=True)
         self.simulation_thread = None
         self.is_running = False
         self.interval = interval
         self.config = config
+        self.handle_cache = ActuatorHandleCache(exchange_table)
+        # folded handlers time their write loop into set_actuator_frame (None: metrics off)
+        self.observe_frame = metrics.recorder('set_actuator_frame')
+        # with output_capture, variables and meters are read through api.exchange every timestep
+        # instead of being parsed from the CSVs after the run
+        self.capture = (OutputCapture(output_dict, SETTINGS_CONFIG.get('capture_dir', 'capture'),
+                                      SETTINGS_CONFIG.get('capture_capacity', 4096))
+                        if SETTINGS_CONFIG.get('output_capture') and output_dict else None)
+        self.pacer = make_pacer(SETTINGS_CONFIG.get('pacing', 'realtime'), interval,
+                                SETTINGS_CONFIG.get('pacing_scale', 1.0), SETTINGS_CONFIG.get('pacing_max_lag'))
 
 
-    def set_actuator_value(state, component_type, control_type, actuator_key, value):
-        handle = api.exchange.get_actuator_handle(state, component_type, control_type, actuator_key)
+    def set_actuator_value(self, state, component_type, control_type, actuator_key, value):
+        handle = self.handle_cache.handle_for(api, state, component_type, control_type, actuator_key)
 
         if handle == -1:
             return
 
         api.exchange.set_actuator_value(state, handle, value)
 
+    def set_actuator_values(self, state, actuators):
+        """Write all actuators of one callback through the resolved handle cache"""
+        if not self.handle_cache.resolve(api, state):
+            return
+        self.handle_cache.set_values(api, state, ((d.point_id, d.value) for d in actuators))
+
+    def set_actuator_frame(self, state, frame, calling_point):
+        """Write the values of one calling point from a ValueFrame"""
+        if frame is None or not self.handle_cache.resolve(api, state):
+            return
+        self.handle_cache.set_frame(api, state, frame, calling_point)
+
     {{ExchangeLoad}}
     '''def time_step_weather(self, state):
         """
@@ -232,26 +314,26 @@ class EnergyPlusSimulator:
         """
         item = self.config.weatherData.get()
 
-        for d in item:
-            self.set_actuator_value(state, d.component_type, d.control_type, d.actuator_key, d.value)'''
+        self.set_actuator_frame(state, item, 'set_weather_flag')'''
 
     def time_step_reporting(self, state):
-        time.sleep(self.interval)
+        if self.capture is not None:
+            self.capture.capture(api, state)
+        self.pacer.tick()
+        metrics.tick('timestep')
 
-    def _process_output_files(self):
+    def _process_output_files(self, data_storage=None):
         """
 
-        Processing output file
+        Stream the CSV outputs in chunks: log their aggregates and forward the rows to storage
 
         """
+        processor = OutputStreamProcessor(SETTINGS_CONFIG.get('output_aggregations', AGGREGATIONS),
+                                          SETTINGS_CONFIG.get('output_period', 'day'),
+                                          SETTINGS_CONFIG.get('output_chunk_rows', 10000), data_storage)
         try:
-            # 查找CSV输出文件
-            for file in os.listdir(self.output_dir):
-                if file.endswith('.csv'):
-                    csv_path = os.path.join(self.output_dir, file)
-                    df = pd.read_csv(csv_path)
-                    logger.info(f" {file} {len(df)}")
-                    # 这里可以添加更多的输出处理逻辑
+            for file, summary in processor.process_directory(self.output_dir).items():
+                logger.info(f" {file} {summary['periods']} periods {summary['columns']}")
         except Exception as e:
             logger.error(f" {e}")
 
@@ -260,7 +342,7 @@ class EnergyPlusSimulator:
         Clear temporary files
         """
         try:
-            if os.path.exists(self.output_dir):
+            if not self.keep_output and os.path.exists(self.output_dir):
                 shutil.rmtree(self.output_dir)
                 logger.info(f"{self.output_dir}")
         except Exception as e:
@@ -276,27 +358,86 @@ class EnergyPlusCaculation:
         Initialise system
 
         """
-        self.config = Config(SET_CONFIG)
+        self.config = Config(SETTINGS_CONFIG)
 
         """self.input_communicate = InputCommunicate()"""
         {{importInput}}
 
-        self.energyplus_simulator = EnergyPlusSimulator(self.config.idf, self.config.weather, self.config.time, self.input_communicate.inputs)
-        {{importOutput}}
-        """self.data_storage = DataStorage()"""
+        self.prefetch = None
+        if SETTINGS_CONFIG.get('input_process') and self.input_communicate is not None:
+            # inputs are connected and fetched in their own process, off this process's GIL;
+            # callbacks read the latest frame from shared memory in place. It is forked before
+            # this run starts any thread (storage writers, metrics exporter), so the child
+            # cannot inherit a lock one of them holds
+            self.prefetch = SharedInputProcess(self.input_communicate.input_connect,
+                                               self.input_communicate.fetch_data, len(exchange_table),
+                                               SETTINGS_CONFIG.get('input_ring_size', 8),
+                                               SETTINGS_CONFIG.get('prefetch_interval', 1.0),
+                                               teardown=self.input_communicate.close)
+            self.config.attach(self.prefetch)
+            self.prefetch.start()
 
-    def start(self):
-        """start"""
+        try:
+            self.energyplus_simulator = EnergyPlusSimulator(self.config.idf, self.config.weather, self.config.time, self.config)
+            {{importOutput}}
+            """self.data_storage = DataStorage()"""
+        except Exception:
+            if self.prefetch is not None:
+                self.prefetch.stop()
+            raise
+
+        if self.input_communicate is not None:
+            self.input_communicate.fetch_data = metrics.wrap('fetch_data', self.input_communicate.fetch_data)
+        simulator = self.energyplus_simulator
+        simulator.set_actuator_value = metrics.wrap('set_actuator_value', simulator.set_actuator_value)
+        simulator.set_actuator_frame = metrics.wrap('set_actuator_frame', simulator.set_actuator_frame)
+        self.metrics_exporter = MetricsExporter(metrics, SETTINGS_CONFIG.get('metrics_json', 'metrics.json'),
+                                                SETTINGS_CONFIG.get('metrics_prometheus', 'metrics.prom'),
+                                                SETTINGS_CONFIG.get('metrics_interval', 10.0))
+
+    def start(self) -> bool:
+        """start; returns True when EnergyPlus completed"""
         logger.info("Start EnergyPlus Simulate")
         self.is_running = True
+        completed = False
 
         try:
-            self.input_communicate.input_connect()
-            self.run_simulation()
-            self.data_storage.storage_output()
-            self.energyplus_simulator.cleanup()
+            if self.prefetch is None:
+                self.input_communicate.input_connect()
+                # inputs are fetched on a background thread; callbacks only read the channels
+                self.prefetch = PrefetchPipeline(self.input_communicate.fetch_data, self.config.channels(),
+                                                 interval=SETTINGS_CONFIG.get('prefetch_interval', 1.0))
+                self.prefetch.start()
+            self.metrics_exporter.start()
+            completed = self.run_simulation()
+            self.prefetch.stop()
+            logger.info(f"prefetch {self.prefetch.metrics()}")
         except Exception as e:
             logger.error(f" {e}")
+        finally:
+            self.finish()
+        return completed
+
+    def finish(self):
+        """
+        Stop inputs, flush buffered rows, stop the metrics exporter and clear temporary files;
+        every step runs even when the run or an earlier step failed
+        """
+        steps = []
+        if self.prefetch is not None:
+            # a no-op when already stopped
+            steps.append(('prefetch', self.prefetch.stop))
+        if self.input_communicate is not None:
+            steps.append(('input', self.input_communicate.close))
+        if self.data_storage is not None:
+            steps.append(('storage', self.data_storage.storage_output))
+        steps.append(('metrics export', self.metrics_exporter.stop))
+        steps.append(('cleanup', self.energyplus_simulator.cleanup))
+        for name, step in steps:
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"{name} shutdown failed: {e}")
 
     def run_simulation(self) -> bool:
         """
@@ -306,49 +447,79 @@ class EnergyPlusCaculation:
         try:
             {{call_back}}
             '''api.runtime.callback_begin_zone_timestep_before_set_current_weather(state, self.energyplus_simulator.time_step_weather)'''
+            api.runtime.callback_end_zone_timestep_after_zone_reporting(state, self.energyplus_simulator.time_step_reporting)
+            capture = self.energyplus_simulator.capture
+            if capture is not None:
+                capture.request(api, state)
 
             result = api.runtime.run_energyplus(state,
                                                 [
                                                     '-w', self.energyplus_simulator.weather_file,
-                                                    '-d', './out',
+                                                    '-d', self.energyplus_simulator.output_dir,
+                                                    # CSV conversion is only needed when outputs are not captured
+                                                    *([] if capture is not None else ['-r']),
+                                                    *SETTINGS_CONFIG.get('energyplus_args', []),
                                                     self.energyplus_simulator.idf_file
                                                 ]
                                                 )
-            api.runtime.clear_callbacks()
-            api.state_manager.reset_state(state)
+            if capture is not None:
+                logger.info(f"captured {capture.timesteps} timesteps into {len(capture.close())} parts")
+            logger.info(f"pacing {self.energyplus_simulator.pacer.stats()}")
 
-            if result.returncode == 0:
+            if result == 0:
                 logger.info("EnergyPlus complete")
-                self.energyplus_simulator._process_output_files()
+                if capture is None:
+                    self.energyplus_simulator._process_output_files(self.data_storage)
                 return True
             else:
-                logger.error(f"EnergyPlus: {result.returncode}")
-                logger.error(f"{result.stderr}")
+                logger.error(f"EnergyPlus: {result}")
                 return False
 
-        except subprocess.TimeoutExpired:
-            logger.error("EnergyPlus Time out")
-            return False
         except Exception as e:
             logger.error(f": {e}")
             return False
+        finally:
+            # the state is recycled even after a failed run, so a warm worker can take the next job
+            api.runtime.clear_callbacks()
+            api.state_manager.reset_state(state)
+            self.energyplus_simulator.handle_cache.reset()
 
 
 class DataStorage:
     """
-    Data Storage Manager - Responsible for storing meteorological data and simulation results
+    Data Storage Manager - buffers result rows and writes them in bulk from a writer thread
     """
 
-    def __init__(self, db_path: str = 'energyplus_weather.db'):
-
-        self.MySQl_save_instanse()
-
+    def __init__(self, output_config):
+        output_configs = output_config if isinstance(output_config, list) else [output_config]
+        self.writers = [BufferedWriter(make_backend(config),
+                                       batch_size=config.get('batch_size', 500),
+                                       flush_interval=config.get('flush_interval', 1.0),
+                                       retries=config.get('retries', 3))
+                        for config in output_configs]
+        # batches are written on each writer's own thread, so each backend gets its own stage
+        for i, writer in enumerate(self.writers):
+            writer.backend.write_rows = metrics.wrap('storage_flush' if i == 0 else f'storage_flush_{i}',
+                                                     writer.backend.write_rows)
+
+    def declare(self, table, columns, types=None):
+        for writer in self.writers:
+            writer.declare(table, columns, types)
+
+    def save(self, table, row):
+        """Queue one result row; never waits on the database"""
+        for writer in self.writers:
+            writer.write(table, row)
+
+    def save_many(self, table, rows, block=False):
+        for writer in self.writers:
+            writer.write_many(table, rows, block)
 
     def storage_output(self):
-        try:
-            self.storages = self.instances.connect(OUTPUT_CONFIG)
-        except Exception as e:
-            print('Error connecting to inputs: ', e)
+        """Flush the rows still buffered and close the connections"""
+        for writer in self.writers:
+            writer.close()
+            logger.info(f"storage {writer.metrics()}")
 
     {{initStorgae}}
 '''    import MysqlCommunate
@@ -362,3 +533,35 @@ class DataStorage:
             logger.error(f"{e}")
             return False'''
 
+
+def run(energyplus_api=None, energyplus_state=None, **settings) -> bool:
+    """
+    Run the co-simulation once, for callers that import this script (sweeps, warm workers)
+
+    Args:
+        energyplus_api / energyplus_state: an already loaded API and state to run on; by
+            default one API and state are created on the first run and reused
+        settings: SET_CONFIG overrides for this run only, e.g. idf_file, weather_file,
+            output_dir, energyplus_args
+    """
+    global api, state, metrics
+    setup_logging()
+    if energyplus_api is not None:
+        api = energyplus_api
+        state = energyplus_state if energyplus_state is not None else api.state_manager.new_state()
+    elif api is None:
+        api = EnergyPlusAPI()
+        state = api.state_manager.new_state()
+    previous = dict(SETTINGS_CONFIG)
+    SETTINGS_CONFIG.update(settings)
+    # metrics follow this run's settings and start empty
+    metrics = CallbackMetrics(SETTINGS_CONFIG.get('metrics', False))
+    try:
+        return EnergyPlusCaculation().start()
+    finally:
+        SETTINGS_CONFIG.clear()
+        SETTINGS_CONFIG.update(previous)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,182 @@
+"""
+In-simulation capture of output variables and meters through api.exchange
+
+The Variable/Meter rows of the exchange dictionary (output_dict) are requested before
+the run, their handles are resolved once when the API data is ready, and every
+timestep one row of values is copied into a preallocated buffer. Full buffers are
+written by a background thread as compressed columnar .npz parts (one array per point,
+plus `time`), so no CSV is written or parsed and the latest values are readable during
+the run.
+
+Buffers are flat array('d') rows; numpy is optional and only used to write the parts
+faster. The .npz files are the same either way and load with numpy.load.
+"""
+import ast
+import logging
+import os
+import zipfile
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+
+def _npy_bytes(values: array) -> bytes:
+    """A 1-d float64 array in .npy format (version 1.0)"""
+    header = repr({'descr': '<f8', 'fortran_order': False, 'shape': (len(values),)})
+    # magic + version + header length + header must be a multiple of 64 bytes
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = (header + ' ' * padding + '\n').encode('latin1')
+    return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header + values.tobytes()
+
+
+def write_npz(path: str, columns: Sequence[str], rows: array, count: int):
+    """Write `count` rows of a flat row-major buffer as one compressed array per column"""
+    width = len(columns)
+    tmp_path = f"{path}.tmp"
+    if numpy is not None:
+        table = numpy.frombuffer(rows, dtype='<f8', count=count * width).reshape(count, width)
+        with open(tmp_path, 'wb') as f:
+            numpy.savez_compressed(f, **{name: table[:, i] for i, name in enumerate(columns)})
+    else:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for i, name in enumerate(columns):
+                archive.writestr(f"{name}.npy", _npy_bytes(rows[i:count * width:width]))
+    os.replace(tmp_path, path)
+
+
+def read_npz(path: str) -> Dict[str, List[float]]:
+    """Load a part without numpy: column name -> values"""
+    columns = {}
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            data = archive.read(name)
+            header_length = int.from_bytes(data[8:10], 'little')
+            header = ast.literal_eval(data[10:10 + header_length].decode('latin1'))
+            values = array('d')
+            values.frombytes(data[10 + header_length:])
+            columns[name[:-len('.npy')]] = values.tolist()[:header['shape'][0]]
+    return columns
+
+
+class OutputCapture:
+    """
+    Per-timestep capture of output variables and meters
+
+    Args:
+        output_dict: point id -> ['Variable', name, key, ...] or ['Meter', name, ...]
+        directory: where the capture_NNNNN.npz parts are written
+        capacity: timesteps per buffer (and per part file)
+    """
+
+    def __init__(self, output_dict: Dict[str, list], directory: str, capacity: int = 4096):
+        self.point_ids = [str(point_id) for point_id in output_dict]
+        self.rows = [output_dict[point_id] for point_id in output_dict]
+        self.columns = ['time'] + [self._column(point_id) for point_id in self.point_ids]
+        self.directory = directory
+        self.capacity = capacity
+        self.width = len(self.columns)
+        self.handles = []
+        self.is_meter = []
+        self.resolved = False
+        self.invalid = []
+        self._readers = None
+        # two buffers: one fills while the other is being written
+        self.buffers = [array('d', bytes(8 * capacity * self.width)) for _ in range(2)]
+        self.current = 0
+        self.count = 0
+        self.parts = 0
+        self.timesteps = 0
+        self.latest_row = array('d', bytes(8 * self.width))
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='output-capture')
+        self._pending = None
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _column(point_id: str) -> str:
+        return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in point_id)
+
+    def request(self, api, state):
+        """Request the output variables; must run before run_energyplus"""
+        for row in self.rows:
+            if row[0] == 'Variable':
+                api.exchange.request_variable(state, row[1], row[2])
+
+    def resolve(self, api, state) -> bool:
+        """Resolve every variable and meter handle once; False while the API data is not ready"""
+        if self.resolved:
+            return True
+        if not api.exchange.api_data_fully_ready(state):
+            return False
+        self.handles = []
+        self.is_meter = []
+        self.invalid = []
+        for point_id, row in zip(self.point_ids, self.rows):
+            if row[0] == 'Meter':
+                handle = api.exchange.get_meter_handle(state, row[1])
+            else:
+                handle = api.exchange.get_variable_handle(state, row[1], row[2])
+            self.handles.append(handle)
+            self.is_meter.append(row[0] == 'Meter')
+            if handle == -1:
+                self.invalid.append(point_id)
+        if self.invalid:
+            logger.warning(f"{len(self.invalid)} of {len(self.point_ids)} outputs could not be resolved "
+                           f"(handle -1) and are captured as nan: {self.invalid[:10]}")
+        self._readers = None
+        self.resolved = True
+        return True
+
+    def capture(self, api, state):
+        """Copy this timestep's values into the buffer; call once per timestep"""
+        if not self.resolve(api, state):
+            return
+        if self._readers is None:
+            nan = float('nan')
+            self._readers = [((lambda state, handle: nan) if handle == -1 else
+                              api.exchange.get_meter_value if is_meter else api.exchange.get_variable_value, handle)
+                             for handle, is_meter in zip(self.handles, self.is_meter)]
+        row = self.latest_row
+        row[0] = api.exchange.current_sim_time(state)
+        row[1:] = array('d', [read(state, handle) for read, handle in self._readers])
+        start = self.count * self.width
+        self.buffers[self.current][start:start + self.width] = row
+        self.count += 1
+        self.timesteps += 1
+        if self.count == self.capacity:
+            self.flush()
+
+    def latest(self) -> Dict[str, float]:
+        """Values of the last captured timestep, by point id"""
+        return dict(zip(['time'] + self.point_ids, self.latest_row))
+
+    def flush(self):
+        """Hand the filled part of the current buffer to the writer thread and switch buffers"""
+        if self.count == 0:
+            return
+        if self._pending is not None:
+            # the other buffer must be written out before it is reused
+            self._pending.result()
+        path = os.path.join(self.directory, f"capture_{self.parts:05d}.npz")
+        self._pending = self._writer.submit(write_npz, path, self.columns, self.buffers[self.current], self.count)
+        self.parts += 1
+        self.current = 1 - self.current
+        self.count = 0
+
+    def reset(self):
+        """Forget the handles of a state that was reset; the next capture resolves again"""
+        self.resolved = False
+
+    def close(self) -> List[str]:
+        """Write what is buffered and wait for the writer; returns the part files"""
+        self.flush()
+        self._writer.shutdown(wait=True)
+        if self._pending is not None:
+            self._pending.result()
+        return [os.path.join(self.directory, f"capture_{part:05d}.npz") for part in range(self.parts)]
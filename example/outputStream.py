@@ -0,0 +1,229 @@
+"""
+Streaming processing of EnergyPlus CSV outputs
+
+The CSVs are read in chunks of `chunk_rows` rows with the csv module, so memory stays
+bounded by the chunk size whatever the run length. While streaming, the processor keeps
+running aggregates per column (sum, min, max, mean) and per-period means (hour, day or
+month of the Date/Time column), and forwards every chunk to a storage sink with
+DataStorage's declare/save_many interface.
+"""
+import csv
+import math
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+AGGREGATIONS = ('sum', 'min', 'max', 'mean')
+PERIODS = ('hour', 'day', 'month')
+MONTHS = ('january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
+          'october', 'november', 'december')
+DATE_COLUMN = 'Date/Time'
+
+
+def column_name(header: str) -> str:
+    """SQL-safe column name for an EnergyPlus header such as 'Zone:Air Temperature [C](TimeStep)'"""
+    return re.sub(r'\W+', '_', header).strip('_') or 'column'
+
+
+def _unique(names: List[str]) -> List[str]:
+    seen = {}
+    unique = []
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        unique.append(name if count == 0 else f"{name}_{count}")
+    return unique
+
+
+def _number(text: str) -> Optional[float]:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def iter_csv_chunks(path: str, chunk_rows: int = 10000) -> Iterator[Tuple[List[str], List[List[Any]]]]:
+    """
+    Yield (header, rows) chunks; the Date/Time column stays text, the others become floats
+    (None for blanks, which EnergyPlus writes for variables not reported every timestep)
+    """
+    with open(path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        text_columns = {i for i, name in enumerate(header) if name == DATE_COLUMN}
+        width = len(header)
+        chunk = []
+        for record in reader:
+            values = [value.strip() if i in text_columns else _number(value)
+                      for i, value in enumerate(record[:width])]
+            if len(values) < width:
+                values.extend([None] * (width - len(values)))
+            chunk.append(values)
+            if len(chunk) >= chunk_rows:
+                yield header, chunk
+                chunk = []
+        if chunk:
+            yield header, chunk
+
+
+def timestamp_period(timestamp: str) -> Optional[str]:
+    """
+    Finest period an EnergyPlus timestamp resolves: hour for timestep and hourly rows
+    (' 01/31  00:15:00'), day for daily rows (' 01/31'), month for monthly rows
+    ('January'), None for run period rows
+    """
+    date, _, clock = timestamp.strip().partition(' ')
+    if clock.strip():
+        return 'hour'
+    if re.fullmatch(r'\d{1,2}/\d{1,2}', date):
+        return 'day'
+    if date.lower() in MONTHS:
+        return 'month'
+    return None
+
+
+def period_key(timestamp: str, period: str) -> str:
+    """
+    Period of an EnergyPlus timestamp ' 01/31  00:15:00'
+
+    Timestamps mark the end of their interval, so 00:15 belongs to hour 1 and
+    24:00:00 to the day it ends. Monthly rows ('January') have only a month key and
+    daily rows (' 01/31') no hour key; asking for a finer period raises ValueError.
+    """
+    date, _, clock = timestamp.strip().partition(' ')
+    if period == 'month':
+        return date.split('/')[0]
+    if '/' not in date:
+        raise ValueError(f"timestamp {timestamp!r} has no day, cannot group by {period}")
+    if period == 'day':
+        return date
+    if not clock.strip():
+        raise ValueError(f"timestamp {timestamp!r} has no time of day, cannot group by {period}")
+    hours, minutes = clock.strip().split(':')[:2]
+    return f"{date} {(int(hours) * 60 + int(minutes) + 59) // 60:02d}"
+
+
+class OutputStreamProcessor:
+    """
+    Aggregate and forward EnergyPlus CSV outputs chunk by chunk
+
+    Args:
+        aggregations: subset of AGGREGATIONS kept per column
+        period: hour, day or month for per-period means, or None; a file whose rows are
+            coarser (daily, monthly or run period rows) is grouped by its own rows' period
+        chunk_rows: rows read (and forwarded) at a time
+        sink: storage with declare(table, columns) and save_many(table, rows, block),
+              e.g. DataStorage; None only aggregates
+    """
+
+    def __init__(self, aggregations: Sequence[str] = AGGREGATIONS, period: Optional[str] = 'day',
+                 chunk_rows: int = 10000, sink=None):
+        unknown = set(aggregations) - set(AGGREGATIONS)
+        if unknown:
+            raise ValueError(f"unknown aggregations {sorted(unknown)}, expected {AGGREGATIONS}")
+        if period is not None and period not in PERIODS:
+            raise ValueError(f"unknown period {period}, expected one of {PERIODS}")
+        self.aggregations = tuple(aggregations)
+        self.period = period
+        self.chunk_rows = chunk_rows
+        self.sink = sink
+
+    def process_file(self, path: str, table: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Stream one CSV
+
+        Returns:
+            {'rows', 'periods', 'period', 'columns': {header: {aggregation: value}}}; period is
+            the one the file was grouped by
+        """
+        table = column_name(table or os.path.splitext(os.path.basename(path))[0])
+        rows = 0
+        periods = 0
+        period = None
+        header = None
+        for header_row, chunk in iter_csv_chunks(path, self.chunk_rows):
+            if header is None:
+                header = header_row
+                names = _unique([column_name(name) for name in header])
+                date_index = header.index(DATE_COLUMN) if DATE_COLUMN in header else None
+                numeric = [i for i in range(len(header)) if i != date_index]
+                count = [0] * len(header)
+                total = [0.0] * len(header)
+                low = [math.inf] * len(header)
+                high = [-math.inf] * len(header)
+                current_period, period_sum, period_count = None, [0.0] * len(header), [0] * len(header)
+                if self.period and date_index is not None:
+                    period = self._file_period(chunk[0][date_index])
+                if self.sink is not None:
+                    types = {names[date_index]: 'VARCHAR(32)'} if date_index is not None else None
+                    self.sink.declare(table, names, types)
+                    if period:
+                        self.sink.declare(f"{table}_{period}", ['period'] + [names[i] for i in numeric],
+                                          {'period': 'VARCHAR(32)'})
+
+            for record in chunk:
+                if period:
+                    key = period_key(record[date_index], period)
+                    if key != current_period:
+                        if current_period is not None:
+                            self._emit_period(f"{table}_{period}", current_period, numeric, period_sum,
+                                              period_count)
+                            periods += 1
+                        current_period = key
+                        period_sum = [0.0] * len(header)
+                        period_count = [0] * len(header)
+                for i in numeric:
+                    value = record[i]
+                    if value is None:
+                        continue
+                    count[i] += 1
+                    total[i] += value
+                    if value < low[i]:
+                        low[i] = value
+                    if value > high[i]:
+                        high[i] = value
+                    if current_period is not None:
+                        period_sum[i] += value
+                        period_count[i] += 1
+            rows += len(chunk)
+            if self.sink is not None:
+                self.sink.save_many(table, chunk, block=True)
+
+        if header is None:
+            return {'rows': 0, 'periods': 0, 'period': None, 'columns': {}}
+        if current_period is not None:
+            self._emit_period(f"{table}_{period}", current_period, numeric, period_sum, period_count)
+            periods += 1
+
+        columns = {}
+        for i in numeric:
+            stats = {'count': count[i]}
+            values = {'sum': total[i], 'min': low[i], 'max': high[i],
+                      'mean': total[i] / count[i] if count[i] else math.nan}
+            if not count[i]:
+                values.update(min=math.nan, max=math.nan)
+            stats.update((name, values[name]) for name in self.aggregations)
+            columns[header[i]] = stats
+        return {'rows': rows, 'periods': periods, 'period': period, 'columns': columns}
+
+    def _file_period(self, timestamp: str) -> Optional[str]:
+        """self.period, or the period of the file's rows when they are coarser"""
+        resolution = timestamp_period(timestamp)
+        if resolution is None:
+            return None
+        return max(self.period, resolution, key=PERIODS.index)
+
+    def _emit_period(self, period_table: str, key: str, numeric: List[int], period_sum: List[float],
+                     period_count: List[int]):
+        if self.sink is None:
+            return
+        row = [key] + [period_sum[i] / period_count[i] if period_count[i] else None for i in numeric]
+        self.sink.save_many(period_table, [row], block=True)
+
+    def process_directory(self, directory: str) -> Dict[str, Dict[str, Any]]:
+        """Stream every CSV in an EnergyPlus output directory"""
+        summaries = {}
+        for file in sorted(os.listdir(directory)):
+            if file.endswith('.csv'):
+                summaries[file] = self.process_file(os.path.join(directory, file))
+        return summaries
@@ -0,0 +1,136 @@
+"""
+Pacing of simulation timesteps against the wall clock
+
+    realtime  one timestep per `interval` seconds, against a monotonic deadline, so the
+              cost of each timestep is absorbed instead of accumulating as drift
+    scaled    the same at `scale` x real time
+    unpaced   as fast as possible (batch and offline runs)
+
+Every pacer records lag (how late a timestep was relative to its deadline) and overruns
+(timesteps that were already late when they finished).
+"""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+PACING_MODES = ('realtime', 'scaled', 'unpaced')
+
+logger = logging.getLogger(__name__)
+
+
+class Pacer:
+    """Unpaced: never sleeps, only measures the time per timestep"""
+
+    mode = 'unpaced'
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.ticks = 0
+        self.overruns = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.total_sleep = 0.0
+        self.started = None
+        self.last_tick = None
+
+    def start(self):
+        self.started = self.last_tick = self.clock()
+
+    def tick(self):
+        """Call once at the end of every timestep"""
+        if self.started is None:
+            self.start()
+        self.ticks += 1
+        self.last_tick = self.clock()
+
+    def _record_lag(self, lag: float):
+        self.overruns += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = (self.last_tick - self.started) if self.started is not None else 0.0
+        return {'mode': self.mode, 'ticks': self.ticks, 'elapsed': elapsed,
+                'step_time': elapsed / self.ticks if self.ticks else 0.0,
+                'overruns': self.overruns, 'mean_lag': self.total_lag / self.overruns if self.overruns else 0.0,
+                'max_lag': self.max_lag, 'sleep': self.total_sleep}
+
+
+class RealtimePacer(Pacer):
+    """
+    Sleep until the next timestep's deadline
+
+    Deadlines are start + n * interval / scale, not "now + interval", so time spent
+    in the timestep is subtracted from the sleep and late timesteps catch up.
+
+    Args:
+        interval: wall-clock seconds per timestep at 1x
+        scale: speed-up over real time
+        max_lag: when a timestep is later than this, the schedule is restarted from now
+                 rather than running the missed timesteps back to back (None: always catch up)
+    """
+
+    mode = 'realtime'
+
+    def __init__(self, interval: float, scale: float = 1.0, max_lag: Optional[float] = None,
+                 clock=time.monotonic, sleep=time.sleep):
+        super().__init__(clock, sleep)
+        if interval <= 0 or scale <= 0:
+            raise ValueError("interval and scale must be positive")
+        self.period = interval / scale
+        self.scale = scale
+        self.resync_lag = max_lag
+        self.resyncs = 0
+        self.deadline = None
+
+    def start(self):
+        super().start()
+        self.deadline = self.started + self.period
+
+    def tick(self):
+        if self.started is None:
+            self.start()
+        self.ticks += 1
+        now = self.clock()
+        remaining = self.deadline - now
+        if remaining > 0:
+            self.sleep(remaining)
+            self.total_sleep += remaining
+        else:
+            self._record_lag(-remaining)
+            if self.resync_lag is not None and -remaining > self.resync_lag:
+                self.resyncs += 1
+                self.deadline = now
+        self.deadline += self.period
+        self.last_tick = self.clock()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update(period=self.period, scale=self.scale, resyncs=self.resyncs,
+                     drift=(self.last_tick - self.started) - self.ticks * self.period if self.ticks else 0.0)
+        return stats
+
+
+class ScaledPacer(RealtimePacer):
+    mode = 'scaled'
+
+
+def make_pacer(mode: str, interval: Optional[float], scale: float = 1.0,
+               max_lag: Optional[float] = None) -> Pacer:
+    """
+    Build the pacer for a SET_CONFIG `pacing` mode
+
+    realtime and scaled need a positive interval; without one (missing or zero `time`)
+    the run is unpaced instead of failing.
+    """
+    if mode not in PACING_MODES:
+        raise ValueError(f"unknown pacing mode {mode}, expected one of {PACING_MODES}")
+    if mode != 'unpaced' and (interval is None or interval <= 0):
+        logger.warning(f"{mode} pacing needs a positive timestep interval, got {interval!r}; running unpaced")
+        return Pacer()
+    if mode == 'realtime':
+        return RealtimePacer(interval, 1.0, max_lag)
+    if mode == 'scaled':
+        return ScaledPacer(interval, scale, max_lag)
+    return Pacer()
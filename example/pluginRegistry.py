@@ -0,0 +1,137 @@
+"""
+Static metadata of input/storage plugins
+
+The generator only needs the `description` snippet a plugin class carries. Importing
+the plugin to read it would drag in requests, DB drivers and so on, so the snippet is
+read from the plugin's source AST (or from a manifest) and cached by file mtime.
+"""
+import ast
+import importlib.machinery
+import logging
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+
+class PluginMetadata:
+    """The static facts the generator needs about one plugin class"""
+
+    def __init__(self, module: str, class_name: str, description: str,
+                 path: Optional[str] = None, stamp: Optional[Tuple[int, int]] = None):
+        self.module = module
+        self.class_name = class_name
+        self.description = description
+        self.path = path
+        self.stamp = stamp
+
+
+def read_class_attributes(source: str, class_name: str, filename: str = '<plugin>') -> Dict[str, str]:
+    """Return the string constants assigned at class level of class_name, without executing the source"""
+    tree = ast.parse(source, filename)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            attributes = {}
+            for stmt in node.body:
+                if isinstance(stmt, ast.Assign):
+                    targets, value = stmt.targets, stmt.value
+                elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+                    targets, value = [stmt.target], stmt.value
+                else:
+                    continue
+                if isinstance(value, ast.Constant) and isinstance(value.value, str):
+                    for target in targets:
+                        if isinstance(target, ast.Name):
+                            attributes[target.id] = value.value
+            return attributes
+    raise LookupError(f"class {class_name} not found in {filename}")
+
+
+class PluginRegistry:
+    """
+    Plugin metadata registry that never imports plugin code
+
+    Args:
+        search_paths: directories searched for `<module>.py` before sys.path
+        manifest_path: optional yaml list of {module, class_name, description} entries,
+                       which take precedence over the plugin sources
+    """
+
+    def __init__(self, search_paths: Optional[List[str]] = None, manifest_path: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.search_paths = list(search_paths or [])
+        self.manifest_path = manifest_path
+        self._entries = {}
+        self._manifest = {}
+        self._manifest_stamp = None
+        self._lock = threading.Lock()
+
+    def get(self, module: str, class_name: str) -> PluginMetadata:
+        manifest_entry = self._manifest_lookup(module, class_name)
+        if manifest_entry is not None:
+            return manifest_entry
+
+        path = self.locate(module)
+        stamp = self._stamp(path)
+        key = (module, class_name)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.path == path and cached.stamp == stamp:
+                return cached
+
+        with open(path, 'r', encoding='utf-8') as f:
+            attributes = read_class_attributes(f.read(), class_name, path)
+        if 'description' not in attributes:
+            raise LookupError(f"{module}.{class_name} has no static 'description' string")
+        metadata = PluginMetadata(module, class_name, attributes['description'], path, stamp)
+        with self._lock:
+            self._entries[key] = metadata
+        return metadata
+
+    def description(self, module: str, class_name: str) -> str:
+        return self.get(module, class_name).description
+
+    def locate(self, module: str) -> str:
+        """Find the source file of a top-level plugin module without importing it"""
+        for directory in self.search_paths:
+            candidate = os.path.join(directory, f"{module}.py")
+            if os.path.exists(candidate):
+                return candidate
+        spec = importlib.machinery.PathFinder.find_spec(module, sys.path)
+        if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+            raise LookupError(f"plugin module {module} not found")
+        return spec.origin
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._manifest_stamp = None
+
+    @staticmethod
+    def _stamp(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _manifest_lookup(self, module: str, class_name: str) -> Optional[PluginMetadata]:
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return None
+        stamp = self._stamp(self.manifest_path)
+        with self._lock:
+            if stamp != self._manifest_stamp:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    entries = yaml.safe_load(f) or []
+                self._manifest = {
+                    (entry['module'], entry['class_name']): PluginMetadata(
+                        entry['module'], entry['class_name'], entry['description'], self.manifest_path, stamp)
+                    for entry in entries
+                }
+                self._manifest_stamp = stamp
+            return self._manifest.get((module, class_name))
+
+
+default_plugin_registry = PluginRegistry(
+    search_paths=[os.path.dirname(os.path.abspath(__file__))],
+    manifest_path=os.environ.get('CODEGEN_PLUGIN_MANIFEST') or None,
+)
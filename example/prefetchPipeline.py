@@ -0,0 +1,168 @@
+"""
+Producer/consumer pipeline between input I/O and the EnergyPlus callbacks
+
+A background PrefetchPipeline thread fetches (and optionally normalizes) input data
+and publishes it into BoundedChannels; EnergyPlus callbacks read the channels with
+get(), which never waits on the network: when nothing new has arrived it returns the
+last value it handed out.
+
+Backpressure policies, applied when a channel is full:
+    latest       the new item replaces what is queued (latest value wins)
+    drop_oldest  the oldest queued item is discarded
+    block        the producer waits up to `timeout` seconds, then drops the new item
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+POLICIES = ('latest', 'drop_oldest', 'block')
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedChannel:
+    """
+    Bounded queue with a backpressure policy and a non-blocking consumer side
+
+    Args:
+        maxsize: queued items kept at most (always 1 for the latest policy)
+        policy: one of POLICIES
+        timeout: producer wait for the block policy, in seconds
+        consumer_timeout: how long get() may wait for a fresh item; 0 never waits
+    """
+
+    def __init__(self, maxsize: int = 2, policy: str = 'latest', timeout: float = 0.1,
+                 consumer_timeout: float = 0.0):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown backpressure policy {policy}, expected one of {POLICIES}")
+        self.maxsize = 1 if policy == 'latest' else max(1, maxsize)
+        self.policy = policy
+        self.timeout = timeout
+        self.consumer_timeout = consumer_timeout
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._last = None
+        self.puts = 0
+        self.drops = 0
+        self.gets = 0
+        self.stale_gets = 0
+        self.max_depth = 0
+        self.producer_wait = 0.0
+        self.consumer_wait = 0.0
+        self.max_consumer_wait = 0.0
+
+    def put(self, item) -> bool:
+        """Publish an item; returns False if the policy dropped it"""
+        with self._condition:
+            self.puts += 1
+            if len(self._items) >= self.maxsize:
+                if self.policy == 'block':
+                    start = time.monotonic()
+                    self._condition.wait_for(lambda: len(self._items) < self.maxsize, self.timeout)
+                    self.producer_wait += time.monotonic() - start
+                    if len(self._items) >= self.maxsize:
+                        self.drops += 1
+                        return False
+                else:
+                    # latest and drop_oldest both discard the oldest queued item
+                    self._items.popleft()
+                    self.drops += 1
+            self._items.append(item)
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._condition.notify_all()
+            return True
+
+    def get(self, block: bool = False, timeout: Optional[float] = None):
+        """
+        Next item, or the last one handed out when nothing new has arrived
+
+        Matches queue.Queue.get's signature so generated handlers work with either, but
+        by default never blocks: callbacks must not wait on input I/O.
+        """
+        wait = timeout if timeout is not None else (self.consumer_timeout if not block else None)
+        with self._condition:
+            self.gets += 1
+            if not self._items and wait != 0:
+                start = time.monotonic()
+                self._condition.wait_for(lambda: self._items, wait)
+                waited = time.monotonic() - start
+                self.consumer_wait += waited
+                self.max_consumer_wait = max(self.max_consumer_wait, waited)
+            if self._items:
+                self._last = self._items.popleft()
+                self._condition.notify_all()
+            else:
+                self.stale_gets += 1
+            return self._last
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._condition:
+            return {'policy': self.policy, 'depth': len(self._items), 'max_depth': self.max_depth,
+                    'puts': self.puts, 'drops': self.drops, 'gets': self.gets, 'stale_gets': self.stale_gets,
+                    'producer_wait': self.producer_wait, 'consumer_wait': self.consumer_wait,
+                    'max_consumer_wait': self.max_consumer_wait}
+
+
+class PrefetchPipeline:
+    """
+    Background worker that fetches input data and feeds the channels
+
+    Args:
+        fetch: called once per cycle on the worker thread, e.g. InputCommunicate.fetch_data
+        channels: channels that receive every fetched item
+        interval: target seconds between fetches
+        normalize: optional transform applied on the worker before publishing
+    """
+
+    def __init__(self, fetch: Callable[[], Any], channels: List[BoundedChannel], interval: float = 1.0,
+                 normalize: Optional[Callable[[Any], Any]] = None):
+        self.fetch = fetch
+        self.channels = list(channels)
+        self.interval = interval
+        self.normalize = normalize
+        self._stop = threading.Event()
+        self._thread = None
+        self.cycles = 0
+        self.errors = 0
+        self.last_fetch_time = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='input-prefetch', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        next_cycle = time.monotonic()
+        while not self._stop.is_set():
+            start = time.monotonic()
+            try:
+                item = self.fetch()
+                if self.normalize is not None:
+                    item = self.normalize(item)
+                if item is not None:
+                    for channel in self.channels:
+                        channel.put(item)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"prefetch failed: {e}")
+            self.cycles += 1
+            self.last_fetch_time = time.monotonic() - start
+            next_cycle += self.interval
+            self._stop.wait(max(0.0, next_cycle - time.monotonic()))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {'cycles': self.cycles, 'errors': self.errors, 'last_fetch_time': self.last_fetch_time,
+                'channels': [channel.metrics() for channel in self.channels]}
@@ -0,0 +1,266 @@
+"""
+Shared-memory transport from an input process to the simulator
+
+With input_process enabled, inputs are connected, polled and parsed in a separate
+process, so that work no longer competes with the EnergyPlus callbacks for the GIL.
+Each fetched ValueFrame is copied into the next slot of a SharedFrameRing, a
+multiprocessing.shared_memory block holding `capacity` frames indexed by point
+index (ExchangeTable.point_index maps point ids to indices). The simulator reads the
+latest slot in place: SharedRingChannel.get() hands out a frame whose values and
+stamps are views into the shared block, so nothing is copied or unpickled.
+
+Layout, native byte order, all fields 8 bytes:
+    header   sequence of the latest published slot, size, capacity
+    slot     sequence, generation, values[size] (double), stamp[size]
+
+There is one producer. A slot is reused `capacity` publications later, so a reader
+must be done with a frame before then (keep capacity well above the number of
+publications during one callback, as with FrameRing).
+
+Python issues no memory barriers, so publication relies on write order plus a check on
+read: the producer marks the slot's sequence -1, writes values, stamps and generation,
+then the slot's sequence, and the header's sequence last. The reader only takes a slot
+whose own sequence matches the header before and after it reads the generation, and
+otherwise falls back to the slot published before it.
+"""
+import logging
+import multiprocessing
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_HEADER_FIELDS = 3
+_SLOT_FIELDS = 2
+_STAMP_CODE = 'l'
+
+
+class SharedValueFrame:
+    """ValueFrame whose values and stamps live in a shared-memory slot"""
+
+    __slots__ = ('values', 'stamp', 'generation')
+
+    def __init__(self, values: memoryview, stamp: memoryview):
+        self.values = values
+        self.stamp = stamp
+        self.generation = 0
+
+    def present(self, indices):
+        values, stamp, generation = self.values, self.stamp, self.generation
+        for index in indices:
+            if stamp[index] == generation:
+                yield index, values[index]
+
+
+class SharedFrameRing:
+    """
+    Ring of `capacity` frames of `size` points in shared memory
+
+    Args:
+        size: number of exchange points
+        capacity: slots in the ring
+        name: shared memory block to attach to; None creates a new one
+    """
+
+    def __init__(self, size: int = 0, capacity: int = 4, name: Optional[str] = None):
+        if array(_STAMP_CODE).itemsize != 8:
+            raise RuntimeError("shared frames need 8-byte stamps")
+        self.owner = name is None
+        if self.owner:
+            self.slot_bytes = 8 * (_SLOT_FIELDS + 2 * size)
+            self.memory = shared_memory.SharedMemory(create=True,
+                                                     size=8 * _HEADER_FIELDS + capacity * max(self.slot_bytes, 8))
+            self.header = self.memory.buf[:8 * _HEADER_FIELDS].cast('q')
+            self.header[0], self.header[1], self.header[2] = -1, size, capacity
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.header = self.memory.buf[:8 * _HEADER_FIELDS].cast('q')
+            size, capacity = self.header[1], self.header[2]
+            self.slot_bytes = 8 * (_SLOT_FIELDS + 2 * size)
+        self.size = size
+        self.capacity = capacity
+        self.slot_headers = []
+        self.frames = []
+        for slot in range(capacity):
+            start = 8 * _HEADER_FIELDS + slot * self.slot_bytes
+            values_start = start + 8 * _SLOT_FIELDS
+            stamp_start = values_start + 8 * size
+            self.slot_headers.append(self.memory.buf[start:values_start].cast('q'))
+            self.frames.append(SharedValueFrame(self.memory.buf[values_start:stamp_start].cast('d'),
+                                                self.memory.buf[stamp_start:stamp_start + 8 * size]
+                                                .cast(_STAMP_CODE)))
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @property
+    def sequence(self) -> int:
+        """Sequence of the latest published frame, -1 before the first"""
+        return self.header[0]
+
+    def publish(self, frame) -> int:
+        """Copy a ValueFrame into the next slot and make it the latest; producer side only"""
+        sequence = self.header[0] + 1
+        slot = sequence % self.capacity
+        slot_header = self.slot_headers[slot]
+        # invalid while it is rewritten
+        slot_header[0] = -1
+        target = self.frames[slot]
+        target.values[:] = frame.values
+        target.stamp[:] = frame.stamp
+        slot_header[1] = frame.generation
+        slot_header[0] = sequence
+        # written last, so a reader never sees a sequence whose slot is incomplete
+        self.header[0] = sequence
+        return sequence
+
+    def latest(self):
+        """(sequence, frame) of the latest complete slot, (-1, None) before the first"""
+        sequence = self.header[0]
+        oldest = max(0, sequence - self.capacity + 1)
+        while sequence >= oldest:
+            slot = sequence % self.capacity
+            slot_header = self.slot_headers[slot]
+            if slot_header[0] == sequence:
+                generation = slot_header[1]
+                if slot_header[0] == sequence:
+                    frame = self.frames[slot]
+                    frame.generation = generation
+                    return sequence, frame
+            # the slot's stores are not all visible yet, or it is being rewritten
+            sequence -= 1
+        return -1, None
+
+    def close(self):
+        for frame in self.frames:
+            frame.values.release()
+            frame.stamp.release()
+        for slot_header in self.slot_headers:
+            slot_header.release()
+        self.header.release()
+        self.frames, self.slot_headers = [], []
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+class SharedRingChannel:
+    """
+    Consumer side of a SharedFrameRing with BoundedChannel's get() and metrics()
+
+    get() never waits: it returns the latest published frame, which is the one handed
+    out last time when nothing new has arrived (the `latest` policy).
+    """
+
+    def __init__(self, ring: SharedFrameRing):
+        self.ring = ring
+        self._last_sequence = -1
+        self.gets = 0
+        self.stale_gets = 0
+        self.skipped = 0
+
+    def get(self, block: bool = False, timeout: Optional[float] = None):
+        self.gets += 1
+        sequence, frame = self.ring.latest()
+        if sequence <= self._last_sequence:
+            self.stale_gets += 1
+            return frame
+        if self._last_sequence >= 0:
+            self.skipped += sequence - self._last_sequence - 1
+        self._last_sequence = sequence
+        return frame
+
+    def qsize(self) -> int:
+        return int(self.ring.sequence != self._last_sequence)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {'policy': 'shared_latest', 'gets': self.gets, 'stale_gets': self.stale_gets,
+                'skipped': self.skipped, 'sequence': self.ring.sequence}
+
+
+def _publish_loop(setup: Optional[Callable[[], Any]], fetch: Callable[[], Any], ring: SharedFrameRing,
+                  interval: float, stop, errors, teardown: Optional[Callable[[], Any]] = None):
+    try:
+        if setup is not None:
+            setup()
+        while not stop.is_set():
+            try:
+                frame = fetch()
+                if frame is not None:
+                    ring.publish(frame)
+            except Exception as e:
+                with errors.get_lock():
+                    errors.value += 1
+                logger.error(f"input process fetch failed: {e}")
+            stop.wait(interval)
+    finally:
+        if teardown is not None:
+            teardown()
+
+
+class SharedInputProcess:
+    """
+    Input process publishing into a SharedFrameRing, with PrefetchPipeline's interface
+
+    The process is forked, so `setup` (e.g. InputCommunicate.input_connect) and `fetch`
+    (returning a ValueFrame) run on the child's copy of the caller's objects; input
+    connections are opened in the child. Only the forking thread exists in the child,
+    and a lock held by another thread at fork time stays held there, so call start()
+    before the caller starts threads of its own (storage writers, metrics exporter).
+
+    Args:
+        setup: called once in the input process before the first fetch
+        teardown: called once in the input process when it stops, e.g. InputCommunicate.close
+        fetch: returns one timestep's ValueFrame, or None
+        size: number of exchange points
+        capacity: ring slots
+        interval: target seconds between fetches
+    """
+
+    def __init__(self, setup: Optional[Callable[[], Any]], fetch: Callable[[], Any], size: int,
+                 capacity: int = 4, interval: float = 1.0, teardown: Optional[Callable[[], Any]] = None):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("input_process needs the fork start method; use the in-process prefetch")
+        self.context = multiprocessing.get_context('fork')
+        self.setup = setup
+        self.fetch = fetch
+        self.teardown = teardown
+        self.interval = interval
+        self.ring = SharedFrameRing(size, capacity)
+        self._stop = self.context.Event()
+        self._errors = self.context.Value('l', 0)
+        self._process = None
+        self._final = None
+
+    def channel(self) -> SharedRingChannel:
+        return SharedRingChannel(self.ring)
+
+    def start(self):
+        if self._process is not None:
+            return
+        self._stop.clear()
+        self._process = self.context.Process(target=_publish_loop, name='input-process', daemon=True,
+                                             args=(self.setup, self.fetch, self.ring, self.interval,
+                                                   self._stop, self._errors, self.teardown))
+        self._process.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the input process and release the ring; frames handed out become invalid"""
+        if self._process is None:
+            return
+        self._stop.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._process = None
+        self._final = self.metrics()
+        self.ring.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        if self._final is not None:
+            return self._final
+        return {'cycles': self.ring.sequence + 1, 'errors': self._errors.value, 'size': self.ring.size,
+                'capacity': self.ring.capacity, 'shared_memory': self.ring.name}
@@ -0,0 +1,316 @@
+"""
+Startup-optimized variant of a generated simulation script
+
+The generated module imports yaml/pyenergyplus and the repo's helper modules at top
+level and loads the configs and the exchange dictionary at import time. The variant
+built here:
+
+- adds `from __future__ import annotations`, so names only used in annotations
+  (numba.Any, plistlib.Dict) are no longer needed
+- drops imports that are never used or are rebound by a module-level assignment
+- defers third-party and local imports that are only used inside functions
+- moves every module-level statement that does work into _bootstrap(), split into a
+  config stage and a runtime stage (whatever depends on RUNTIME_MODULES, i.e. the
+  EnergyPlus API and state); heavy imports move into the stage that needs them
+- replaces the script's `if __name__ == '__main__'` block with a main() that has
+  --help and --check (config stage only, no EnergyPlus) and otherwise calls run()
+- is byte-compiled next to the source; run it as `python -m <module>` so the
+  cached bytecode is used (a script path is always recompiled)
+
+import_time_profile() runs `python -X importtime` on a module and summarizes it.
+"""
+import ast
+import os
+import py_compile
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence, Set
+
+HEAVY_MODULES = ('pyenergyplus', 'yaml', 'xlrd', 'numba', 'numpy', 'pandas', 'requests', 'pymysql')
+RUNTIME_MODULES = ('pyenergyplus',)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+class StartupReport:
+    """What optimize_startup changed"""
+
+    def __init__(self):
+        self.dropped: List[str] = []
+        self.deferred: List[str] = []
+        self.config_stage: List[str] = []
+        self.runtime_stage: List[str] = []
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {'dropped_imports': self.dropped, 'deferred_imports': self.deferred,
+                'config_stage': self.config_stage, 'runtime_stage': self.runtime_stage}
+
+
+def _root(module: Optional[str]) -> str:
+    return (module or '').split('.')[0]
+
+
+def _bound_names(node: ast.AST) -> List[str]:
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return [alias.asname or alias.name.split('.')[0] for alias in node.names]
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [node.name]
+    names = []
+    targets = node.targets if isinstance(node, ast.Assign) else [getattr(node, 'target', None)]
+    for target in targets:
+        if target is not None:
+            names.extend(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+    return names
+
+
+def _runtime_loads(tree: ast.AST) -> Set[str]:
+    """Names read anywhere outside annotations"""
+    annotations = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args.posonlyargs + node.args.args + node.args.kwonlyargs + \
+                [arg for arg in (node.args.vararg, node.args.kwarg) if arg is not None]
+            annotations.update(id(arg.annotation) for arg in arguments if arg.annotation is not None)
+            if node.returns is not None:
+                annotations.add(id(node.returns))
+        elif isinstance(node, ast.AnnAssign):
+            annotations.add(id(node.annotation))
+
+    loads = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if id(node) in annotations:
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            loads.add(node.id)
+        stack.extend(ast.iter_child_nodes(node))
+    return loads
+
+
+def _eager_loads(node: ast.stmt) -> Set[str]:
+    """Names a definition reads while it is being defined (decorators, defaults, bases, class bodies)"""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        parts = node.decorator_list + node.args.defaults + [d for d in node.args.kw_defaults if d is not None]
+    elif isinstance(node, ast.ClassDef):
+        parts = node.decorator_list + node.bases + [keyword.value for keyword in node.keywords]
+        return ({n.id for part in parts for n in ast.walk(part) if isinstance(n, ast.Name)}
+                | {name for statement in node.body for name in _eager_loads(statement)})
+    else:
+        parts = [node]
+    return {n.id for part in parts for n in ast.walk(part) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)}
+
+
+def _is_main_guard(node: ast.stmt) -> bool:
+    test = node.test if isinstance(node, ast.If) else None
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == '__name__'
+            and len(test.comparators) == 1 and isinstance(test.comparators[0], ast.Constant)
+            and test.comparators[0].value == '__main__')
+
+
+def _is_definition(node: ast.stmt) -> bool:
+    return (isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+            or (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)))
+
+
+def optimize_startup(code: str, heavy_modules: Sequence[str] = HEAVY_MODULES,
+                     runtime_modules: Sequence[str] = RUNTIME_MODULES) -> (str, StartupReport):
+    """
+    Rewrite generated code so importing it does no work
+
+    Returns:
+        (optimized code, StartupReport)
+    """
+    tree = ast.parse(code)
+    report = StartupReport()
+    loads = _runtime_loads(tree)
+    body = list(tree.body)
+
+    docstring = []
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        docstring = [body.pop(0)]
+    # the variant brings its own entry point
+    body = [node for node in body if not _is_main_guard(node)]
+    # names that module-level statements (not imports) rebind
+    rebound = {name for node in body if not isinstance(node, (ast.Import, ast.ImportFrom))
+               for name in _bound_names(node)}
+    # imports a definition needs while the module is executing cannot be deferred
+    eager = {name for node in body if _is_definition(node) for name in _eager_loads(node)}
+
+    kept_imports, definitions, staged = [], [], []
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if isinstance(node, ast.ImportFrom) and node.module == '__future__':
+                continue
+            aliases = []
+            for alias in node.names:
+                name = alias.asname or alias.name.split('.')[0]
+                if name not in loads or name in rebound:
+                    report.dropped.append(f"{getattr(node, 'module', None) or alias.name}:{alias.name}"
+                                          if isinstance(node, ast.ImportFrom) else alias.name)
+                else:
+                    aliases.append(alias)
+            if not aliases:
+                continue
+            node.names = aliases
+            module = node.module if isinstance(node, ast.ImportFrom) else node.names[0].name
+            needed_now = any((alias.asname or alias.name.split('.')[0]) in eager for alias in aliases)
+            # besides the known heavy packages, the repo's own helper modules pull in asyncio, requests, ...
+            if not needed_now and (_root(module) in heavy_modules or _root(module) not in sys.stdlib_module_names):
+                report.deferred.append(module)
+                staged.append(node)
+            else:
+                kept_imports.append(node)
+        elif _is_definition(node):
+            definitions.append(node)
+        else:
+            staged.append(node)
+
+    # split the staged work: anything touching a runtime module (and what it assigns) needs EnergyPlus
+    tainted = set()
+    config_stage, runtime_stage = [], []
+    for node in staged:
+        uses_runtime = (isinstance(node, (ast.Import, ast.ImportFrom)) and
+                        _root(node.module if isinstance(node, ast.ImportFrom) else node.names[0].name)
+                        in runtime_modules)
+        uses_runtime = uses_runtime or any(isinstance(n, ast.Name) and n.id in tainted for n in ast.walk(node))
+        if uses_runtime:
+            tainted.update(_bound_names(node))
+            runtime_stage.append(node)
+        else:
+            config_stage.append(node)
+    report.config_stage = sorted({name for node in config_stage for name in _bound_names(node)})
+    report.runtime_stage = sorted({name for node in runtime_stage for name in _bound_names(node)})
+
+    header = ast.parse('from __future__ import annotations\nimport argparse\n').body
+    stages = ast.parse(_STAGES_SOURCE).body
+    _fill_stage(stages, '_load_config', config_stage, report.config_stage)
+    _fill_stage(stages, '_load_runtime', runtime_stage, report.runtime_stage)
+    entry = ast.parse(_ENTRY_SOURCE).body
+
+    tree.body = docstring + header + kept_imports + stages[:1] + definitions + stages[1:] + entry
+    ast.fix_missing_locations(tree)
+    return ast.unparse(tree) + '\n', report
+
+
+def _fill_stage(stages: List[ast.stmt], name: str, statements: List[ast.stmt], names: List[str]):
+    function = next(node for node in stages if isinstance(node, ast.FunctionDef) and node.name == name)
+    body = [ast.Global(names=names)] if names else []
+    function.body = function.body[:1] + body + (statements or [ast.Pass()])
+
+
+_STAGES_SOURCE = '''
+_bootstrapped = set()
+
+
+def _load_config():
+    """Config stage: what the module used to do at import time, minus EnergyPlus"""
+
+
+def _load_runtime():
+    """Runtime stage: EnergyPlus API, state and everything built on them"""
+
+
+def _bootstrap(runtime: bool = True):
+    """Run the deferred import-time work once, on first use"""
+    if 'config' not in _bootstrapped:
+        _load_config()
+        _bootstrapped.add('config')
+    if runtime and 'runtime' not in _bootstrapped:
+        _load_runtime()
+        _bootstrapped.add('runtime')
+'''
+
+_ENTRY_SOURCE = '''
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='EnergyPlus co-simulation')
+    parser.add_argument('--check', action='store_true', help='load the configs and exchange dictionary, then exit')
+    args = parser.parse_args(argv)
+    _bootstrap(runtime=not args.check)
+    if args.check:
+        return 0
+    return 0 if run() else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
+'''
+
+
+def write_fast_variant(code: str, output_path: str) -> StartupReport:
+    """Write the optimized variant and its bytecode (in __pycache__, where imports look for it)"""
+    optimized, report = optimize_startup(code)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(optimized)
+    os.replace(tmp_path, output_path)
+    py_compile.compile(output_path, doraise=True, invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+    return report
+
+
+def import_time_profile(module: str, cwd: str, extra_paths: Sequence[str] = (), top: int = 15,
+                        timeout: float = 120.0) -> Dict[str, object]:
+    """
+    Import a module under `python -X importtime` in a subprocess
+
+    Returns:
+        {'module', 'ok', 'error', 'total_us', 'top': [(cumulative_us, self_us, package), ...]}
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([cwd, *extra_paths, os.environ.get('PYTHONPATH', '')]))
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=cwd, env=env,
+                               capture_output=True, text=True, timeout=timeout)
+    entries = []
+    total = 0
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, package = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        entries.append((cumulative_us, self_us, package))
+        if len(indent) == 1:
+            total += cumulative_us
+    errors = [line for line in completed.stderr.splitlines() if not line.startswith('import time:')]
+    return {'module': module, 'ok': completed.returncode == 0,
+            'error': errors[-1] if completed.returncode and errors else None,
+            'total_us': total, 'top': sorted(entries, reverse=True)[:top]}
+
+
+def format_profile(profile: Dict[str, object]) -> str:
+    lines = [f"{profile['module']}: {profile['total_us'] / 1000:.1f} ms"
+             + ('' if profile['ok'] else f" (import failed: {profile['error']})")]
+    lines.append(f"  {'cumulative ms':>13} {'self ms':>8}  package")
+    for cumulative_us, self_us, package in profile['top']:
+        lines.append(f"  {cumulative_us / 1000:>13.1f} {self_us / 1000:>8.1f}  {package}")
+    return '\n'.join(lines)
+
+
+def emit_fast_variant(source_path: str, profile: bool = False) -> Dict[str, object]:
+    """
+    Write `<stem>_fast.py` (plus bytecode) next to a generated script and, optionally,
+    `<stem>_fast.importtime.txt` comparing the import time of both modules
+
+    Profiling imports both modules in subprocesses, which runs their module-level
+    setup (log file, EnergyPlus API and state), so it is opt-in.
+
+    Returns:
+        {'path', 'report', 'profile_path'}
+    """
+    with open(source_path, 'r', encoding='utf-8') as f:
+        code = f.read()
+    directory = os.path.dirname(os.path.abspath(source_path))
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    fast_path = os.path.join(directory, f'{stem}_fast.py')
+    report = write_fast_variant(code, fast_path)
+
+    profile_path = None
+    if profile:
+        example_dir = os.path.dirname(os.path.abspath(__file__))
+        sections = [format_profile(import_time_profile(module, directory, [example_dir]))
+                    for module in (stem, f'{stem}_fast')]
+        sections.append('\n'.join(f"{key}: {', '.join(values) or '-'}" for key, values in report.to_dict().items()))
+        profile_path = os.path.join(directory, f'{stem}_fast.importtime.txt')
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            f.write('\n\n'.join(sections) + '\n')
+    return {'path': fast_path, 'report': report, 'profile_path': profile_path}
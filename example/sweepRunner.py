@@ -0,0 +1,374 @@
+"""
+Parametric sweeps: many independent EnergyPlus runs across a pool of worker processes
+
+Each worker builds the EnergyPlus API and one state once, then takes jobs from a shared
+queue, calling run_energyplus and recycling the state (clear_callbacks, reset_state)
+between jobs. A job that exceeds its timeout is stopped by terminating its worker,
+which is replaced; a run cannot be interrupted from inside its process.
+
+A manifest lists the variants:
+
+    site: siteA             # optional: folder with INPUT/SET/OUTPUT_CONFIG.yaml
+    jobs:
+      - name: base
+        idf: exampleA.idf
+        weather: weather.epw
+        args: [-r]          # extra EnergyPlus command line options
+        timeout: 600        # seconds, optional
+        exchange: dictA.csv # optional: generate the co-simulation for `site` with this dictionary
+        script: gen.py      # optional: run an already generated script instead
+
+A job with an exchange dictionary or a script runs the generated co-simulation (its
+callbacks, inputs and storage) on the worker's API and state through the script's
+run(); other jobs run plain EnergyPlus.
+
+Usage:
+    python sweepRunner.py MANIFEST -o OUT_DIR [-j WORKERS] [--timeout S] [--api module:attr]
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from CodeGenerator import CodeGenerator, build_generation_config, load_yaml
+
+DEFAULT_API = 'pyenergyplus.api:EnergyPlusAPI'
+REPORT_NAME = 'sweep_report.json'
+SCRIPT_NAME = 'generated_energyplus.py'
+SITE_FILES = ('INPUT_CONFIG.yaml', 'SET_CONFIG.yaml', 'OUTPUT_CONFIG.yaml')
+
+logger = logging.getLogger(__name__)
+
+
+class SweepJob:
+    """
+    One simulation variant: IDF, weather file and extra command line options, and
+    optionally the generated co-simulation script that drives it
+
+    exchange and site describe a script to generate (see prepare_scripts); script is
+    the generated script the worker runs.
+    """
+
+    def __init__(self, name: str, idf: str, weather: str, args: Optional[List[str]] = None,
+                 timeout: Optional[float] = None, output_dir: Optional[str] = None,
+                 exchange: Optional[str] = None, site: Optional[str] = None, script: Optional[str] = None):
+        self.name = name
+        self.idf = idf
+        self.weather = weather
+        self.args = list(args or [])
+        self.timeout = timeout
+        self.output_dir = output_dir
+        self.exchange = exchange
+        self.site = site
+        self.script = script
+
+    def arguments(self) -> List[str]:
+        return ['-w', self.weather, '-d', self.output_dir, *self.args, self.idf]
+
+    def settings(self) -> Dict[str, Any]:
+        """SET_CONFIG overrides handed to a generated script's run()"""
+        return {'idf_file': self.idf, 'weather_file': self.weather, 'output_dir': self.output_dir,
+                'energyplus_args': self.args}
+
+
+class SweepResult:
+    """Outcome of one job, as written to the sweep report"""
+
+    def __init__(self, name: str, ok: bool, returncode: Optional[int] = None, error: Optional[str] = None,
+                 seconds: float = 0.0, worker: Optional[int] = None, output_dir: Optional[str] = None,
+                 timed_out: bool = False):
+        self.name = name
+        self.ok = ok
+        self.returncode = returncode
+        self.error = error
+        self.seconds = seconds
+        self.worker = worker
+        self.output_dir = output_dir
+        self.timed_out = timed_out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'ok': self.ok, 'returncode': self.returncode, 'error': self.error,
+                'seconds': round(self.seconds, 6), 'worker': self.worker, 'output_dir': self.output_dir,
+                'timed_out': self.timed_out}
+
+
+def load_api_factory(spec: str):
+    """'module:attr' -> the callable that builds the EnergyPlus API"""
+    module_name, _, attr = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attr or 'EnergyPlusAPI')
+
+
+def load_script(path: str, cache: Optional[Dict[str, Any]] = None):
+    """
+    Import a generated script by path; with a cache, it is imported again only when it
+    changes, so its configs and exchange tables stay loaded between jobs
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if cache is not None and path in cache and cache[path][0] == stamp:
+        return cache[path][1]
+    directory = os.path.dirname(path)
+    # the script imports its runtime modules (actuatorTable, ...) from this folder
+    for entry in (os.path.dirname(os.path.abspath(__file__)), directory):
+        if entry not in sys.path:
+            sys.path.append(entry)
+    name = f"generated_{abs(hash(path)):x}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    if cache is not None:
+        cache[path] = (stamp, module)
+    return module
+
+
+def generate_script(site: str, exchange: str, directory: str, generator: Optional[CodeGenerator] = None) -> str:
+    """
+    Generate the co-simulation of `site` with another exchange dictionary into directory,
+    next to copies of the site's yaml files (the script reads them from its own folder)
+
+    Returns:
+        path of the generated script
+    """
+    configs = {name: load_yaml(os.path.join(site, name)) or {} for name in SITE_FILES}
+    configs['SET_CONFIG.yaml'] = dict(configs['SET_CONFIG.yaml'], exchangeDataDict=os.path.abspath(exchange))
+    generator = generator or CodeGenerator()
+    config = build_generation_config(configs['INPUT_CONFIG.yaml'], configs['SET_CONFIG.yaml'],
+                                     configs['OUTPUT_CONFIG.yaml'], base_dir=site, generator=generator)
+    code = generator.generate_energyplus_code(config)
+    os.makedirs(directory, exist_ok=True)
+    for name, content in configs.items():
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            yaml.safe_dump(content, f, sort_keys=False)
+    script = os.path.join(directory, SCRIPT_NAME)
+    with open(script, 'w', encoding='utf-8') as f:
+        f.write(code)
+    return script
+
+
+def prepare_scripts(jobs: List[SweepJob]) -> int:
+    """Generate the script of every job that has an exchange dictionary; returns how many"""
+    generator = CodeGenerator()
+    generated = 0
+    for job in jobs:
+        if job.exchange is None or job.script is not None:
+            continue
+        if job.site is None:
+            raise ValueError(f"job {job.name} has an exchange dictionary but no site to generate from")
+        job.script = generate_script(job.site, job.exchange, os.path.join(job.output_dir, 'site'), generator)
+        generated += 1
+    return generated
+
+
+def discover_jobs(manifest_path: str, out_dir: str, timeout: Optional[float] = None) -> List[SweepJob]:
+    """Jobs of a sweep manifest; relative paths are resolved against the manifest"""
+    manifest = load_yaml(manifest_path) or {}
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    def resolve(path):
+        return os.path.join(base_dir, path) if path else None
+
+    jobs = []
+    for entry in manifest.get('jobs', []):
+        jobs.append(SweepJob(entry['name'], os.path.join(base_dir, entry['idf']),
+                             os.path.join(base_dir, entry['weather']), entry.get('args'),
+                             entry.get('timeout', timeout), os.path.join(out_dir, entry['name']),
+                             resolve(entry.get('exchange')), resolve(entry.get('site', manifest.get('site'))),
+                             resolve(entry.get('script'))))
+    names = [job.name for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate job names: {', '.join(duplicates)}")
+    return jobs
+
+
+def _worker_main(worker_id: int, api_spec: str, jobs, results):
+    """Worker process: one API and one state, reused for every job it takes"""
+    api = load_api_factory(api_spec)()
+    state = api.state_manager.new_state()
+    scripts = {}
+    while True:
+        item = jobs.get()
+        if item is None:
+            break
+        index, job = item
+        results.put(('started', worker_id, index, time.monotonic()))
+        start = time.perf_counter()
+        try:
+            os.makedirs(job.output_dir, exist_ok=True)
+            if job.script is not None:
+                ok = load_script(job.script, scripts).run(api, state, **job.settings())
+                result = SweepResult(job.name, ok, error=None if ok else 'generated co-simulation failed',
+                                     seconds=time.perf_counter() - start, worker=worker_id,
+                                     output_dir=job.output_dir)
+            else:
+                returncode = api.runtime.run_energyplus(state, job.arguments())
+                result = SweepResult(job.name, returncode == 0, returncode, None if returncode == 0 else
+                                     f"EnergyPlus exited with {returncode}", time.perf_counter() - start,
+                                     worker_id, job.output_dir)
+        except Exception as e:
+            result = SweepResult(job.name, False, error=f"{type(e).__name__}: {e}",
+                                 seconds=time.perf_counter() - start, worker=worker_id, output_dir=job.output_dir)
+        finally:
+            api.runtime.clear_callbacks()
+            api.state_manager.reset_state(state)
+        results.put(('done', worker_id, index, result))
+
+
+class SweepRunner:
+    """
+    Pool of EnergyPlus worker processes fed from one job queue
+
+    Args:
+        workers: pool size, defaults to the number of cores
+        api_spec: 'module:attr' of the API class, e.g. a stand-in for offline benchmarks
+        timeout: default per-job timeout in seconds (None: no limit)
+    """
+
+    def __init__(self, workers: Optional[int] = None, api_spec: str = DEFAULT_API,
+                 timeout: Optional[float] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.api_spec = api_spec
+        self.timeout = timeout
+        self.context = multiprocessing.get_context()
+        self.restarts = 0
+
+    def _spawn(self, worker_id: int, jobs, results):
+        process = self.context.Process(target=_worker_main, args=(worker_id, self.api_spec, jobs, results),
+                                       name=f'sweep-worker-{worker_id}', daemon=True)
+        process.start()
+        return process
+
+    def run(self, jobs: List[SweepJob]) -> List[SweepResult]:
+        """Run every job; one SweepResult per job, in job order"""
+        job_queue = self.context.Queue()
+        results = self.context.Queue()
+        for index, job in enumerate(jobs):
+            job_queue.put((index, job))
+
+        collected: List[Optional[SweepResult]] = [None] * len(jobs)
+        processes = {}
+        running = {}
+        next_id = 0
+        for _ in range(min(self.workers, len(jobs))):
+            processes[next_id] = self._spawn(next_id, job_queue, results)
+            next_id += 1
+
+        remaining = len(jobs)
+        while remaining:
+            try:
+                message = results.get(timeout=0.05)
+            except queue.Empty:
+                message = None
+            if message is not None:
+                kind, worker_id, index = message[:3]
+                if kind == 'started':
+                    running[worker_id] = (index, message[3])
+                elif collected[index] is None:
+                    running.pop(worker_id, None)
+                    collected[index] = message[3]
+                    remaining -= 1
+
+            now = time.monotonic()
+            for worker_id, (index, started) in list(running.items()):
+                job = jobs[index]
+                timeout = job.timeout if job.timeout is not None else self.timeout
+                process = processes[worker_id]
+                timed_out = timeout is not None and now - started > timeout
+                if not timed_out and process.is_alive():
+                    continue
+                if timed_out:
+                    process.terminate()
+                error = f"timed out after {timeout}s" if timed_out else f"worker exited with {process.exitcode}"
+                process.join()
+                running.pop(worker_id)
+                del processes[worker_id]
+                if collected[index] is None:
+                    collected[index] = SweepResult(job.name, False, error=error, seconds=now - started,
+                                                   worker=worker_id, output_dir=job.output_dir,
+                                                   timed_out=timed_out)
+                    remaining -= 1
+                logger.warning(f"{job.name}: {error}, replacing worker {worker_id}")
+                if remaining > len(running):
+                    self.restarts += 1
+                    processes[next_id] = self._spawn(next_id, job_queue, results)
+                    next_id += 1
+
+            # idle workers only exit by crashing, e.g. when the API cannot be built
+            for worker_id, process in list(processes.items()):
+                if worker_id not in running and not process.is_alive():
+                    del processes[worker_id]
+            if not processes and remaining:
+                for index, job in enumerate(jobs):
+                    if collected[index] is None:
+                        collected[index] = SweepResult(job.name, False, error='no worker process is running',
+                                                       output_dir=job.output_dir)
+                break
+
+        for _ in processes:
+            job_queue.put(None)
+        for process in processes.values():
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+        return collected
+
+
+def write_report(results: List[SweepResult], report_path: str, elapsed: float, workers: int):
+    busy = sum(result.seconds for result in results)
+    report = {
+        'total': len(results),
+        'succeeded': sum(1 for result in results if result.ok),
+        'failed': sum(1 for result in results if not result.ok),
+        'timed_out': sum(1 for result in results if result.timed_out),
+        'seconds': round(elapsed, 6),
+        'workers': workers,
+        # share of the pool's time spent running jobs
+        'efficiency': round(busy / (elapsed * workers), 4) if elapsed else 0.0,
+        'jobs': [result.to_dict() for result in results],
+    }
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run a parametric EnergyPlus sweep on a process pool')
+    parser.add_argument('manifest', help='sweep manifest yaml')
+    parser.add_argument('-o', '--out-dir', default='sweep')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: cores)')
+    parser.add_argument('--timeout', type=float, default=None, help='default per-job timeout in seconds')
+    parser.add_argument('--api', default=DEFAULT_API, help='EnergyPlus API class as module:attr')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = discover_jobs(args.manifest, args.out_dir, args.timeout)
+    generated = prepare_scripts(jobs)
+    if generated:
+        print(f"generated {generated} co-simulation scripts")
+    runner = SweepRunner(args.workers, args.api, args.timeout)
+    start = time.perf_counter()
+    results = runner.run(jobs)
+    elapsed = time.perf_counter() - start
+
+    report_path = os.path.join(args.out_dir, REPORT_NAME)
+    write_report(results, report_path, elapsed, runner.workers)
+    for result in results:
+        print(f"{result.name}: {'ok' if result.ok else 'FAILED ' + str(result.error)} ({result.seconds:.2f}s)")
+    failed = sum(1 for result in results if not result.ok)
+    print(f"{len(results) - failed}/{len(results)} succeeded in {elapsed:.2f}s, report: {report_path}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
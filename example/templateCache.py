@@ -0,0 +1,261 @@
+import ast
+import hashlib
+import logging
+import os
+import pickle
+import re
+import tempfile
+import textwrap
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Bump when the pickled layout of CompiledTemplate changes so stale disk entries are ignored
+CACHE_FORMAT_VERSION = 2
+
+# {{marker}}, optionally with whitespace/newlines inside the braces
+MARKER_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+def template_digest(template_code: str) -> str:
+    """Content hash used as the cache key of a template"""
+    return hashlib.sha256(template_code.encode('utf-8')).hexdigest()
+
+
+class MarkerSite(NamedTuple):
+    """
+    One occurrence of a marker in the template source
+
+    start/end are character offsets into the source. Statement markers (a bare
+    `{{name}}` line) cover their whole lines, because generated fragments carry their
+    indentation re-based onto the marker's column; markers inside string literals
+    cover just the `{{name}}` token.
+    """
+    name: str
+    start: int
+    end: int
+    lineno: int
+    inline: bool
+    indent: str = ''
+
+
+def statement_marker_name(node: ast.AST) -> Optional[str]:
+    """Return `name` if node is the bare statement `{{name}}`, which parses as a nested set"""
+    if not isinstance(node, ast.Expr):
+        return None
+    outer = node.value
+    if not (isinstance(outer, ast.Set) and len(outer.elts) == 1):
+        return None
+    inner = outer.elts[0]
+    if not (isinstance(inner, ast.Set) and len(inner.elts) == 1 and isinstance(inner.elts[0], ast.Name)):
+        return None
+    return inner.elts[0].id
+
+
+def iter_marker_nodes(tree: ast.AST) -> Iterator[Tuple[ast.AST, Optional[str]]]:
+    """
+    Walk the tree once, yielding (node, name) for statement markers and
+    (node, None) for string constants that may carry inline markers
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        name = statement_marker_name(node)
+        if name is not None:
+            yield node, name
+            continue
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if '{{' in node.value:
+                yield node, None
+            continue
+        if isinstance(node, ast.JoinedStr):
+            # '{{' is an escaped brace inside f-strings, never a marker
+            continue
+        stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+
+class _SourceOffsets:
+    """Convert AST (lineno, utf-8 byte column) positions into character offsets"""
+
+    def __init__(self, source: str):
+        self.lines = source.split('\n')
+        self.line_starts = []
+        offset = 0
+        for line in self.lines:
+            self.line_starts.append(offset)
+            offset += len(line) + 1
+
+    def offset(self, lineno: int, col_offset: int) -> int:
+        line = self.lines[lineno - 1]
+        if not line.isascii():
+            col_offset = len(line.encode('utf-8')[:col_offset].decode('utf-8', errors='ignore'))
+        return self.line_starts[lineno - 1] + col_offset
+
+    def line_end(self, lineno: int) -> int:
+        return self.line_starts[lineno - 1] + len(self.lines[lineno - 1])
+
+
+def reindent(fragment: str, indent: str) -> str:
+    """Re-base a generated fragment onto the indentation of the marker it replaces"""
+    if not fragment:
+        return fragment
+    return textwrap.indent(textwrap.dedent(fragment), indent)
+
+
+def index_markers(source: str, tree: ast.Module) -> List[MarkerSite]:
+    """Find every marker occurrence exactly once, sorted by position"""
+    offsets = _SourceOffsets(source)
+    sites = {}
+    for node, name in iter_marker_nodes(tree):
+        if name is not None:
+            start = offsets.line_starts[node.lineno - 1]
+            end = offsets.line_end(node.end_lineno)
+            line = offsets.lines[node.lineno - 1]
+            indent = line[:len(line) - len(line.lstrip())]
+            sites[start, end] = MarkerSite(name, start, end, node.lineno, False, indent)
+            continue
+        node_start = offsets.offset(node.lineno, node.col_offset)
+        node_end = offsets.offset(node.end_lineno, node.end_col_offset)
+        for match in MARKER_PATTERN.finditer(source, node_start, node_end):
+            lineno = node.lineno + source.count('\n', node_start, match.start())
+            sites[match.start(), match.end()] = MarkerSite(match.group(1), match.start(), match.end(), lineno, True)
+    return sorted(sites.values(), key=lambda site: site.start)
+
+
+class CompiledTemplate:
+    """
+    A template that has been parsed once and indexed by marker
+
+    Attributes:
+        source: the template text
+        digest: sha256 of the template text
+        tree: parsed AST of the template
+        sites: every marker occurrence, sorted by offset
+        markers: marker name -> its sites
+    """
+
+    def __init__(self, source: str, digest: str, tree: ast.Module, sites: List[MarkerSite]):
+        self.source = source
+        self.digest = digest
+        self.tree = tree
+        self.sites = sites
+        self.markers = {}
+        for site in sites:
+            self.markers.setdefault(site.name, []).append(site)
+
+    @classmethod
+    def compile(cls, source: str, tree: ast.Module, digest: Optional[str] = None) -> 'CompiledTemplate':
+        return cls(source, digest or template_digest(source), tree, index_markers(source, tree))
+
+    def render(self, replacements: Dict[str, str]) -> str:
+        """Splice the replacements into the source in one pass; unknown markers are left as-is"""
+        pieces = []
+        position = 0
+        source = self.source
+        for site in self.sites:
+            replacement = replacements.get(site.name)
+            if replacement is None or site.start < position:
+                continue
+            pieces.append(source[position:site.start])
+            pieces.append(replacement if site.inline else reindent(replacement, site.indent))
+            position = site.end
+        pieces.append(source[position:])
+        return ''.join(pieces)
+
+
+class TemplateCache:
+    """
+    LRU cache of compiled templates keyed by content hash
+
+    Args:
+        maxsize: number of templates kept in memory
+        cache_dir: optional directory where compiled templates are pickled by hash,
+                   so a new process can skip parsing as well
+    """
+
+    def __init__(self, maxsize: int = 32, cache_dir: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, digest: str) -> Optional[CompiledTemplate]:
+        with self._lock:
+            compiled = self._entries.get(digest)
+            if compiled is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return compiled
+
+        compiled = self._load_from_disk(digest)
+        if compiled is not None:
+            self.disk_hits += 1
+            self._remember(compiled)
+        return compiled
+
+    def put(self, compiled: CompiledTemplate):
+        self._remember(compiled)
+        self._save_to_disk(compiled)
+
+    def get_or_compile(self, template_code: str,
+                       compile_fn: Callable[[str, str], CompiledTemplate]) -> CompiledTemplate:
+        """Return the compiled template, calling compile_fn(template_code, digest) on a miss"""
+        digest = template_digest(template_code)
+        compiled = self.get(digest)
+        if compiled is None:
+            self.misses += 1
+            compiled = compile_fn(template_code, digest)
+            self.put(compiled)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, compiled: CompiledTemplate):
+        with self._lock:
+            self._entries[compiled.digest] = compiled
+            self._entries.move_to_end(compiled.digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.v{CACHE_FORMAT_VERSION}.pickle")
+
+    def _load_from_disk(self, digest: str) -> Optional[CompiledTemplate]:
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(digest)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                compiled = pickle.load(f)
+        except Exception as e:
+            self.logger.warning(f"ignoring unreadable template cache {path}: {e}")
+            return None
+        if not isinstance(compiled, CompiledTemplate) or compiled.digest != digest:
+            return None
+        return compiled
+
+    def _save_to_disk(self, compiled: CompiledTemplate):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write to a temporary file first so concurrent readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._disk_path(compiled.digest))
+        except Exception as e:
+            self.logger.warning(f"could not write template cache: {e}")
+
+
+default_template_cache = TemplateCache(
+    cache_dir=os.environ.get('CODEGEN_TEMPLATE_CACHE_DIR') or None
+)
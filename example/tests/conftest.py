@@ -0,0 +1,50 @@
+import csv
+import os
+import sys
+
+import pytest
+import yaml
+
+# the modules live flat in example/, like the benchmarks import them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CodeGenerator import build_generation_config, load_yaml
+
+EXCHANGE_HEADER = ['id', 'component_type', 'control_type', 'actuator_key', 'flag']
+EXCHANGE_ROWS = [
+    ['W1', 'Weather Data', 'Outdoor Dry Bulb', 'Environment', 'set_weather_flag'],
+    ['L1', 'Lights', 'Electricity Rate', 'ZONE1 LIGHTS', 'set_weather_flag'],
+    ['U1', 'Unitary HVAC', 'Sensible Load Request', 'UNIT 1', 'set_loop_flag'],
+    ['U2', 'Unitary HVAC', 'Sensible Load Request', 'UNIT 2', 'set_loop_flag'],
+    ['M1', 'Variable', 'Zone Mean Air Temperature', 'ZONE1', ''],
+]
+
+
+@pytest.fixture
+def site(tmp_path):
+    """A site folder with the three yaml files and a small exchange dictionary"""
+    with open(tmp_path / 'exchange.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXCHANGE_HEADER)
+        writer.writerows(EXCHANGE_ROWS)
+    configs = {'INPUT_CONFIG': {'type': 'HTTP', 'name': 'link1', 'url': '127.0.0.1:666', 'timeout': 1},
+               'SET_CONFIG': {'weather_file': 'weather.epw', 'idf_file': 'model.idf', 'time': 60,
+                              'exchangeDataDict': 'exchange.csv'},
+               'OUTPUT_CONFIG': {'type': 'sqlite', 'path': 'results.db'}}
+    for name, content in configs.items():
+        with open(tmp_path / f'{name}.yaml', 'w') as f:
+            yaml.safe_dump(content, f)
+    return tmp_path
+
+
+@pytest.fixture
+def site_config(site):
+    """build_generation_config for the site, with SET_CONFIG overrides"""
+
+    def build(generator=None, **set_overrides):
+        set_config = dict(load_yaml(os.path.join(site, 'SET_CONFIG.yaml')), **set_overrides)
+        return build_generation_config(load_yaml(os.path.join(site, 'INPUT_CONFIG.yaml')), set_config,
+                                       load_yaml(os.path.join(site, 'OUTPUT_CONFIG.yaml')), base_dir=str(site),
+                                       generator=generator)
+
+    return build
@@ -0,0 +1,113 @@
+import ast
+from time import perf_counter
+
+from actuatorTable import ExchangeTable, FrameRing
+from CodeGenerator import FRAGMENT_BUILDERS, CodeGenerator, template_flag_map
+from templateCache import TemplateCache
+
+
+def method(code: str, class_name: str, name: str) -> ast.FunctionDef:
+    tree = ast.parse(code)
+    owner = next(node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == class_name)
+    return next(node for node in owner.body if isinstance(node, ast.FunctionDef) and node.name == name)
+
+
+def test_render_fills_every_configured_marker(site_config):
+    generator = CodeGenerator(TemplateCache())
+    config = site_config(generator)
+    code = generator.generate_energyplus_code(config)
+
+    ast.parse(code)
+    for marker, section, _ in FRAGMENT_BUILDERS:
+        if section in config:
+            assert '{{%s}}' % marker not in code
+    assert 'self.input_communicate = InputCommunicate()' in code
+    assert 'self.data_storage = DataStorage(OUTPUT_CONFIG)' in code
+
+
+def test_config_build_reuses_the_generators_compiled_template(site_config):
+    cache = TemplateCache()
+    generator = CodeGenerator(cache)
+    with open(site_config()['template_path'], encoding='utf-8') as f:
+        generator.compile_template(f.read())
+
+    site_config(generator)
+
+    assert cache.misses == 1
+    assert cache.hits >= 1
+
+
+def test_folded_handlers_carry_their_calling_points_indices(site_config):
+    generator = CodeGenerator(TemplateCache())
+    config = site_config(generator)
+    table = ExchangeTable({row[0]: list(row[1:]) for row in config['exchange_data']['rows']},
+                          template_flag_map(config['template_path'], generator))
+
+    handlers = {handler['name']: handler for handler in config['exchange_handlers']}
+    # weather data and lights share the weather handler, output variables are not actuators
+    assert sorted(handlers) == ['before_predictor_flag', 'itrator_loop_flag']
+    assert [table.point_ids[i] for i in handlers['before_predictor_flag']['points']] == ['W1', 'L1']
+    assert [table.point_ids[i] for i in handlers['itrator_loop_flag']['points']] == ['U1', 'U2']
+    assert [callback['type'] for callback in config['callbacks']] == [
+        'begin_zone_timestep_before_set_current_weather', 'inside_system_iteration_loop']
+
+
+def test_folded_handler_writes_present_points_with_valid_handles(site_config):
+    generator = CodeGenerator(TemplateCache())
+    config = site_config(generator)
+    code = generator.generate_energyplus_code(config)
+    source = ast.unparse(method(code, 'EnergyPlusSimulator', 'itrator_loop_flag'))
+
+    written = []
+
+    class Exchange:
+        @staticmethod
+        def set_actuator_value(state, handle, value):
+            written.append((handle, value))
+
+    class Api:
+        exchange = Exchange
+
+    table = ExchangeTable({row[0]: list(row[1:]) for row in config['exchange_data']['rows']},
+                          template_flag_map(config['template_path'], generator))
+    frame = FrameRing(len(table), capacity=2).acquire()
+    table.fill(frame, {'U1': 1.5, 'U2': 2.5, 'W1': 9.0})
+
+    class Channel:
+        @staticmethod
+        def get():
+            return frame
+
+    class HandleCache:
+        handles = [10, 11, -1, 13]
+
+        @staticmethod
+        def resolve(api, state):
+            return True
+
+    simulator = type('Simulator', (), {})()
+    simulator.config = type('Config', (), {'controlData': Channel})()
+    simulator.handle_cache = HandleCache
+    observed = []
+    simulator.observe_frame = observed.append
+
+    namespace = {'api': Api, 'perf_counter': perf_counter}
+    exec(source, namespace)
+    namespace['itrator_loop_flag'](simulator, 'state')
+
+    # U1 is index 2, whose handle did not resolve; only U2 is written, W1 belongs to another calling point
+    assert table.point_index['U1'] == 2
+    assert written == [(13, 2.5)]
+    assert len(observed) == 1
+
+
+def test_callbacks_with_several_handlers_fan_out():
+    code = CodeGenerator(TemplateCache())._generate_callbacks([
+        {'type': 'inside_system_iteration_loop', 'handlers': ['itrator_loop_flag', 'init_heat_flag']},
+        {'type': 'after_predictor_before_hvac_managers', 'handlers': ['before_hvac_managers_flag']},
+    ])
+
+    assert code.count('api.runtime.callback_') == 2
+    assert 'fan_out(' in code
+    assert ("api.runtime.callback_after_predictor_before_hvac_managers(state, "
+            "metrics.wrap('before_hvac_managers_flag', self.energyplus_simulator.before_hvac_managers_flag))") in code
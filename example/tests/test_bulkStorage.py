@@ -0,0 +1,99 @@
+import sqlite3
+
+from bulkStorage import BufferedWriter, SQLiteBackend
+
+COLUMNS = ['timestep', 'point', 'value']
+
+
+class FlakyBackend(SQLiteBackend):
+    """Fails the first `failures` write attempts with a transient error"""
+
+    def __init__(self, path: str, failures: int):
+        super().__init__(path)
+        self.failures = failures
+        self.attempts = 0
+        self.connects = 0
+
+    def connect(self):
+        self.connects += 1
+        super().connect()
+
+    def write_rows(self, table, columns, rows):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise sqlite3.OperationalError('database is locked')
+        super().write_rows(table, columns, rows)
+
+
+def stored(path: str, table: str = 'results'):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(f'SELECT timestep, point, value FROM "{table}" ORDER BY timestep').fetchall()
+    finally:
+        connection.close()
+
+
+def rows(count: int):
+    return [(i, f'p{i % 7}', float(i)) for i in range(count)]
+
+
+def test_batches_are_retried_on_transient_errors_and_reconnect(tmp_path):
+    path = str(tmp_path / 'results.db')
+    backend = FlakyBackend(path, failures=2)
+    writer = BufferedWriter(backend, batch_size=50, flush_interval=0.05, retries=3, backoff=0.001)
+    writer.declare('results', COLUMNS)
+    for row in rows(120):
+        writer.write('results', row)
+    writer.close()
+
+    metrics = writer.metrics()
+    assert metrics['retried'] == 2
+    assert metrics['failed'] == 0
+    assert metrics['rows_written'] == 120
+    # every retry starts from a fresh connection
+    assert backend.connects == 3
+    assert stored(path) == rows(120)
+
+
+def test_a_batch_is_counted_as_failed_after_the_last_retry(tmp_path):
+    path = str(tmp_path / 'results.db')
+    writer = BufferedWriter(FlakyBackend(path, failures=3), batch_size=10, flush_interval=0.05, retries=2,
+                            backoff=0.001)
+    writer.declare('results', COLUMNS)
+    writer.write_many('results', rows(10))
+    assert writer.flush(timeout=5)
+    failed = writer.metrics()
+    # the failed batch is gone; the next one goes through
+    writer.write_many('results', rows(20)[10:])
+    writer.close()
+
+    assert (failed['retried'], failed['failed'], failed['rows_written']) == (2, 10, 0)
+    assert writer.metrics()['rows_written'] == 10
+    assert stored(path) == rows(20)[10:]
+
+
+def test_blocking_write_many_larger_than_the_buffer_drops_nothing(tmp_path):
+    path = str(tmp_path / 'results.db')
+    writer = BufferedWriter(SQLiteBackend(path), batch_size=100, flush_interval=0.05, max_buffer=250)
+    writer.declare('results', COLUMNS)
+
+    accepted = writer.write_many('results', rows(1000), block=True)
+    writer.close()
+
+    assert accepted == 1000
+    assert writer.metrics()['dropped'] == 0
+    assert stored(path) == rows(1000)
+
+
+def test_non_blocking_writes_beyond_the_buffer_are_dropped_and_counted(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'results.db'))
+    # nothing is flushed on its own within the test
+    writer = BufferedWriter(backend, batch_size=10 ** 6, flush_interval=60, max_buffer=5)
+    writer.declare('results', COLUMNS)
+
+    accepted = [writer.write('results', row) for row in rows(8)]
+    writer.close()
+
+    assert accepted == [True] * 5 + [False] * 3
+    assert writer.metrics()['dropped'] == 3
+    assert writer.metrics()['rows_written'] == 5
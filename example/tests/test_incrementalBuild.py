@@ -0,0 +1,70 @@
+import json
+import os
+
+from CodeGenerator import CodeGenerator
+from incrementalBuild import STATE_VERSION, IncrementalGenerator, fingerprint
+from templateCache import TemplateCache
+
+
+def test_fingerprint_ignores_key_order_and_tracks_values():
+    assert fingerprint({'a': 1, 'b': [1, 2]}) == fingerprint({'b': [1, 2], 'a': 1})
+    assert fingerprint({'a': 1}) != fingerprint({'a': 2})
+    assert fingerprint('text') == fingerprint('text')
+
+
+def test_unchanged_config_reuses_every_fragment_and_skips_the_write(site_config, tmp_path):
+    builder = IncrementalGenerator(CodeGenerator(TemplateCache()))
+    config = site_config(builder.generator)
+    output = str(tmp_path / 'generated_energyplus.py')
+
+    first = builder.generate(config, output)
+    mtime = os.stat(output).st_mtime_ns
+    second = builder.generate(config, output)
+
+    assert first.written and first.reused == []
+    assert not second.written and second.rebuilt == []
+    assert sorted(second.reused) == sorted(first.rebuilt)
+    assert os.stat(output).st_mtime_ns == mtime
+
+
+def test_only_the_changed_section_is_rebuilt(site_config, tmp_path):
+    builder = IncrementalGenerator(CodeGenerator(TemplateCache()))
+    output = str(tmp_path / 'generated_energyplus.py')
+    builder.generate(site_config(builder.generator), output)
+
+    report = builder.generate(site_config(builder.generator, queue_policy='drop_oldest'), output)
+
+    assert report.rebuilt == ['initQueue']
+    assert report.changed == ['initQueue']
+    assert report.written
+    with open(output, encoding='utf-8') as f:
+        assert "policy='drop_oldest'" in f.read()
+
+
+def test_incremental_output_matches_a_full_generation(site_config, tmp_path):
+    builder = IncrementalGenerator(CodeGenerator(TemplateCache()))
+    output = str(tmp_path / 'generated_energyplus.py')
+    builder.generate(site_config(builder.generator), output)
+    config = site_config(builder.generator, queue_size=5)
+    builder.generate(config, output)
+
+    with open(output, encoding='utf-8') as f:
+        assert f.read() == CodeGenerator(TemplateCache()).generate_energyplus_code(config)
+
+
+def test_state_from_another_version_rebuilds_everything(site_config, tmp_path):
+    builder = IncrementalGenerator(CodeGenerator(TemplateCache()))
+    config = site_config(builder.generator)
+    output = str(tmp_path / 'generated_energyplus.py')
+    first = builder.generate(config, output)
+
+    state_path = builder.state_path(output)
+    with open(state_path, encoding='utf-8') as f:
+        state = json.load(f)
+    state['version'] = STATE_VERSION - 1
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+    report = builder.generate(config, output)
+    assert sorted(report.rebuilt) == sorted(first.rebuilt)
+    assert not report.written
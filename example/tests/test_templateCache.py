@@ -0,0 +1,46 @@
+from CodeGenerator import CodeGenerator
+from templateCache import TemplateCache, reindent
+
+TEMPLATE = '''class Simulator:
+    def __init__(self):
+        {{init}}
+
+    def describe(self):
+        return "site {{name}}, {{unknown}}"
+'''
+
+
+def test_statement_markers_take_the_markers_indentation():
+    code = CodeGenerator(TemplateCache()).generate_code_from_template(
+        TEMPLATE, {'init': 'self.a = 1\nif self.a:\n    self.b = 2', 'name': 'north'})
+
+    assert '        self.a = 1\n        if self.a:\n            self.b = 2\n' in code
+    assert 'return "site north, {{unknown}}"' in code
+    namespace = {}
+    exec(code, namespace)
+    assert namespace['Simulator']().b == 2
+
+
+def test_template_is_parsed_once_per_content():
+    cache = TemplateCache()
+    generator = CodeGenerator(cache)
+    first = generator.compile_template(TEMPLATE)
+    second = generator.compile_template(TEMPLATE)
+    generator.compile_template(TEMPLATE + '\n')
+
+    assert first is second
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert [site.name for site in first.sites] == ['init', 'name', 'unknown']
+
+
+def test_compiled_templates_survive_a_new_cache_through_the_disk_cache(tmp_path):
+    CodeGenerator(TemplateCache(cache_dir=str(tmp_path))).compile_template(TEMPLATE)
+    cache = TemplateCache(cache_dir=str(tmp_path))
+    compiled = CodeGenerator(cache).compile_template(TEMPLATE)
+
+    assert (cache.disk_hits, cache.misses) == (1, 0)
+    assert compiled.render({'init': 'pass', 'name': 'x'}).count('pass') == 1
+
+
+def test_reindent_rebases_an_already_indented_fragment():
+    assert reindent('    a = 1\n    b = 2', '  ') == '  a = 1\n  b = 2'
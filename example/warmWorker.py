@@ -0,0 +1,279 @@
+"""
+Warm EnergyPlus worker: keeps the API loaded and recycles one state across jobs
+
+A cold run pays for interpreter startup, the pyenergyplus import, EnergyPlusAPI()
+construction, generating and importing the co-simulation script and loading its configs
+and exchange tables before its first timestep. The worker pays these once, then serves
+jobs over a local Unix socket; between jobs the state is recycled with clear_callbacks
+and reset_state, and generated scripts stay imported until their inputs change.
+
+A job runs the generated co-simulation (callbacks, inputs, storage) on the warm API and
+state through the script's run(): either `script`, an already generated script, or
+`site` (folder with INPUT/SET/OUTPUT_CONFIG.yaml) plus `exchange`, generated on first
+use. A job with neither runs plain EnergyPlus.
+
+Protocol: one JSON object per line in each direction.
+    {"name": ..., "idf": ..., "weather": ..., "output_dir": ..., "args": [...],
+     "script": ... | "site": ..., "exchange": ...}
+    {"cmd": "ping"} | {"cmd": "stats"} | {"cmd": "shutdown"}
+
+The socket defaults to the per-user runtime directory and is only accessible by its owner.
+
+Every job reply carries `received` and `first_timestep` (time.time() on the worker), so
+clients can measure time-to-first-timestep.
+
+Usage:
+    python warmWorker.py serve [--socket PATH] [--api module:attr]
+    python warmWorker.py submit --idf MODEL --weather EPW [--socket PATH] [--args ...]
+    python warmWorker.py run --idf MODEL --weather EPW      (one cold run, for comparison)
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from sweepRunner import DEFAULT_API, SITE_FILES, SweepJob, generate_script, load_api_factory, load_script
+
+
+def runtime_path(name: str) -> str:
+    """Path in the per-user runtime directory: $XDG_RUNTIME_DIR, else energyplus-<uid> in the temp dir"""
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    if not base or not os.path.isdir(base):
+        base = os.path.join(tempfile.gettempdir(), f'energyplus-{os.getuid()}')
+    return os.path.join(base, name)
+
+
+def private_socket_dir(socket_path: str):
+    """
+    Create the socket's folder for this user only; refuse one someone else controls
+
+    The folder must belong to this user and not be writable by group or others. The
+    only exception is a sticky folder owned by root, such as /tmp, where other users
+    cannot remove or replace this user's socket.
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    stat = os.stat(directory)
+    if stat.st_uid == 0 and stat.st_mode & 0o1000:
+        return
+    if stat.st_uid != os.getuid():
+        raise PermissionError(f"{directory} belongs to another user")
+    if stat.st_mode & 0o022:
+        raise PermissionError(f"{directory} is writable by other users")
+
+
+@contextmanager
+def private_umask():
+    """Create files and sockets with owner-only permissions inside the block"""
+    previous = os.umask(0o177)
+    try:
+        yield
+    finally:
+        os.umask(previous)
+
+
+DEFAULT_SOCKET = runtime_path('energyplus-warm-worker.sock')
+
+logger = logging.getLogger(__name__)
+
+
+class WarmWorker:
+    """One API and one state, reused for every job"""
+
+    def __init__(self, api_spec: str = DEFAULT_API):
+        start = time.perf_counter()
+        self.api = load_api_factory(api_spec)()
+        self.state = self.api.state_manager.new_state()
+        self.startup_seconds = time.perf_counter() - start
+        self.jobs = 0
+        self.failures = 0
+        self.first_timestep_total = 0.0
+        self.scripts = {}
+        self.generated = {}
+        self.script_dir = tempfile.mkdtemp(prefix='ep_warm_scripts_')
+
+    def script_for(self, request: Dict[str, Any]) -> Optional[str]:
+        """Generated script of a job; a site + exchange pair is generated again only when its files change"""
+        if request.get('script'):
+            return request['script']
+        if not request.get('exchange'):
+            return None
+        if not request.get('site'):
+            raise ValueError("a job with an exchange dictionary needs the site to generate from")
+        site, exchange = os.path.abspath(request['site']), os.path.abspath(request['exchange'])
+        paths = [exchange, *(os.path.join(site, name) for name in SITE_FILES)]
+        stamps = tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths)
+        cached = self.generated.get((site, exchange))
+        if cached is None or cached[0] != stamps:
+            directory = os.path.join(self.script_dir, f'site{len(self.generated)}')
+            cached = (stamps, generate_script(site, exchange, directory))
+            self.generated[site, exchange] = cached
+        return cached[1]
+
+    def run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        received = time.time()
+        job = SweepJob(request.get('name', f'job{self.jobs}'), request['idf'], request['weather'],
+                       request.get('args'), output_dir=request.get('output_dir') or tempfile.mkdtemp(prefix='ep_'))
+        first_timestep = []
+
+        def on_timestep(state):
+            if not first_timestep:
+                first_timestep.append(time.time())
+
+        start = time.perf_counter()
+        try:
+            script = self.script_for(request)
+            os.makedirs(job.output_dir, exist_ok=True)
+            self.api.runtime.callback_begin_zone_timestep_before_init_heat_balance(self.state, on_timestep)
+            if script is not None:
+                returncode = None
+                ok = load_script(script, self.scripts).run(self.api, self.state, **job.settings())
+                error = None if ok else 'generated co-simulation failed'
+            else:
+                returncode = self.api.runtime.run_energyplus(self.state, job.arguments())
+                error = None if returncode == 0 else f"EnergyPlus exited with {returncode}"
+        except Exception as e:
+            returncode, error = None, f"{type(e).__name__}: {e}"
+        finally:
+            self.api.runtime.clear_callbacks()
+            self.api.state_manager.reset_state(self.state)
+        self.jobs += 1
+        self.failures += error is not None
+        if first_timestep:
+            self.first_timestep_total += first_timestep[0] - received
+        return {'name': job.name, 'ok': error is None, 'returncode': returncode, 'error': error,
+                'seconds': time.perf_counter() - start, 'output_dir': job.output_dir, 'received': received,
+                'first_timestep': first_timestep[0] if first_timestep else None}
+
+    def stats(self) -> Dict[str, Any]:
+        return {'jobs': self.jobs, 'failures': self.failures, 'startup_seconds': self.startup_seconds,
+                'mean_time_to_first_timestep': self.first_timestep_total / self.jobs if self.jobs else None,
+                'cached_scripts': len(self.scripts), 'pid': os.getpid()}
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                command = request.get('cmd')
+                if command == 'ping':
+                    reply = {'ok': True}
+                elif command == 'stats':
+                    reply = self.server.worker.stats()
+                elif command == 'shutdown':
+                    reply = {'ok': True}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    reply = self.server.worker.run(request)
+            except Exception as e:
+                reply = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class WarmWorkerServer(socketserver.UnixStreamServer):
+    """Serves one connection at a time, so jobs on the single state never overlap"""
+
+    def __init__(self, socket_path: str, worker: WarmWorker):
+        private_socket_dir(socket_path)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.worker = worker
+        super().__init__(socket_path, _JobHandler)
+
+    def server_bind(self):
+        with private_umask():
+            super().server_bind()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class WarmWorkerClient:
+    """Persistent connection to a warm worker"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: Optional[float] = None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self.reader = self.sock.makefile('rb')
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError('warm worker closed the connection')
+        return json.loads(line)
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def wait_for_socket(socket_path: str, timeout: float = 30.0) -> bool:
+    """Wait until a worker answers ping on socket_path"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            client = WarmWorkerClient(socket_path, timeout=1.0)
+            try:
+                return client.request({'cmd': 'ping'}).get('ok', False)
+            finally:
+                client.close()
+        except OSError:
+            time.sleep(0.02)
+    return False
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Warm EnergyPlus worker')
+    parser.add_argument('mode', choices=('serve', 'submit', 'run'))
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--api', default=DEFAULT_API, help='EnergyPlus API class as module:attr')
+    parser.add_argument('--idf')
+    parser.add_argument('--weather')
+    parser.add_argument('--script', help='generated co-simulation script to run')
+    parser.add_argument('--site', help='folder with INPUT/SET/OUTPUT_CONFIG.yaml to generate from')
+    parser.add_argument('--exchange', help='exchange dictionary to generate the site\'s script with')
+    parser.add_argument('--output-dir')
+    parser.add_argument('--args', nargs=argparse.REMAINDER, default=[], help='extra EnergyPlus options')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    job = {'idf': args.idf, 'weather': args.weather, 'script': args.script, 'site': args.site,
+           'exchange': args.exchange,
+           'output_dir': args.output_dir, 'args': args.args}
+    if args.mode == 'serve':
+        server = WarmWorkerServer(args.socket, WarmWorker(args.api))
+        logger.info(f"warm worker ready on {args.socket} (startup {server.worker.startup_seconds:.3f}s)")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        return 0
+    if args.mode == 'submit':
+        client = WarmWorkerClient(args.socket)
+        try:
+            reply = client.request(job)
+        finally:
+            client.close()
+    else:
+        reply = WarmWorker(args.api).run(job)
+    print(json.dumps(reply))
+    return 0 if reply.get('ok') else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())